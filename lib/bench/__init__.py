@@ -0,0 +1,6 @@
+# lib/bench/__init__.py
+# Benchmarks run against their own database file so they never touch gameshelf.db.
+# This has to happen before lib.models creates its engine, which is why it lives here.
+import os
+
+os.environ.setdefault("GAMESHELF_DATABASE_URL", "sqlite:///gameshelf_bench.db")
@@ -0,0 +1,119 @@
+# lib/bench/aio.py
+"""
+Compares the blocking model calls with the AsyncGameShelf facade under concurrent load.
+
+Both runs issue the same mix of requests from inside an event loop. The sync run calls the
+models directly, so each request blocks the loop. The async run gathers the requests
+through the facade's thread pool. Besides throughput, a 1 ms ticker task measures how long
+the loop was blocked (worst tick lag).
+
+Usage:
+    python -m lib.bench.aio [--games 100000] [--requests 400] [--workers 8]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from lib.bench.harness import quiet, environment, write_report, percentile
+from lib.db.seed import generate_database
+from lib.models import Session, Game
+from lib.models.aio import AsyncGameShelf
+
+SEARCH_TERMS = ["wolf", "crimson", "legend", "neon moon", "castle 2", "shadow forge"]
+
+
+def request_mix(count, games, seed=42):
+    """A reproducible list of (classmethod name, args) requests."""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            requests.append(("search", (rng.choice(SEARCH_TERMS),)))
+        elif kind < 0.7:
+            requests.append(("find_by_id", (rng.randint(1, games),)))
+        elif kind < 0.9:
+            requests.append(("page", ()))
+        else:
+            requests.append(("find_by_title", (rng.choice(SEARCH_TERMS).split()[0],)))
+    return requests
+
+
+async def tick_lag(stop, lags):
+    """Records how late each 1 ms sleep wakes up; large values mean the loop was blocked."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append((time.perf_counter() - start - 0.001) * 1000)
+
+
+async def run_sync(requests):
+    latencies = []
+    for name, args in requests:
+        start = time.perf_counter()
+        session = Session()
+        getattr(Game, name)(session, *args)
+        session.close()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0) # let the ticker observe the gap between requests
+    return latencies
+
+
+async def run_async(requests, workers):
+    shelf = AsyncGameShelf(max_workers=workers)
+
+    async def one(name, args):
+        start = time.perf_counter()
+        await getattr(shelf.Game, name)(*args)
+        return (time.perf_counter() - start) * 1000
+
+    try:
+        return await asyncio.gather(*(one(name, args) for name, args in requests))
+    finally:
+        shelf.close()
+
+
+async def measure(mode, requests, workers):
+    stop, lags = asyncio.Event(), []
+    ticker = asyncio.create_task(tick_lag(stop, lags))
+    start = time.perf_counter()
+    if mode == "sync":
+        latencies = await run_sync(requests)
+    else:
+        latencies = await run_async(requests, workers)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    return {
+        "seconds": elapsed,
+        "requests_per_second": len(requests) / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "max_loop_lag_ms": max(lags) if lags else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the asyncio facade against sync calls.")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--output", default="bench_aio.json")
+    args = parser.parse_args(argv)
+
+    with quiet():
+        generate_database(games=args.games, developers=max(10, args.games // 50))
+    requests = request_mix(args.requests, args.games)
+    results = {mode: asyncio.run(measure(mode, requests, args.workers)) for mode in ("sync", "async")}
+
+    print(f"{'mode':<6} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'max loop lag ms':>16}")
+    for mode, metrics in results.items():
+        print(f"{mode:<6} {metrics['requests_per_second']:>10,.0f} {metrics['p50_ms']:>9.2f} "
+              f"{metrics['p95_ms']:>9.2f} {metrics['max_loop_lag_ms']:>16.2f}")
+    write_report({"environment": environment(), "workers": args.workers, "games": args.games,
+                  "results": results}, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# lib/bench/batch.py
+"""
+Compares Game.create committing per call with the same calls inside `with batch(session):`.
+
+Usage:
+    python -m lib.bench.batch [--creates 10000] [--output bench_batch.json]
+"""
+import argparse
+import time
+
+from lib.bench.harness import quiet, environment, write_report
+from lib.db.seed import generate_database
+from lib.models import Session, Platform, Genre, Game, batch, STORAGE_PROFILE
+
+
+def create_games(session, count, label):
+    platform, genre = session.get(Platform, 1), session.get(Genre, 1)
+    for i in range(count):
+        Game.create(session, f"{label} {i}", platform, genre, 2000 + i % 25, 1 + i % 5)
+
+
+def run(creates):
+    results = {}
+    with quiet():
+        generate_database(games=0, platforms=5, genres=5, developers=5, publishers=5)
+
+    session = Session()
+    start = time.perf_counter()
+    create_games(session, creates, "Per-commit")
+    results["per-commit"] = time.perf_counter() - start
+    session.close()
+
+    session = Session()
+    start = time.perf_counter()
+    with batch(session):
+        create_games(session, creates, "Batched")
+    results["batch"] = time.perf_counter() - start
+    session.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark batch mode for model writes.")
+    parser.add_argument("--creates", type=int, default=10000)
+    parser.add_argument("--output", default="bench_batch.json")
+    args = parser.parse_args(argv)
+
+    seconds = run(args.creates)
+    print(f"Storage profile: {STORAGE_PROFILE}")
+    for mode, elapsed in seconds.items():
+        print(f"{mode:<11} {args.creates} creates in {elapsed:8.2f}s ({args.creates / elapsed:>10,.0f}/s)")
+    speedup = seconds["per-commit"] / seconds["batch"]
+    print(f"Speedup: {speedup:.1f}x")
+    write_report({
+        "environment": environment(), "profile": STORAGE_PROFILE, "creates": args.creates,
+        "seconds": seconds, "speedup": speedup,
+    }, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+# lib/bench/harness.py
+"""Shared measurement helpers for the benchmark scripts in lib/bench."""
+import contextlib
+import io
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import sqlalchemy
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Counts statements sent through an engine while active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+        return False
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list of numbers."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@contextlib.contextmanager
+def quiet():
+    """Discards anything printed inside the block (the display helpers print a lot)."""
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        yield sink
+
+
+def measure(engine, operation, iterations=5, setup=None, teardown=None):
+    """
+    Times `operation(state)` over `iterations` runs, then runs it once more under
+    tracemalloc and a QueryCounter. `setup()` (untimed) returns the state for each run;
+    `teardown(state, result)` (untimed) cleans up after each run.
+    Returns a dict with p50/p95/mean latency in ms, queries per call and peak memory in KiB.
+    """
+    def run():
+        state = setup() if setup else None
+        start = time.perf_counter()
+        result = operation(state)
+        elapsed = (time.perf_counter() - start) * 1000
+        if teardown:
+            teardown(state, result)
+        return elapsed
+
+    latencies = [run() for _ in range(iterations)]
+
+    tracemalloc.start()
+    try:
+        with QueryCounter(engine) as counter:
+            run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "queries": counter.count,
+        "peak_memory_kib": round(peak / 1024, 1),
+    }
+
+
+def environment():
+    """Describes the machine and library versions a report was produced with."""
+    import sqlite3
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "sqlalchemy": sqlalchemy.__version__,
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def write_report(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Wrote {path}")
+
+
+def print_table(results):
+    """Prints {size: {operation: metrics}} as a plain-text table."""
+    print(f"{'size':>9}  {'operation':<32} {'p50 ms':>10} {'p95 ms':>10} {'queries':>8} {'peak KiB':>11}")
+    for size, operations in results.items():
+        for name, metrics in operations.items():
+            print(f"{size:>9}  {name:<32} {metrics['p50_ms']:>10.3f} {metrics['p95_ms']:>10.3f} "
+                  f"{metrics['queries']:>8} {metrics['peak_memory_kib']:>11.1f}")
@@ -0,0 +1,192 @@
+# lib/bench/models.py
+"""
+Model-layer micro-benchmarks at several collection sizes.
+
+For every size a synthetic collection is generated (lib.db.seed.generate_database) into
+gameshelf_bench.db, then each hot operation is timed and reported with p50/p95 latency,
+statements issued per call and peak Python memory. The JSON report is meant to be diffed
+between releases.
+
+The query-result cache (lib.models.query_cache) is disabled for the run, so repeated
+iterations time the queries themselves rather than cache hits.
+
+Usage:
+    python -m lib.bench.models [--sizes 1000 100000 1000000] [--output bench_models.json]
+"""
+import argparse
+import random
+
+from lib.bench.harness import measure, quiet, environment, write_report, print_table
+from lib.db.seed import generate_database
+from lib.models import engine, query_cache, Session, Platform, Genre, Developer, Publisher, Game
+from lib import helpers
+
+LOOKUP_MODELS = [Platform, Genre, Developer, Publisher]
+
+DISPLAY_HELPERS = [
+    helpers.display_platforms, helpers.display_genres, helpers.display_developers,
+    helpers.display_publishers, helpers.display_games,
+]
+
+
+def collection_shape(size):
+    """Lookup table sizes that grow with the collection, roughly like a real shelf."""
+    return {
+        "games": size,
+        "platforms": 20 if size < 100000 else 50,
+        "genres": 15 if size < 100000 else 22,
+        "developers": max(10, size // 50),
+        "publishers": max(5, size // 300),
+    }
+
+
+def iterations_for(size, cheap):
+    """Cheap point operations get many samples; whole-table operations fewer at large sizes."""
+    if cheap:
+        return 50
+    return 5 if size <= 10000 else 3 if size <= 100000 else 1
+
+
+def game_operations(size, rng):
+    """Returns {name: (operation, iterations, setup, teardown)} for the Game model."""
+    def fresh_session():
+        return Session()
+
+    def close(session, _):
+        session.close()
+
+    def random_game_id():
+        return rng.randint(1, size)
+
+    def create(session):
+        platform = session.get(Platform, 1)
+        genre = session.get(Genre, 1)
+        return Game.create(session, "Benchmark Game", platform, genre, 2020, 4)
+
+    def delete_created(session, game):
+        game.delete(session)
+        session.close()
+
+    def setup_created_game():
+        session = Session()
+        platform = session.get(Platform, 1)
+        genre = session.get(Genre, 1)
+        return session, Game.create(session, "Benchmark Game", platform, genre, 2020, 4)
+
+    def setup_loaded_game():
+        session = Session()
+        return session, session.get(Game, random_game_id())
+
+    return {
+        "Game.create": (create, iterations_for(size, True), fresh_session, delete_created),
+        "Game.get_all": (lambda s: Game.get_all(s), iterations_for(size, False), fresh_session, close),
+        "Game.list_with_relations": (lambda s: Game.list_with_relations(s), iterations_for(size, False),
+                                     fresh_session, close),
+        "Game.rows": (lambda s: Game.rows(s), iterations_for(size, False), fresh_session, close),
+        "Game.find_by_id": (lambda s: Game.find_by_id(s, random_game_id()), iterations_for(size, True),
+                            fresh_session, close),
+        "Game.find_by_title": (lambda s: Game.find_by_title(s, "Wolf"), iterations_for(size, False),
+                               fresh_session, close),
+        "Game.page (first)": (lambda s: Game.page(s), iterations_for(size, True), fresh_session, close),
+        "Game.page (deep)": (lambda s: Game.page(s, after=("Wild", 0)), iterations_for(size, True),
+                             fresh_session, close),
+        "Game.rows (deep page)": (lambda s: Game.rows(s, after=("Wild", 0), limit=20), iterations_for(size, True),
+                                  fresh_session, close),
+        "Game.update": (lambda st: st[1].update(st[0], rating=rng.randint(1, 5)), iterations_for(size, True),
+                        setup_loaded_game, lambda st, _: st[0].close()),
+        "Game.delete": (lambda st: st[1].delete(st[0]), iterations_for(size, True),
+                        setup_created_game, lambda st, _: st[0].close()),
+    }
+
+
+def lookup_operations(model, size, rng):
+    """Returns get_all / rows / find_by_name / delete benchmarks for one lookup model."""
+    name = model.__name__
+    table = model.__table__
+
+    def fresh_session():
+        return Session()
+
+    def close(session, _):
+        session.close()
+
+    with engine.connect() as connection:
+        names = [row[0] for row in connection.execute(table.select().with_only_columns(table.c.name))]
+
+    def setup_unused_instance():
+        session = Session()
+        return session, model.create(session, name=f"Bench {rng.randrange(10 ** 9)}")
+
+    return {
+        f"{name}.get_all": (lambda s: model.get_all(s), iterations_for(size, True), fresh_session, close),
+        f"{name}.get_all_with_counts": (lambda s: model.get_all_with_counts(s), iterations_for(size, False),
+                                        fresh_session, close),
+        f"{name}.rows (counts)": (lambda s: model.rows(s, counts=True), iterations_for(size, True),
+                                  fresh_session, close),
+        f"{name}.find_by_name": (lambda s: model.find_by_name(s, rng.choice(names)), iterations_for(size, True),
+                                 fresh_session, close),
+        f"{name}.delete": (lambda st: st[1].delete(st[0]), iterations_for(size, True),
+                           setup_unused_instance, lambda st, _: st[0].close()),
+    }
+
+
+def helper_operations(size):
+    """Benchmarks for the CLI display helpers with their output discarded."""
+    def fresh_session():
+        return Session()
+
+    def close(session, _):
+        session.close()
+
+    def quietly(helper):
+        def run(session):
+            with quiet():
+                helper(session)
+        return run
+
+    return {
+        f"helpers.{helper.__name__}": (
+            quietly(helper),
+            iterations_for(size, helper is not helpers.display_games),
+            fresh_session, close,
+        )
+        for helper in DISPLAY_HELPERS
+    }
+
+
+def run_size(size, seed=42):
+    print(f"\n=== {size} games ===")
+    with quiet():
+        generate_database(seed=seed, **collection_shape(size))
+    rng = random.Random(seed)
+    operations = dict(game_operations(size, rng))
+    for model in LOOKUP_MODELS:
+        operations.update(lookup_operations(model, size, rng))
+    operations.update(helper_operations(size))
+
+    results = {}
+    for name, (operation, iterations, setup, teardown) in operations.items():
+        results[name] = measure(engine, operation, iterations, setup, teardown)
+        print(f"  {name:<32} p50 {results[name]['p50_ms']:>10.3f} ms")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the GameShelf model layer.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_models.json")
+    args = parser.parse_args(argv)
+
+    query_cache.enabled = False
+    try:
+        results = {size: run_size(size, args.seed) for size in args.sizes}
+    finally:
+        query_cache.enabled = True
+    print()
+    print_table(results)
+    write_report({"environment": environment(), "results": results}, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+# lib/bench/profiles.py
+"""
+Compares the storage profiles in lib.models.base on import and listing workloads.
+
+The engine is configured once at import time, so each profile runs in its own worker
+process with GAMESHELF_STORAGE_PROFILE set and its own database file. Workloads:
+  - import:       bulk-load a generated CSV catalog with lib.db.importer
+  - single-row:   Game.create one game per commit (the CLI's write pattern)
+  - list:         Game.list_with_relations over the whole collection
+  - page-walk:    50 consecutive keyset pages from the middle of the alphabet
+  - search:       a handful of full-text title searches
+
+Usage:
+    python -m lib.bench.profiles [--games 100000] [--output bench_profiles.json]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from lib.bench.harness import environment, write_report
+
+PROFILES = ["durable", "fast-write", "read-heavy"]
+SEARCH_TERMS = ["wolf", "crimson kingdom", "legend of", "neon", "moon 2"]
+
+
+def write_catalog(path, games, seed=42):
+    """Writes a deterministic CSV catalog using the seed generator's vocabulary."""
+    from lib.db import seed as seed_module
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "platform", "genre", "release_year", "rating", "developer", "publisher"])
+        for i in range(games):
+            writer.writerow([
+                seed_module._random_title(rng),
+                rng.choice(seed_module.PLATFORM_NAMES),
+                rng.choice(seed_module.GENRE_NAMES),
+                rng.randint(1980, 2025),
+                rng.choice(["", 1, 2, 3, 4, 5]),
+                f"Studio {i % max(10, games // 50)}",
+                f"Publisher {i % max(5, games // 300)}",
+            ])
+
+
+def timed(operation):
+    start = time.perf_counter()
+    result = operation()
+    return time.perf_counter() - start, result
+
+
+def run_worker(catalog_path, single_row_writes):
+    """Runs every workload against the profile this process was started with."""
+    from lib.db.seed import reset_database
+    from lib.db.importer import import_catalog
+    from lib.models import Session, Platform, Genre, Game, STORAGE_PROFILE
+
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            reset_database()
+            report = import_catalog(catalog_path, batch_size=10000, verbose=False)
+        finally:
+            sys.stdout = stdout
+    results = {"profile": STORAGE_PROFILE}
+    results["import"] = {"seconds": report.elapsed, "rows_per_second": report.rows_per_second}
+
+    session = Session()
+    platform, genre = session.get(Platform, 1), session.get(Genre, 1)
+    seconds, _ = timed(lambda: [Game.create(session, f"Profile Game {i}", platform, genre)
+                                for i in range(single_row_writes)])
+    results["single-row"] = {"seconds": seconds, "rows_per_second": single_row_writes / seconds}
+    session.close()
+
+    session = Session()
+    seconds, games = timed(lambda: Game.list_with_relations(session))
+    results["list"] = {"seconds": seconds, "rows_per_second": len(games) / seconds}
+    del games
+    session.close()
+
+    def walk_pages():
+        session = Session()
+        page = Game.page(session, after=("M", 0))
+        for _ in range(49):
+            page = Game.page(session, after=(page[-1].title, page[-1].id))
+        session.close()
+    seconds, _ = timed(walk_pages)
+    results["page-walk"] = {"seconds": seconds, "pages_per_second": 50 / seconds}
+
+    session = Session()
+    seconds, _ = timed(lambda: [Game.search(session, term) for term in SEARCH_TERMS * 10])
+    results["search"] = {"seconds": seconds, "queries_per_second": len(SEARCH_TERMS) * 10 / seconds}
+    session.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare GameShelf storage profiles.")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--single-row-writes", type=int, default=500)
+    parser.add_argument("--output", default="bench_profiles.json")
+    parser.add_argument("--worker", help=argparse.SUPPRESS) # catalog path, set by the parent process
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.single_row_writes)))
+        return
+
+    catalog_path = os.path.abspath("bench_profiles_catalog.csv")
+    write_catalog(catalog_path, args.games)
+    results = {}
+    try:
+        for profile in PROFILES:
+            env = dict(os.environ)
+            env["GAMESHELF_STORAGE_PROFILE"] = profile
+            env["GAMESHELF_DATABASE_URL"] = f"sqlite:///gameshelf_bench_{profile}.db"
+            worker = subprocess.run(
+                [sys.executable, "-m", "lib.bench.profiles", "--worker", catalog_path,
+                 "--single-row-writes", str(args.single_row_writes)],
+                env=env, capture_output=True, text=True,
+            )
+            if worker.returncode != 0:
+                print(worker.stderr, file=sys.stderr)
+                raise SystemExit(f"Benchmark worker for profile '{profile}' failed.")
+            results[profile] = json.loads(worker.stdout.strip().splitlines()[-1])
+            print(f"{profile}: done")
+    finally:
+        os.remove(catalog_path)
+
+    print(f"\n{'workload':<12}" + "".join(f"{profile:>16}" for profile in PROFILES))
+    for workload in ["import", "single-row", "list", "page-walk", "search"]:
+        row = f"{workload:<12}"
+        for profile in PROFILES:
+            metrics = results[profile][workload]
+            rate = next(value for key, value in metrics.items() if key.endswith("_per_second"))
+            row += f"{rate:>14,.0f}/s"
+        print(row)
+    write_report({"environment": environment(), "games": args.games, "results": results}, args.output)
+
+
+if __name__ == '__main__':
+    main()
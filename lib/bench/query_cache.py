@@ -0,0 +1,154 @@
+# lib/bench/query_cache.py
+"""
+Measures the query-result cache (lib.models.query_cache) on a repeated read workload.
+
+A synthetic collection is generated into gameshelf_bench.db. One reproducible sequence of
+operations is then run twice, with the cache disabled and then enabled, each operation in
+a fresh session the way a request would be. A few popular arguments make up most calls:
+
+- Game.find_by_title for a "<word> <noun>" term;
+- Game.search_rows;
+- Game.rows filtered by genre and rating, sorted by rating;
+- Game.rows keyset pages from a letter;
+- <Lookup>.rows(counts=True).
+
+Every `--write-every` operations one game's rating is changed through Game.update, so
+entries go stale as they would in use. In the cached run, every `--check-every`-th read is
+repeated with the cache disabled and compared, to confirm that no stale result was served.
+
+Reported: total time and p50/p95 per run and per kind, the hit and stale counts, and the
+cache's own figure for time saved.
+
+Usage:
+    python -m lib.bench.query_cache [--games 100000] [--operations 3000] [--write-every 50]
+"""
+import argparse
+import random
+import time
+
+from lib.bench.aio import SEARCH_TERMS
+from lib.bench.harness import quiet, environment, write_report, percentile
+from lib.bench.models import collection_shape
+from lib.db.seed import generate_database, NAME_WORDS, TITLE_NOUNS
+from lib.models import Session, Platform, Genre, Developer, Publisher, Game, query_cache
+
+LOOKUP_MODELS = [Platform, Genre, Developer, Publisher]
+KINDS = [("find_by_title", 0.25), ("search", 0.2), ("filter", 0.25), ("page", 0.2), ("lookups", 0.1)]
+LETTERS = "ABCDEFGHIJKLMNOPRSTW"
+
+
+def skewed(rng, choices):
+    """Picks from `choices` with a roughly Zipf-like skew towards the first entries."""
+    return choices[min(int(rng.expovariate(0.35)), len(choices) - 1)]
+
+
+def workload(count, write_every, game_ids, genre_ids, seed):
+    """A reproducible list of (kind, args) operations."""
+    rng = random.Random(seed)
+    terms = [f"{word} {noun}" for word in NAME_WORDS for noun in TITLE_NOUNS]
+    rng.shuffle(terms)
+    names, weights = zip(*KINDS)
+    operations = []
+    for index in range(1, count + 1):
+        if write_every and index % write_every == 0:
+            operations.append(("write", (rng.choice(game_ids), rng.randint(1, 5))))
+            continue
+        kind = rng.choices(names, weights)[0]
+        if kind == "find_by_title":
+            operations.append((kind, (skewed(rng, terms),)))
+        elif kind == "search":
+            operations.append((kind, (skewed(rng, SEARCH_TERMS),)))
+        elif kind == "filter":
+            operations.append((kind, (skewed(rng, genre_ids),)))
+        elif kind == "page":
+            operations.append((kind, (skewed(rng, LETTERS),)))
+        else:
+            operations.append((kind, (skewed(rng, LOOKUP_MODELS),)))
+    return operations
+
+
+def run_operation(session, kind, args):
+    if kind == "find_by_title":
+        return [game.id for game in Game.find_by_title(session, *args)]
+    if kind == "search":
+        return Game.search_rows(session, *args, limit=20)
+    if kind == "filter":
+        return Game.rows(session, genre_id=args[0], min_rating=4, sort="rating", descending=True, limit=50)
+    if kind == "page":
+        return Game.rows(session, after=(args[0], 0), limit=50)
+    if kind == "lookups":
+        return args[0].rows(session, counts=True)
+    game_id, rating = args
+    return Game.find_by_id(session, game_id).update(session, rating=rating)
+
+
+def run(operations, cached, check_every):
+    query_cache.invalidate()
+    query_cache.reset_stats()
+    query_cache.enabled = cached
+    latencies = {}
+    mismatches = checks = 0
+    for index, (kind, args) in enumerate(operations):
+        session = Session()
+        operation_start = time.perf_counter()
+        result = run_operation(session, kind, args)
+        latencies.setdefault(kind, []).append((time.perf_counter() - operation_start) * 1000)
+        if cached and check_every and kind != "write" and index % check_every == 0:
+            query_cache.enabled = False
+            expected = run_operation(session, kind, args)
+            query_cache.enabled = True
+            checks += 1
+            mismatches += result != expected
+        session.close()
+    everything = [latency for samples in latencies.values() for latency in samples]
+    report = {
+        "seconds": sum(everything) / 1000, # the verification reads are not timed
+        "p50_ms": percentile(everything, 50),
+        "p95_ms": percentile(everything, 95),
+        "kinds": {kind: {"calls": len(samples), "p50_ms": percentile(samples, 50), "p95_ms": percentile(samples, 95)}
+                  for kind, samples in latencies.items()},
+    }
+    if cached:
+        report["cache"] = query_cache.stats()
+        report["checks"] = checks
+        report["stale_results_served"] = mismatches
+    query_cache.enabled = True
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the versioned query-result cache.")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--operations", type=int, default=3000)
+    parser.add_argument("--write-every", type=int, default=50)
+    parser.add_argument("--check-every", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_query_cache.json")
+    args = parser.parse_args(argv)
+
+    with quiet():
+        generate_database(seed=args.seed, **collection_shape(args.games))
+    session = Session()
+    game_ids = [row.id for row in Game.rows(session, limit=5000)]
+    genre_ids = [row.id for row in Genre.rows(session)]
+    session.close()
+    operations = workload(args.operations, args.write_every, game_ids, genre_ids, args.seed)
+
+    results = {"uncached": run(operations, False, 0), "cached": run(operations, True, args.check_every)}
+    print(f"{'kind':<14} {'calls':>6} {'uncached p50':>13} {'cached p50':>11} {'uncached p95':>13} {'cached p95':>11}")
+    for kind, uncached in results["uncached"]["kinds"].items():
+        cached = results["cached"]["kinds"][kind]
+        print(f"{kind:<14} {uncached['calls']:>6} {uncached['p50_ms']:>13.2f} {cached['p50_ms']:>11.2f} "
+              f"{uncached['p95_ms']:>13.2f} {cached['p95_ms']:>11.2f}")
+    cache = results["cached"]["cache"]
+    print(f"\ntotal: {results['uncached']['seconds']:.2f} s uncached, {results['cached']['seconds']:.2f} s cached")
+    print(f"hit ratio {cache['hit_ratio']:.0%} ({cache['hits']} hits, {cache['misses']} misses, "
+          f"{cache['stale']} stale), time saved by the cache's count: {cache['saved_seconds']:.2f} s")
+    print(f"verification: {results['cached']['checks']} reads re-run uncached, "
+          f"{results['cached']['stale_results_served']} differed")
+    write_report({"environment": environment(), "games": args.games, "operations": args.operations,
+                  "write_every": args.write_every, "results": results}, args.output)
+
+
+if __name__ == '__main__':
+    main()
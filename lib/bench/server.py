@@ -0,0 +1,235 @@
+# lib/bench/server.py
+"""
+Load test for the JSON HTTP API (lib/server.py).
+
+By default a synthetic collection is generated into gameshelf_bench.db and a server is
+started on it in a subprocess (`python -m lib.cli serve`), so client and server do not share
+a GIL. Pass `--url` to test an instance that is already running instead; nothing is
+generated then, and writes are only sent if `--write-ratio` is set.
+
+Keep-alive client connections send a reproducible mix of requests for `--duration` seconds:
+
+    show      GET /games/<id>               search   GET /games/search?q=..
+    page      GET /games?after_title=..     filter   GET /games?genre_id=..&sort=rating&desc=1
+    lookups   GET /genres, /developers ...  write    PATCH /games/<id> {"rating": ..}
+
+Requests per second and p50/p95/p99 latency are reported overall and per kind, followed by
+one full `GET /games.jsonl` stream (rows and MB per second).
+
+Usage:
+    python -m lib.bench.server [--games 100000] [--connections 16] [--duration 10] [--workers 8]
+    python -m lib.bench.server --url http://127.0.0.1:8765 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import quote, urlsplit
+
+from lib.bench.aio import SEARCH_TERMS
+from lib.bench.harness import quiet, environment, write_report, percentile
+from lib.db.seed import generate_database
+
+LOOKUP_PATHS = ["/platforms", "/genres", "/developers", "/publishers"]
+LETTERS = "ABCDEFGHIJKLMNOPRSTW"
+
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client: one request at a time, Content-Length or chunked bodies."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None):
+        """Returns (status, body bytes)."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        headers = dict(line.lower().split(": ", 1) for line in header_lines if ": " in line)
+        if headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int(await self.reader.readuntil(b"\r\n"), 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if not size:
+                    break
+                chunks.append(chunk[:-2])
+            data = b"".join(chunks)
+        else:
+            data = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection") == "close":
+            self.close()
+        return int(status_line.split(" ")[1]), data
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+def request_for(rng, kind, game_ids, genre_ids):
+    """(method, path, payload) for one request of the given kind."""
+    if kind == "show":
+        return "GET", f"/games/{rng.choice(game_ids)}", None
+    if kind == "search":
+        return "GET", f"/games/search?q={quote(rng.choice(SEARCH_TERMS))}&limit=20", None
+    if kind == "page":
+        return "GET", f"/games?limit=50&after_title={rng.choice(LETTERS)}", None
+    if kind == "filter":
+        return "GET", f"/games?genre_id={rng.choice(genre_ids)}&min_rating=4&sort=rating&desc=1&limit=50", None
+    if kind == "lookups":
+        return "GET", rng.choice(LOOKUP_PATHS), None
+    return "PATCH", f"/games/{rng.choice(game_ids)}", {"rating": rng.randint(1, 5)}
+
+
+def request_kinds(write_ratio):
+    """(kind, weight) pairs of the request mix."""
+    reads = [("show", 0.3), ("search", 0.25), ("page", 0.2), ("filter", 0.15), ("lookups", 0.1)]
+    return [(kind, weight * (1 - write_ratio)) for kind, weight in reads] + [("write", write_ratio)]
+
+
+async def client(host, port, deadline, kinds, game_ids, genre_ids, samples, seed):
+    rng = random.Random(seed)
+    names, weights = zip(*kinds)
+    connection = Connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            kind = rng.choices(names, weights)[0]
+            method, path, payload = request_for(rng, kind, game_ids, genre_ids)
+            start = time.perf_counter()
+            status, _ = await connection.request(method, path, payload)
+            samples.append((kind, (time.perf_counter() - start) * 1000, status))
+    finally:
+        connection.close()
+
+
+def summarize(samples, seconds):
+    latencies = [latency for _, latency, _ in samples]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, _, status in samples if status >= 400),
+        "requests_per_second": len(samples) / seconds,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+async def load_test(host, port, connections, duration, write_ratio):
+    setup = Connection(host, port)
+    _, listing = await setup.request("GET", "/games?limit=1000")
+    game_ids = [game["id"] for game in json.loads(listing)["games"]]
+    _, genres = await setup.request("GET", "/genres")
+    genre_ids = [genre["id"] for genre in json.loads(genres)]
+    setup.close()
+
+    samples = []
+    kinds = request_kinds(write_ratio)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, start + duration, kinds, game_ids, genre_ids, samples, seed)
+        for seed in range(connections)
+    ))
+    seconds = time.perf_counter() - start
+    results = {"overall": summarize(samples, seconds)}
+    for kind, _ in kinds:
+        kind_samples = [sample for sample in samples if sample[0] == kind]
+        if kind_samples:
+            results[kind] = summarize(kind_samples, seconds)
+
+    stream = Connection(host, port)
+    start = time.perf_counter()
+    _, body = await stream.request("GET", "/games.jsonl")
+    seconds = time.perf_counter() - start
+    stream.close()
+    rows = body.count(b"\n")
+    results["stream"] = {"rows": rows, "seconds": seconds, "rows_per_second": rows / seconds,
+                         "mb_per_second": len(body) / seconds / 1e6}
+    return results
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_server(port, workers):
+    """Starts `python -m lib.cli serve` on the bench database and waits until it accepts connections."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "lib.cli", "serve", "--port", str(port), "--workers", str(workers)],
+        env=dict(os.environ), stdout=subprocess.DEVNULL,
+    )
+    for _ in range(300):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("The server exited during startup.")
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("The server did not start listening.")
+
+
+def print_results(results):
+    print(f"{'kind':<10} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for kind, metrics in results.items():
+        if kind == "stream":
+            continue
+        print(f"{kind:<10} {metrics['requests']:>9,} {metrics['errors']:>7} {metrics['requests_per_second']:>9,.0f} "
+              f"{metrics['p50_ms']:>9.2f} {metrics['p95_ms']:>9.2f} {metrics['p99_ms']:>9.2f}")
+    stream = results["stream"]
+    print(f"stream: {stream['rows']:,} rows in {stream['seconds']:.2f} s "
+          f"({stream['rows_per_second']:,.0f} rows/s, {stream['mb_per_second']:.1f} MB/s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the GameShelf JSON HTTP API.")
+    parser.add_argument("--url", help="Test a running server instead of starting one on gameshelf_bench.db.")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=8, help="Read threads of the started server.")
+    parser.add_argument("--write-ratio", type=float, help="Share of PATCH requests (default 0.02; 0 with --url).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_server.json")
+    args = parser.parse_args(argv)
+    write_ratio = args.write_ratio if args.write_ratio is not None else (0.0 if args.url else 0.02)
+
+    process = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        with quiet():
+            generate_database(seed=args.seed, games=args.games, developers=max(10, args.games // 50))
+        host, port = "127.0.0.1", free_port()
+        process = start_server(port, args.workers)
+    try:
+        results = asyncio.run(load_test(host, port, args.connections, args.duration, write_ratio))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print_results(results)
+    write_report({"environment": environment(), "url": args.url, "games": None if args.url else args.games,
+                  "connections": args.connections, "workers": args.workers, "write_ratio": write_ratio,
+                  "results": results}, args.output)
+
+
+if __name__ == '__main__':
+    main()
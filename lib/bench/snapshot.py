@@ -0,0 +1,146 @@
+# lib/bench/snapshot.py
+"""
+Compares dashboard-style reads through `session.query(Game)` with the same reads on a
+GameSnapshot (lib.models.snapshot).
+
+For every size a synthetic collection is generated into gameshelf_bench.db. Each read is
+then timed both ways:
+
+- loading the whole table;
+- a genre + year range + rating filter;
+- games and average rating per genre;
+- the top 50 of that filter by rating;
+- refreshing the snapshot when nothing changed, and after one insert.
+
+Peak memory is reported as well. The ORM side uses plain queries and Python over the
+returned objects, which is how the dashboards did it before.
+
+The query-result cache (lib.models.query_cache) is disabled for the run, so repeated
+iterations time the queries themselves rather than cache hits.
+
+Usage:
+    python -m lib.bench.snapshot [--sizes 100000 1000000] [--output bench_snapshot.json]
+"""
+import argparse
+from collections import defaultdict
+
+from lib.bench.harness import measure, quiet, environment, write_report, print_table
+from lib.bench.models import collection_shape, iterations_for
+from lib.db.seed import generate_database
+from lib.models import engine, query_cache, Session, Platform, Genre, Game, GameSnapshot
+
+FILTERS = {"genre_id": 2, "year_from": 2000, "year_to": 2015, "min_rating": 4}
+
+
+def orm_filter(session):
+    return (
+        session.query(Game)
+        .filter(Game.genre_id == FILTERS["genre_id"],
+                Game._release_year.between(FILTERS["year_from"], FILTERS["year_to"]),
+                Game._rating >= FILTERS["min_rating"])
+        .all()
+    )
+
+
+def orm_group_by_genre(session):
+    groups = defaultdict(lambda: [0, 0, 0]) # games, rated games, rating sum
+    for game in session.query(Game):
+        group = groups[game.genre_id]
+        group[0] += 1
+        if game.rating is not None:
+            group[1] += 1
+            group[2] += game.rating
+    return {genre_id: (games, rating_sum / rated if rated else None)
+            for genre_id, (games, rated, rating_sum) in groups.items()}
+
+
+def orm_top_rated(session):
+    return (
+        session.query(Game)
+        .filter(Game.genre_id == FILTERS["genre_id"],
+                Game._release_year.between(FILTERS["year_from"], FILTERS["year_to"]),
+                Game._rating >= FILTERS["min_rating"])
+        .order_by(Game._rating.desc(), Game._title, Game.id)
+        .limit(50)
+        .all()
+    )
+
+
+def insert_one(snapshot):
+    session = Session()
+    Game.create(session, "Snapshot Bench", session.get(Platform, 1), session.get(Genre, 1), 2020, 4)
+    session.close()
+    return snapshot
+
+
+def operations(size, snapshot):
+    """Returns {name: (operation, iterations, setup, teardown)}, ORM and snapshot side by side."""
+    whole = iterations_for(size, False)
+
+    def fresh_session():
+        return Session()
+
+    def close(session, _):
+        session.close()
+
+    def loaded():
+        return snapshot
+
+    def refresh(current):
+        session = Session()
+        try:
+            return current.refresh(session)
+        finally:
+            session.close()
+
+    return {
+        "orm: load all": (lambda s: s.query(Game).all(), whole, fresh_session, close),
+        "snapshot: load": (lambda s: GameSnapshot.load(s), whole, fresh_session, close),
+        "orm: filter": (orm_filter, whole, fresh_session, close),
+        "snapshot: filter": (lambda snap: snap.filter(**FILTERS), 20, loaded, None),
+        "orm: group by genre": (orm_group_by_genre, whole, fresh_session, close),
+        "snapshot: group by genre": (lambda snap: snap.group_by("genre_id"), 20, loaded, None),
+        "orm: top 50 by rating": (orm_top_rated, whole, fresh_session, close),
+        "snapshot: top 50 by rating": (
+            lambda snap: snap.sort(snap.filter(**FILTERS), "rating", descending=True, limit=50), 20, loaded, None,
+        ),
+        "snapshot: refresh (current)": (refresh, 20, loaded, None),
+        "snapshot: refresh (1 insert)": (refresh, 5, lambda: insert_one(snapshot), None),
+    }
+
+
+def run_size(size, seed=42):
+    print(f"\n=== {size} games ===")
+    with quiet():
+        generate_database(seed=seed, **collection_shape(size))
+    session = Session()
+    snapshot = GameSnapshot.load(session)
+    session.close()
+    print(f"  snapshot columns hold ~{snapshot.nbytes() / 1024:,.0f} KiB ({snapshot.nbytes() / size:.0f} bytes/game)")
+
+    results = {}
+    for name, (operation, iterations, setup, teardown) in operations(size, snapshot).items():
+        results[name] = measure(engine, operation, iterations, setup, teardown)
+        print(f"  {name:<32} p50 {results[name]['p50_ms']:>10.3f} ms  peak {results[name]['peak_memory_kib']:>11,.1f} KiB")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the columnar snapshot against ORM queries.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_snapshot.json")
+    args = parser.parse_args(argv)
+
+    query_cache.enabled = False
+    try:
+        results = {size: run_size(size, args.seed) for size in args.sizes}
+    finally:
+        query_cache.enabled = True
+    print()
+    print_table(results)
+    write_report({"environment": environment(), "results": results}, args.output)
+
+
+if __name__ == '__main__':
+    main()
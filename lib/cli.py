@@ -1,10 +1,35 @@
+import sys
+import time
+
+# Startup phases are timed for `--startup-profile`. Only what the menus need is imported
+# here; anything else (seeding, importing, benchmarks) is imported where it is used.
+_startup_phases = []
+_startup_clock = time.perf_counter()
+
+def mark_startup_phase(name):
+    """Records the time since the previous mark under `name`."""
+    global _startup_clock
+    now = time.perf_counter()
+    _startup_phases.append((name, (now - _startup_clock) * 1000))
+    _startup_clock = now
+
+def print_startup_profile():
+    total = sum(ms for _, ms in _startup_phases)
+    print("\n--- Startup profile (interpreter start not included) ---")
+    for name, ms in _startup_phases:
+        print(f"  {name:<34} {ms:8.1f} ms")
+    print(f"  {'total':<34} {total:8.1f} ms")
+
 import lib.models
-from lib.db.seed import seed_database
+mark_startup_phase("import lib.models (SQLAlchemy)")
 from lib.helpers import (
     exit_program, get_string_input, get_int_input,
     display_platforms, display_genres, display_developers, display_publishers,
-    display_games, select_model_instance
+    display_games, browse_games, select_model_instance, display_facets,
+    display_stats_summary, display_year_histogram, display_duplicates, display_cache_stats
 )
+from lib.models.profiler import profiler, profiled
+mark_startup_phase("import lib.helpers")
 
 def main_menu(session):
     while True:
@@ -14,6 +39,7 @@ def main_menu(session):
         print("3. Manage Genres")
         print("4. Manage Developers")
         print("5. Manage Publishers")
+        print("6. Statistics")
         print("0. Exit Program")
         choice = input("> ")
 
@@ -27,11 +53,62 @@ def main_menu(session):
             manage_simple_model_menu(session, lib.models.Developer, "Developer", display_developers)
         elif choice == "5":
             manage_simple_model_menu(session, lib.models.Publisher, "Publisher", display_publishers)
+        elif choice == "6":
+            stats_menu(session)
         elif choice == "0":
             exit_program()
         else:
             print("Invalid choice. Please try again.")
 
+def stats_menu(session):
+    stats = lib.models.stats
+    while True:
+        print("\n--- Statistics ---")
+        print("1. Collection Overview")
+        print("2. By Platform")
+        print("3. By Genre")
+        print("4. Top Developers")
+        print("5. Top Publishers")
+        print("6. Release Years")
+        print("7. Rebuild and Verify")
+        print("8. Possible Duplicates")
+        print("9. Query Cache")
+        print("0. Back to Main Menu")
+        choice = input("> ")
+
+        if choice == "1":
+            overview = stats.overview(session)
+            average = f"{overview['average_rating']:.2f}" if overview["average_rating"] is not None else "N/R"
+            print(f"\nGames: {overview['games']} | Rated: {overview['rated_games']} | Average rating: {average}")
+        elif choice == "2":
+            display_stats_summary(stats.summary(session, "platform"), "Platforms")
+        elif choice == "3":
+            display_stats_summary(stats.summary(session, "genre"), "Genres")
+        elif choice == "4":
+            display_stats_summary(stats.summary(session, "developer", limit=20), "Top 20 Developers")
+        elif choice == "5":
+            display_stats_summary(stats.summary(session, "publisher", limit=20), "Top 20 Publishers")
+        elif choice == "6":
+            display_year_histogram(stats.year_histogram(session))
+        elif choice == "7":
+            stats.rebuild(session)
+            session.commit()
+            differences = stats.verify(session)
+            print("Statistics rebuilt and verified." if not differences else f"{len(differences)} differences remain!")
+        elif choice == "8":
+            kinds = list(lib.models.similarity.SOURCES)
+            kind = input(f"Check which names ({'/'.join(kinds)}, default game): ").strip().lower() or "game"
+            if kind not in kinds:
+                print(f"Unknown choice '{kind}'.")
+                continue
+            display_duplicates(lib.models.similarity.duplicate_candidates(session, kind, limit=50))
+        elif choice == "9":
+            display_cache_stats(lib.models.query_cache.stats())
+        elif choice == "0":
+            break
+        else:
+            print("Invalid choice.")
+
 def games_menu(session):
     while True:
         print("\n--- Manage Games ---")
@@ -41,11 +118,13 @@ def games_menu(session):
         print("4. Find Games by Title")
         print("5. Update Game")
         print("6. Delete Game")
+        print("7. Filter Games")
+        print("8. Bulk Edit Games")
         print("0. Back to Main Menu")
         choice = input("> ")
 
         if choice == "1":
-            display_games(session)
+            browse_games(session)
         elif choice == "2":
             add_new_game(session)
         elif choice == "3":
@@ -56,11 +135,16 @@ def games_menu(session):
             update_game_action(session)
         elif choice == "6":
             delete_game_action(session)
+        elif choice == "7":
+            filter_games_action(session)
+        elif choice == "8":
+            bulk_edit_games_action(session)
         elif choice == "0":
             break
         else:
             print("Invalid choice.")
 
+@profiled
 def add_new_game(session):
     print("\n--- Add New Game ---")
     title = get_string_input("Enter game title: ", max_len=150)
@@ -117,23 +201,99 @@ def select_or_create_related_model(session, model_class, model_name, optional=Fa
                 return None
 
 
+@profiled
 def find_game_by_id_action(session):
     game_id = get_int_input("Enter Game ID to find: ")
     if game_id is not None:
-        game = lib.models.Game.find_by_id(session, game_id)
-        if game:
-            display_games(session, [game])
+        games = lib.models.Game.rows(session, game_ids=[game_id])
+        if games:
+            display_games(session, games)
         else:
             print(f"No game found with ID {game_id}.")
 
+@profiled
 def find_games_by_title_action(session):
-    search_term = get_string_input("Enter title (or part of title) to search for: ")
-    games = lib.models.Game.find_by_title(session, search_term)
+    search_term = get_string_input("Enter title words (or their beginnings) to search for: ")
+    games = lib.models.Game.search_rows(session, search_term)
     if games:
         display_games(session, games)
-    else:
-        print(f"No games found with title containing '{search_term}'.")
+        return
+    print(f"No games found matching '{search_term}'.")
+    suggestions = lib.models.Game.find_similar(session, search_term)
+    if suggestions:
+        print("Did you mean:")
+        for game_id, title, score in suggestions:
+            print(f"  ID: {game_id} | {title} ({score:.0%} match)")
             
+def prompt_game_filters():
+    """Asks for the Game.filter keyword filters; blank answers are left out (None)."""
+    print("Leave input blank to skip a filter.")
+    return {
+        "platform_id": get_int_input("Platform ID: ", min_val=1, allow_empty=True),
+        "genre_id": get_int_input("Genre ID: ", min_val=1, allow_empty=True),
+        "year_from": get_int_input("Released from year: ", allow_empty=True),
+        "year_to": get_int_input("Released up to year: ", allow_empty=True),
+        "min_rating": get_int_input("Minimum rating (1-5): ", min_val=1, max_val=5, allow_empty=True),
+    }
+
+@profiled
+def filter_games_action(session):
+    print("\n--- Filter Games ---")
+    display_facets(lib.models.Game.facets(session))
+    filters = prompt_game_filters()
+    sort = input(f"Sort by ({'/'.join(lib.models.game.FILTER_SORTS)}, default title): ").strip().lower() or "title"
+    if sort not in lib.models.game.FILTER_SORTS:
+        print(f"Unknown sort '{sort}', sorting by title.")
+        sort = "title"
+    descending = input("Descending? (y/n, default n): ").strip().lower() == "y"
+    limit = get_int_input("Show at most (default 20): ", min_val=1, allow_empty=True) or 20
+
+    games = lib.models.Game.rows(session, sort=sort, descending=descending, limit=limit, **filters)
+    display_games(session, games)
+    display_facets(lib.models.Game.facets(session, **filters))
+
+@profiled
+def bulk_edit_games_action(session):
+    print("\n--- Bulk Edit Games ---")
+    print("Choose which games to change.")
+    filters = prompt_game_filters()
+    if not any(value is not None for value in filters.values()):
+        print("No filters given; bulk edits never change every game.")
+        return
+    matching = lib.models.Game.count(session, **filters)
+    print(f"{matching} games match.")
+    if matching == 0:
+        return
+    print("1. Set rating")
+    print("2. Set release year")
+    print("3. Move to another platform")
+    print("4. Change genre")
+    print("5. Delete them")
+    choice = input("> ")
+    if choice == "1":
+        values = {"rating": get_int_input("New rating (1-5, blank to clear): ", allow_empty=True)}
+    elif choice == "2":
+        values = {"release_year": get_int_input("New release year (blank to clear): ", allow_empty=True)}
+    elif choice == "3":
+        values = {"platform_id": get_int_input("New platform ID: ", min_val=1)}
+    elif choice == "4":
+        values = {"genre_id": get_int_input("New genre ID: ", min_val=1)}
+    elif choice == "5":
+        if input(f"Delete {matching} games? This cannot be undone. (yes/no): ").strip().lower() == "yes":
+            deleted = lib.models.Game.bulk_delete(session, filters)
+            if deleted is not None:
+                print(f"Deleted {deleted} games.")
+        else:
+            print("Deletion cancelled.")
+        return
+    else:
+        print("Invalid choice.")
+        return
+    updated = lib.models.Game.bulk_update(session, filters, **values)
+    if updated is not None:
+        print(f"Updated {updated} games.")
+
+@profiled
 def update_game_action(session):
     game_id = get_int_input("Enter ID of the game to update: ")
     game = lib.models.Game.find_by_id(session, game_id)
@@ -212,6 +372,7 @@ def update_game_action(session):
         print(f"Failed to update game '{game.title}'. Check validation errors.")
 
 
+@profiled
 def delete_game_action(session):
     game_id = get_int_input("Enter ID of the game to delete: ")
     game = lib.models.Game.find_by_id(session, game_id)
@@ -237,6 +398,8 @@ def manage_simple_model_menu(session, model_class, model_name, display_func):
         print(f"3. Find {model_name} by ID")
         print(f"5. Update {model_name}")
         print(f"6. Delete {model_name}")
+        print(f"7. Move All Games to Another {model_name}")
+        print(f"8. Merge Into Another {model_name}")
         print("0. Back to Main Menu")
         choice = input("> ")
 
@@ -254,9 +417,7 @@ def manage_simple_model_menu(session, model_class, model_name, display_func):
             if item_id is not None:
                 instance = model_class.find_by_id(session, item_id)
                 if instance:
-                    game_count = 0
-                    if hasattr(instance, 'games') and instance.games is not None:
-                        game_count = len(instance.games)
+                    game_count = instance.count_games(session)
                     print(f"Found: ID: {instance.id} | Name: {instance.name} | Games: {game_count}")
                 else:
                     print(f"No {model_name} found with ID {item_id}.")
@@ -285,19 +446,48 @@ def manage_simple_model_menu(session, model_class, model_name, display_func):
                     print("Deletion cancelled.")
             else:
                 print(f"{model_name} with ID {item_id} not found.")
+        elif choice in ("7", "8"):
+            source = model_class.find_by_id(session, get_int_input(f"Enter ID of the {model_name} to move games from: "))
+            target = model_class.find_by_id(session, get_int_input(f"Enter ID of the {model_name} to move them to: "))
+            if not source or not target:
+                print(f"{model_name} not found.")
+            elif choice == "7":
+                moved = source.reassign_games(session, target)
+                if moved is not None:
+                    print(f"Moved {moved} game(s) from '{source.name}' to '{target.name}'.")
+            else:
+                source_name = source.name
+                confirm = input(f"Merge '{source_name}' into '{target.name}' and delete '{source_name}'? (yes/no): ").lower()
+                if confirm == 'yes':
+                    moved = source.merge_into(session, target)
+                    if moved is not None:
+                        print(f"Merged '{source_name}' into '{target.name}' ({moved} game(s) moved).")
+                else:
+                    print("Merge cancelled.")
         elif choice == "0":
             break
         else:
             print("Invalid choice.")
 
+MENU_FLAGS = {"--startup-profile", "--profile-sql"}
+
+if __name__ == "__main__" and not set(sys.argv[1:]) <= MENU_FLAGS:
+    # Subcommands (e.g. `games list --format json`) run without the menus; Click exits when done
+    from lib.commands import gameshelf
+    gameshelf(prog_name="gameshelf")
+
 if __name__ == "__main__":
     print("Initializing GameShelf...")
     try:
-        print("DEBUG: About to call lib.models.create_tables()")
-        lib.models.create_tables() 
-        print("DEBUG: lib.models.create_tables() called.")
-        
-        db_session = lib.models.Session() 
+        ran_ddl = lib.models.ensure_schema()
+        mark_startup_phase("schema (DDL run)" if ran_ddl else "schema check (current, DDL skipped)")
+
+        db_session = lib.models.Session()
+        mark_startup_phase("open session")
+        if "--startup-profile" in sys.argv[1:]:
+            print_startup_profile()
+        if "--profile-sql" in sys.argv[1:]:
+            profiler.enable(lib.models.engine) # report is printed on exit
         print("Welcome to GameShelf!")
         main_menu(db_session)
     except AttributeError as e:
@@ -310,3 +500,5 @@ if __name__ == "__main__":
         if 'db_session' in locals() and db_session:
             db_session.close()
             print("Database session closed.")
+        if profiler.enabled:
+            profiler.print_report()
@@ -0,0 +1,571 @@
+# lib/commands.py
+"""
+Non-interactive subcommand interface for scripts and automation.
+
+    python -m lib.cli games list --format jsonl
+    python -m lib.cli games add --title "Hades" --platform PC --genre Roguelike --year 2020 --rating 5
+    python -m lib.cli games search "witcher" --limit 5 --format json
+    python -m lib.cli games filter --genre RPG --year-from 2015 --min-rating 4 --sort rating --desc
+    python -m lib.cli games bulk-update --platform "Wii U" --year-to 2012 --set-platform "Nintendo Switch" --yes
+    python -m lib.cli games update 12 --rating 4
+    python -m lib.cli games delete 12 --yes
+    python -m lib.cli platforms list --format csv
+    python -m lib.cli genres merge 14 3 --yes          # move genre 14's games to 3, delete 14
+    python -m lib.cli --profile-sql games search "zelda"    # SQL profile on stderr
+    python -m lib.cli serve --port 8765                     # JSON HTTP API (lib/server.py)
+
+Every command goes through the same model classmethods as the menus. Listings are
+written row by row as they are read from the database, so memory use does not grow with
+the collection and output starts immediately.
+"""
+import contextlib
+import csv
+import json
+import sys
+
+import click
+
+import lib.models
+
+FORMATS = ["table", "json", "jsonl", "csv"]
+GAME_COLUMNS = ["id", "title", "release_year", "rating", "platform", "genre", "developer", "publisher"]
+LOOKUP_COLUMNS = ["id", "name", "games"]
+FACET_COLUMNS = ["facet", "value", "games"]
+DUPLICATE_COLUMNS = ["score", "id", "name", "other_id", "other_name"]
+# Fixed widths so the table can be printed before all rows are known
+TABLE_WIDTHS = {"id": 8, "title": 40, "release_year": 12, "rating": 6, "platform": 18, "genre": 14,
+                "developer": 24, "publisher": 24, "name": 40, "games": 8, "facet": 10, "value": 40,
+                "rated_games": 12, "average_rating": 14, "score": 6, "other_id": 8, "other_name": 40}
+STREAM_CHUNK = 1000
+
+
+def write_rows(rows, columns, output_format, out=None):
+    """Streams an iterable of dicts to `out` (stdout by default) in the requested format."""
+    out = out or sys.stdout
+    if output_format == "jsonl":
+        for row in rows:
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+    elif output_format == "json":
+        out.write("[")
+        for index, row in enumerate(rows):
+            out.write(("," if index else "") + "\n  " + json.dumps(row, ensure_ascii=False))
+        out.write("\n]\n")
+    elif output_format == "csv":
+        writer = csv.DictWriter(out, fieldnames=columns, lineterminator="\n")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+    else:
+        out.write(" ".join(f"{column:<{TABLE_WIDTHS[column]}}" for column in columns).rstrip() + "\n")
+        for row in rows:
+            cells = []
+            for column in columns:
+                value = "" if row[column] is None else str(row[column])
+                width = TABLE_WIDTHS[column]
+                cells.append(f"{value[:width]:<{width}}")
+            out.write(" ".join(cells).rstrip() + "\n")
+
+
+def game_row(game):
+    return {
+        "id": game.id,
+        "title": game.title,
+        "release_year": game.release_year,
+        "rating": game.rating,
+        "platform": game.platform.name if game.platform else None,
+        "genre": game.genre.name if game.genre else None,
+        "developer": game.developer.name if game.developer else None,
+        "publisher": game.publisher.name if game.publisher else None,
+    }
+
+
+def iter_all_games(session, limit=None):
+    """Yields every game as a GameRow in title order, one keyset page at a time, never holding more than a page."""
+    after = None
+    remaining = limit
+    while remaining is None or remaining > 0:
+        page_size = STREAM_CHUNK if remaining is None else min(STREAM_CHUNK, remaining)
+        page = lib.models.Game.rows(session, after=after, limit=page_size, cache=False)
+        if not page:
+            return
+        for game in page:
+            yield game
+        after = (page[-1].title, page[-1].id)
+        if remaining is not None:
+            remaining -= len(page)
+
+
+def model_call(method, *args, **kwargs):
+    """
+    Calls a model method that reports its errors with print(), sending those messages to
+    stderr so stdout only carries the command's own (json/jsonl/csv) output.
+    """
+    with contextlib.redirect_stdout(sys.stderr):
+        return method(*args, **kwargs)
+
+
+format_option = click.option("--format", "output_format", type=click.Choice(FORMATS), default="table",
+                             show_default=True, help="Output format.")
+
+
+@click.group()
+@click.option("--profile-sql", is_flag=True, help="Print an SQL profile and N+1 report to stderr when done.")
+@click.pass_context
+def gameshelf(ctx, profile_sql):
+    """GameShelf - manage a video game collection from the command line."""
+    with contextlib.redirect_stdout(sys.stderr): # keep stdout clean for machine-readable output
+        lib.models.ensure_schema()
+    session = lib.models.Session()
+    ctx.obj = session
+    ctx.call_on_close(session.close)
+    if profile_sql:
+        lib.models.profiler.enable(lib.models.engine)
+        ctx.call_on_close(lambda: lib.models.profiler.print_report(file=sys.stderr))
+
+
+# --- games -----------------------------------------------------------------------------
+
+@gameshelf.group()
+def games():
+    """List, add, search, update and delete games."""
+
+
+@games.command("list")
+@click.option("--limit", type=int, help="Stop after this many games.")
+@format_option
+@click.pass_obj
+def games_list(session, limit, output_format):
+    """List games ordered by title."""
+    write_rows((game._asdict() for game in iter_all_games(session, limit)), GAME_COLUMNS, output_format)
+
+
+@games.command("show")
+@click.argument("game_id", type=int)
+@format_option
+@click.pass_obj
+def games_show(session, game_id, output_format):
+    """Show one game by ID."""
+    found = lib.models.Game.rows(session, game_ids=[game_id])
+    if not found:
+        raise click.ClickException(f"No game found with ID {game_id}.")
+    write_rows((game._asdict() for game in found), GAME_COLUMNS, output_format)
+
+
+@games.command("search")
+@click.argument("query")
+@click.option("--limit", type=int, default=50, show_default=True)
+@format_option
+@click.pass_obj
+def games_search(session, query, limit, output_format):
+    """Full-text title search, best matches first."""
+    results = lib.models.Game.search_rows(session, query, limit=limit)
+    write_rows((game._asdict() for game in results), GAME_COLUMNS, output_format)
+
+
+def filter_options(command):
+    """Adds the --platform/--genre/--year-from/--year-to/--min-rating game filters to a command."""
+    options = [
+        click.option("--platform", "platform_name", help="Only games on this platform."),
+        click.option("--genre", "genre_name", help="Only games of this genre."),
+        click.option("--year-from", type=int),
+        click.option("--year-to", type=int),
+        click.option("--min-rating", type=click.IntRange(1, 5)),
+    ]
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+
+def build_filters(session, platform_name, genre_name, year_from, year_to, min_rating, game_ids=()):
+    """Turns filter options into Game.filter / bulk operation keyword filters."""
+    filters = {
+        "platform_id": resolve_lookup(session, lib.models.Platform, platform_name, False).id if platform_name else None,
+        "genre_id": resolve_lookup(session, lib.models.Genre, genre_name, False).id if genre_name else None,
+        "year_from": year_from, "year_to": year_to, "min_rating": min_rating,
+    }
+    if game_ids:
+        filters["game_ids"] = list(game_ids)
+    return filters
+
+
+@games.command("filter")
+@filter_options
+@click.option("--sort", type=click.Choice(lib.models.game.FILTER_SORTS), default="title", show_default=True)
+@click.option("--desc", "descending", is_flag=True, help="Sort in descending order.")
+@click.option("--limit", type=int, default=50, show_default=True)
+@click.option("--facets", "show_facets", is_flag=True, help="Print facet counts instead of games.")
+@format_option
+@click.pass_obj
+def games_filter(session, platform_name, genre_name, year_from, year_to, min_rating, sort, descending, limit,
+                 show_facets, output_format):
+    """Combine filters on platform, genre, release years and rating."""
+    filters = build_filters(session, platform_name, genre_name, year_from, year_to, min_rating)
+    if show_facets:
+        facets = lib.models.Game.facets(session, **filters)
+        rows = [{"facet": facet, "value": name, "games": count}
+                for facet in ("platform", "genre") for _, name, count in facets[facet]]
+        rows += [{"facet": "year", "value": decade, "games": count} for decade, count in facets["year"]]
+        write_rows(rows, FACET_COLUMNS, output_format)
+        return
+    results = lib.models.Game.rows(session, sort=sort, descending=descending, limit=limit, **filters)
+    write_rows((game._asdict() for game in results), GAME_COLUMNS, output_format)
+
+
+def confirm_bulk(session, filters, action, yes):
+    """Shows how many games `filters` match and asks before changing them."""
+    if not any(value is not None for value in filters.values()):
+        raise click.ClickException("Give at least one filter; bulk commands never change every game.")
+    matching = lib.models.Game.count(session, **filters)
+    if matching == 0:
+        raise click.ClickException("No games match these filters.")
+    if not yes:
+        click.confirm(f"{action} {matching} games?", abort=True)
+
+
+@games.command("bulk-update")
+@filter_options
+@click.option("--id", "game_ids", type=int, multiple=True, help="Only this game (repeatable).")
+@click.option("--set-title")
+@click.option("--set-year", type=int)
+@click.option("--set-rating", type=int)
+@click.option("--set-platform", help="Platform name.")
+@click.option("--set-genre", help="Genre name.")
+@click.option("--set-developer", help="Developer name.")
+@click.option("--set-publisher", help="Publisher name.")
+@click.option("--yes", is_flag=True, help="Do not ask for confirmation.")
+@click.pass_obj
+def games_bulk_update(session, platform_name, genre_name, year_from, year_to, min_rating, game_ids, set_title,
+                      set_year, set_rating, set_platform, set_genre, set_developer, set_publisher, yes):
+    """Change fields of every matching game with one UPDATE statement."""
+    filters = build_filters(session, platform_name, genre_name, year_from, year_to, min_rating, game_ids)
+    values = {"title": set_title, "release_year": set_year, "rating": set_rating}
+    for column, model_class, name in (
+        ("platform_id", lib.models.Platform, set_platform), ("genre_id", lib.models.Genre, set_genre),
+        ("developer_id", lib.models.Developer, set_developer), ("publisher_id", lib.models.Publisher, set_publisher),
+    ):
+        if name is not None:
+            values[column] = resolve_lookup(session, model_class, name, False).id
+    values = {name: value for name, value in values.items() if value is not None}
+    if not values:
+        raise click.ClickException("Nothing to change; give at least one --set-... option.")
+    confirm_bulk(session, filters, "Update", yes)
+    updated = model_call(lib.models.Game.bulk_update, session, filters, **values)
+    if updated is None:
+        raise click.ClickException("Bulk update failed.")
+    click.echo(f"Updated {updated} games.")
+
+
+@games.command("bulk-delete")
+@filter_options
+@click.option("--id", "game_ids", type=int, multiple=True, help="Only this game (repeatable).")
+@click.option("--yes", is_flag=True, help="Do not ask for confirmation.")
+@click.pass_obj
+def games_bulk_delete(session, platform_name, genre_name, year_from, year_to, min_rating, game_ids, yes):
+    """Delete every matching game with one DELETE statement."""
+    filters = build_filters(session, platform_name, genre_name, year_from, year_to, min_rating, game_ids)
+    confirm_bulk(session, filters, "Delete", yes)
+    deleted = model_call(lib.models.Game.bulk_delete, session, filters)
+    if deleted is None:
+        raise click.ClickException("Bulk delete failed.")
+    click.echo(f"Deleted {deleted} games.")
+
+
+@games.command("similar")
+@click.argument("title")
+@click.option("--threshold", type=click.FloatRange(0, 1), default=0.5, show_default=True)
+@click.option("--limit", type=int, default=10, show_default=True)
+@format_option
+@click.pass_obj
+def games_similar(session, title, threshold, limit, output_format):
+    """Typo-tolerant title lookup, best matches first."""
+    matches = lib.models.Game.find_similar(session, title, threshold, limit)
+    write_rows(({"id": game_id, "title": name, "score": round(score, 3)} for game_id, name, score in matches),
+               ["id", "title", "score"], output_format)
+
+
+def resolve_lookup(session, model_class, name, create_missing):
+    """Finds a lookup row by name, optionally creating it. Returns None for an empty name."""
+    if name is None:
+        return None
+    instance = model_class.find_by_name(session, name)
+    if instance is None and create_missing:
+        instance = model_call(model_class.create, session, name=name)
+    if instance is None:
+        raise click.ClickException(
+            f"{model_class.__name__} '{name}' not found. Use --create-missing to create it."
+        )
+    return instance
+
+
+@games.command("add")
+@click.option("--title", required=True)
+@click.option("--platform", "platform_name", required=True)
+@click.option("--genre", "genre_name", required=True)
+@click.option("--year", "release_year", type=int)
+@click.option("--rating", type=int)
+@click.option("--developer", "developer_name")
+@click.option("--publisher", "publisher_name")
+@click.option("--create-missing", is_flag=True, help="Create platform/genre/developer/publisher if unknown.")
+@format_option
+@click.pass_obj
+def games_add(session, title, platform_name, genre_name, release_year, rating, developer_name,
+              publisher_name, create_missing, output_format):
+    """Add a game; related entities are given by name."""
+    game = model_call(
+        lib.models.Game.create, session, title,
+        resolve_lookup(session, lib.models.Platform, platform_name, create_missing),
+        resolve_lookup(session, lib.models.Genre, genre_name, create_missing),
+        release_year, rating,
+        resolve_lookup(session, lib.models.Developer, developer_name, create_missing),
+        resolve_lookup(session, lib.models.Publisher, publisher_name, create_missing),
+    )
+    if game is None:
+        raise click.ClickException("Failed to add game.")
+    write_rows([game_row(game)], GAME_COLUMNS, output_format)
+
+
+@games.command("update")
+@click.argument("game_id", type=int)
+@click.option("--title")
+@click.option("--platform", "platform_name")
+@click.option("--genre", "genre_name")
+@click.option("--year", "release_year", type=int)
+@click.option("--rating", type=int)
+@click.option("--developer", "developer_name")
+@click.option("--publisher", "publisher_name")
+@click.option("--create-missing", is_flag=True, help="Create platform/genre/developer/publisher if unknown.")
+@format_option
+@click.pass_obj
+def games_update(session, game_id, title, platform_name, genre_name, release_year, rating,
+                 developer_name, publisher_name, create_missing, output_format):
+    """Change fields of a game; options left out keep their current value."""
+    game = lib.models.Game.find_by_id(session, game_id)
+    if game is None:
+        raise click.ClickException(f"No game found with ID {game_id}.")
+    changed = model_call(
+        game.update, session, title=title,
+        platform=resolve_lookup(session, lib.models.Platform, platform_name, create_missing),
+        genre=resolve_lookup(session, lib.models.Genre, genre_name, create_missing),
+        release_year=release_year, rating=rating,
+        developer=resolve_lookup(session, lib.models.Developer, developer_name, create_missing),
+        publisher=resolve_lookup(session, lib.models.Publisher, publisher_name, create_missing),
+    )
+    if not changed:
+        raise click.ClickException(f"Game {game_id} was not updated.")
+    write_rows([game_row(game)], GAME_COLUMNS, output_format)
+
+
+@games.command("delete")
+@click.argument("game_id", type=int)
+@click.option("--yes", is_flag=True, help="Do not ask for confirmation.")
+@click.pass_obj
+def games_delete(session, game_id, yes):
+    """Delete a game by ID."""
+    game = lib.models.Game.find_by_id(session, game_id)
+    if game is None:
+        raise click.ClickException(f"No game found with ID {game_id}.")
+    if not yes:
+        click.confirm(f"Delete '{game.title}' (ID: {game.id})?", abort=True)
+    if not model_call(game.delete, session):
+        raise click.ClickException(f"Failed to delete game {game_id}.")
+    click.echo(f"Deleted game {game_id}.")
+
+
+# --- platforms, genres, developers, publishers -----------------------------------------
+
+def lookup_row(instance, game_count):
+    return {"id": instance.id, "name": instance.name, "games": game_count}
+
+
+def make_lookup_group(model_class, group_name):
+    """Builds list/show/add/update/delete/reassign/merge commands for one lookup model."""
+    label = model_class.__name__
+
+    @gameshelf.group(group_name, help=f"List, add, update, merge and delete {group_name}.")
+    def group():
+        pass
+
+    @group.command("list")
+    @format_option
+    @click.pass_obj
+    def list_command(session, output_format):
+        """List every entry with its game count."""
+        rows = model_class.rows(session, counts=True)
+        write_rows((row._asdict() for row in rows), LOOKUP_COLUMNS, output_format)
+
+    @group.command("show")
+    @click.argument("item_id", type=int)
+    @format_option
+    @click.pass_obj
+    def show_command(session, item_id, output_format):
+        """Show one entry by ID."""
+        instance = model_class.find_by_id(session, item_id)
+        if instance is None:
+            raise click.ClickException(f"No {label} found with ID {item_id}.")
+        write_rows([lookup_row(instance, instance.count_games(session))], LOOKUP_COLUMNS, output_format)
+
+    @group.command("add")
+    @click.argument("name")
+    @format_option
+    @click.pass_obj
+    def add_command(session, name, output_format):
+        """Add an entry."""
+        instance = model_call(model_class.create, session, name=name)
+        if instance is None:
+            raise click.ClickException(f"Failed to add {label} '{name}'.")
+        write_rows([lookup_row(instance, 0)], LOOKUP_COLUMNS, output_format)
+
+    @group.command("update")
+    @click.argument("item_id", type=int)
+    @click.argument("name")
+    @format_option
+    @click.pass_obj
+    def update_command(session, item_id, name, output_format):
+        """Rename an entry."""
+        instance = model_class.find_by_id(session, item_id)
+        if instance is None:
+            raise click.ClickException(f"No {label} found with ID {item_id}.")
+        if not model_call(instance.update, session, name=name):
+            raise click.ClickException(f"Failed to update {label} {item_id}.")
+        write_rows([lookup_row(instance, instance.count_games(session))], LOOKUP_COLUMNS, output_format)
+
+    @group.command("delete")
+    @click.argument("item_id", type=int)
+    @click.option("--yes", is_flag=True, help="Do not ask for confirmation.")
+    @click.pass_obj
+    def delete_command(session, item_id, yes):
+        """Delete an entry that has no games."""
+        instance = model_class.find_by_id(session, item_id)
+        if instance is None:
+            raise click.ClickException(f"No {label} found with ID {item_id}.")
+        if not yes:
+            click.confirm(f"Delete {label} '{instance.name}' (ID: {instance.id})?", abort=True)
+        if not model_call(instance.delete, session):
+            raise click.ClickException(f"Failed to delete {label} {item_id}.")
+        click.echo(f"Deleted {label} {item_id}.")
+
+    def find_pair(session, source_id, target_id):
+        source = model_class.find_by_id(session, source_id)
+        target = model_class.find_by_id(session, target_id)
+        for item_id, instance in ((source_id, source), (target_id, target)):
+            if instance is None:
+                raise click.ClickException(f"No {label} found with ID {item_id}.")
+        return source, target
+
+    @group.command("reassign")
+    @click.argument("source_id", type=int)
+    @click.argument("target_id", type=int)
+    @click.pass_obj
+    def reassign_command(session, source_id, target_id):
+        """Move every game of SOURCE_ID to TARGET_ID."""
+        source, target = find_pair(session, source_id, target_id)
+        moved = model_call(source.reassign_games, session, target)
+        if moved is None:
+            raise click.ClickException(f"Failed to move games from {label} {source_id}.")
+        click.echo(f"Moved {moved} game(s) from '{source.name}' to '{target.name}'.")
+
+    @group.command("merge")
+    @click.argument("source_id", type=int)
+    @click.argument("target_id", type=int)
+    @click.option("--yes", is_flag=True, help="Do not ask for confirmation.")
+    @click.pass_obj
+    def merge_command(session, source_id, target_id, yes):
+        """Move every game of SOURCE_ID to TARGET_ID, then delete SOURCE_ID."""
+        source, target = find_pair(session, source_id, target_id)
+        source_name = source.name
+        if not yes:
+            click.confirm(f"Merge {label} '{source_name}' into '{target.name}' and delete it?", abort=True)
+        moved = model_call(source.merge_into, session, target)
+        if moved is None:
+            raise click.ClickException(f"Failed to merge {label} {source_id}.")
+        click.echo(f"Merged '{source_name}' into '{target.name}' ({moved} game(s) moved).")
+
+    return group
+
+
+# --- statistics ----------------------------------------------------------------------------
+
+STATS_COLUMNS = ["id", "name", "games", "rated_games", "average_rating"]
+
+
+@gameshelf.group()
+def stats():
+    """Collection statistics, read from the incrementally maintained summary tables."""
+
+
+@stats.command("show")
+@click.option("--by", "dimension", type=click.Choice(["platform", "genre", "developer", "publisher", "year"]),
+              default="genre", show_default=True)
+@click.option("--limit", type=int, help="Only the entries with the most games.")
+@format_option
+@click.pass_obj
+def stats_show(session, dimension, limit, output_format):
+    """Game counts and average ratings per entity, or games per release year."""
+    if dimension == "year":
+        histogram = lib.models.stats.year_histogram(session)
+        write_rows(({"name": year, "games": games} for year, games in histogram), ["name", "games"], output_format)
+        return
+    rows = lib.models.stats.summary(session, dimension, limit)
+    for row in rows:
+        if row["average_rating"] is not None:
+            row["average_rating"] = round(row["average_rating"], 2)
+    write_rows(rows, STATS_COLUMNS, output_format)
+
+
+@stats.command("verify")
+@click.pass_obj
+def stats_verify(session):
+    """Compare the summary tables with a fresh count over all games."""
+    differences = lib.models.stats.verify(session)
+    for table, row, problem in differences:
+        click.echo(f"{table}: {problem}: {row}", err=True)
+    if differences:
+        raise click.ClickException("Statistics are inconsistent; run 'stats rebuild'.")
+    click.echo("Statistics are consistent.")
+
+
+@stats.command("rebuild")
+@click.pass_obj
+def stats_rebuild(session):
+    """Recompute the summary tables from scratch, then verify them."""
+    lib.models.stats.rebuild(session)
+    session.commit()
+    if lib.models.stats.verify(session):
+        raise click.ClickException("Statistics still differ after the rebuild.")
+    click.echo("Statistics rebuilt and verified.")
+
+
+@gameshelf.command("duplicates")
+@click.argument("kind", type=click.Choice(["game", "platform", "genre", "developer", "publisher"]))
+@click.option("--threshold", type=click.FloatRange(0, 1), default=0.8, show_default=True)
+@click.option("--limit", type=int, help="Only the most similar pairs.")
+@format_option
+@click.pass_obj
+def duplicates(session, kind, threshold, limit, output_format):
+    """Report pairs of near-identical names (games only within one platform)."""
+    pairs = lib.models.similarity.duplicate_candidates(session, kind, threshold, limit)
+    write_rows(
+        ({"score": round(score, 3), "id": first_id, "name": first_name, "other_id": second_id,
+          "other_name": second_name} for score, (first_id, first_name), (second_id, second_name) in pairs),
+        DUPLICATE_COLUMNS, output_format,
+    )
+
+
+@gameshelf.command("serve")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Interface to listen on.")
+@click.option("--port", type=int, default=8765, show_default=True)
+@click.option("--workers", type=int, default=8, show_default=True, help="Threads serving reads concurrently.")
+def serve(host, port, workers):
+    """Serve the collection as a local JSON HTTP API until Ctrl+C."""
+    from lib.server import run # Imported here so other commands do not load the server
+    run(host, port, workers)
+
+
+platforms = make_lookup_group(lib.models.Platform, "platforms")
+genres = make_lookup_group(lib.models.Genre, "genres")
+developers = make_lookup_group(lib.models.Developer, "developers")
+publishers = make_lookup_group(lib.models.Publisher, "publishers")
+
+
+if __name__ == "__main__":
+    gameshelf(prog_name="gameshelf")
@@ -0,0 +1,286 @@
+# lib/db/importer.py
+"""
+Streaming bulk importer for CSV and JSONL game catalogs.
+
+Rows are read lazily from the file and validated a batch at a time, column by column,
+against the same rules as the model setters (lib.models.validation). They are then
+written in batches: lookup names (platform, genre, developer, publisher) are resolved
+through an in-memory name -> id map, missing lookup rows are inserted in bulk, and games
+are inserted with one executemany per batch, one transaction per batch.
+
+Expected fields: title, platform, genre, release_year, rating, developer, publisher
+(release_year, rating, developer and publisher are optional).
+
+Usage:
+    python -m lib.db.importer catalog.csv [--batch-size 5000]
+    python -m lib.db.importer catalog.jsonl
+"""
+import argparse
+import csv
+import json
+import time
+from itertools import islice
+
+from sqlalchemy import insert, select
+
+from lib.models import Session, Platform, Genre, Developer, Publisher
+from lib.models.search import deferred_indexing
+from lib.models.validation import RULES, validate_rows
+
+# field name -> (model, required)
+LOOKUP_FIELDS = {
+    "platform": (Platform, True),
+    "genre": (Genre, True),
+    "developer": (Developer, False),
+    "publisher": (Publisher, False),
+}
+
+
+def _row_rules():
+    """Cleaned row field -> validation rule: the games rules plus each lookup's name rule."""
+    rules = dict(RULES["games"])
+    for field, (model, required) in LOOKUP_FIELDS.items():
+        rule = RULES[model.__tablename__]["name"]
+        rules[field] = rule if required else rule.optional()
+    return rules
+
+
+ROW_RULES = _row_rules()
+
+
+class ImportReport:
+    """Counts and timings for one import run."""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.rejected = [] # (line_number, reason)
+        self.lookups_created = {field: 0 for field in LOOKUP_FIELDS}
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows_imported / self.elapsed if self.elapsed else 0.0
+
+    def print_summary(self, max_rejections=20):
+        print(f"Imported {self.rows_imported} of {self.rows_read} rows in {self.elapsed:.2f}s "
+              f"({self.rows_per_second:,.0f} rows/s).")
+        created = ", ".join(f"{count} {field}s" for field, count in self.lookups_created.items())
+        print(f"Created lookup rows: {created}.")
+        if self.rejected:
+            print(f"Rejected {len(self.rejected)} rows:")
+            for line_number, reason in self.rejected[:max_rejections]:
+                print(f"  line {line_number}: {reason}")
+            if len(self.rejected) > max_rejections:
+                print(f"  ... and {len(self.rejected) - max_rejections} more.")
+
+
+def read_csv(path):
+    """Yields (line_number, row dict) for each record of a CSV file with a header row."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def read_jsonl(path):
+    """Yields (line_number, row dict) for each non-blank line of a JSONL file."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, ValueError(f"Invalid JSON: {e.msg}")
+                continue
+            if not isinstance(row, dict):
+                yield line_number, ValueError("Expected a JSON object.")
+                continue
+            yield line_number, row
+
+
+def read_rows(path):
+    """Picks a reader from the file extension."""
+    if str(path).lower().endswith((".jsonl", ".ndjson")):
+        return read_jsonl(path)
+    return read_csv(path)
+
+
+def _optional_int(value, field):
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"{field} must be an integer.")
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            raise ValueError(f"{field} must be an integer, got '{value}'.")
+    if isinstance(value, int):
+        return value
+    raise ValueError(f"{field} must be an integer.")
+
+
+def _optional_name(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def normalize_row(row):
+    """
+    Converts one raw catalog row to model types: trimmed strings, integers, None for blanks.
+    Raises ValueError if a number cannot be parsed. The values are not range-checked here.
+    """
+    title = row.get("title")
+    normalized = {
+        "title": title.strip() if isinstance(title, str) else title,
+        "release_year": _optional_int(row.get("release_year"), "release_year"),
+        "rating": _optional_int(row.get("rating"), "rating"),
+    }
+    for field in LOOKUP_FIELDS:
+        normalized[field] = _optional_name(row.get(field))
+    return normalized
+
+
+def clean_rows(raw_rows):
+    """
+    Normalizes and validates a batch of raw catalog rows.
+    Returns (cleaned rows, {index in raw_rows: reason}) for the rows that break any model rule.
+    """
+    rejected = {}
+    normalized = []
+    positions = [] # index in raw_rows of each normalized row
+    for index, row in enumerate(raw_rows):
+        try:
+            normalized.append(normalize_row(row))
+            positions.append(index)
+        except ValueError as e:
+            rejected[index] = str(e)
+    errors = validate_rows(normalized, ROW_RULES)
+    for row_index, messages in errors.items():
+        rejected[positions[row_index]] = " ".join(messages)
+    cleaned = [row for row_index, row in enumerate(normalized) if row_index not in errors]
+    return cleaned, rejected
+
+
+def clean_row(row):
+    """
+    Validates one raw catalog row and returns a normalized dict.
+    Raises ValueError with a readable reason if the row breaks any model rule.
+    """
+    cleaned, rejected = clean_rows([row])
+    if rejected:
+        raise ValueError(rejected[0])
+    return cleaned[0]
+
+
+class LookupResolver:
+    """In-memory name -> id maps for the four lookup tables, filled once and extended in bulk."""
+
+    def __init__(self, session):
+        self.session = session
+        self.ids = {}
+        for field, (model, _) in LOOKUP_FIELDS.items():
+            table = model.__table__
+            self.ids[field] = dict(session.execute(select(table.c.name, table.c.id)).all())
+
+    def create_missing(self, rows):
+        """Inserts every lookup name referenced by `rows` that has no id yet. Returns counts per field."""
+        created = {}
+        for field, (model, _) in LOOKUP_FIELDS.items():
+            known = self.ids[field]
+            missing = {row[field] for row in rows if row[field] is not None and row[field] not in known}
+            if missing:
+                table = model.__table__
+                self.session.execute(insert(table), [{"name": name} for name in missing])
+                new_ids = self.session.execute(
+                    select(table.c.name, table.c.id).where(table.c.name.in_(missing))
+                ).all()
+                known.update(new_ids)
+            created[field] = len(missing)
+        return created
+
+    def game_values(self, row):
+        """Maps a cleaned row onto a tuple in GAME_INSERT_SQL column order."""
+        return (
+            row["title"],
+            row["release_year"],
+            row["rating"],
+            self.ids["platform"][row["platform"]],
+            self.ids["genre"][row["genre"]],
+            self.ids["developer"].get(row["developer"]),
+            self.ids["publisher"].get(row["publisher"]),
+        )
+
+
+# Positional parameters straight to the driver: building a bind dict per row through
+# SQLAlchemy's compiler costs more than SQLite's own insert work at this volume.
+GAME_INSERT_SQL = (
+    "INSERT INTO games (title, release_year, rating, platform_id, genre_id, developer_id, publisher_id) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def import_catalog(path, batch_size=5000, session=None, verbose=True):
+    """
+    Streams the catalog at `path` into the database in transactions of `batch_size` rows.
+    Returns an ImportReport.
+    """
+    own_session = session is None
+    session = session or Session()
+    report = ImportReport()
+    start = time.perf_counter()
+    try:
+        resolver = LookupResolver(session)
+        rows = iter(read_rows(path))
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+            report.rows_read += len(chunk)
+            parsed = []
+            chunk_rejected = []
+            for line_number, raw in chunk:
+                if isinstance(raw, Exception):
+                    chunk_rejected.append((line_number, str(raw)))
+                else:
+                    parsed.append((line_number, raw))
+            batch, rejected = clean_rows([raw for _, raw in parsed])
+            chunk_rejected.extend((parsed[index][0], reason) for index, reason in rejected.items())
+            report.rejected.extend(sorted(chunk_rejected))
+            if not batch:
+                continue
+            try:
+                with deferred_indexing(session):
+                    created = resolver.create_missing(batch)
+                    session.connection().exec_driver_sql(
+                        GAME_INSERT_SQL, [resolver.game_values(row) for row in batch]
+                    )
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            for field, count in created.items():
+                report.lookups_created[field] += count
+            report.rows_imported += len(batch)
+            if verbose:
+                print(f"  ... {report.rows_imported} rows imported")
+    finally:
+        report.elapsed = time.perf_counter() - start
+        if own_session:
+            session.close()
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Import a CSV or JSONL game catalog into GameShelf.")
+    parser.add_argument("path", help="Path to a .csv or .jsonl catalog file")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per transaction (default 5000)")
+    args = parser.parse_args()
+
+    from lib.models import create_tables
+    create_tables()
+    import_catalog(args.path, batch_size=args.batch_size).print_summary()
@@ -0,0 +1,8 @@
+from lib.models import engine, create_tables
+from lib.models.migrations import current_version, LATEST_VERSION
+
+if __name__ == '__main__':
+    # create_tables() applies any pending migrations and prints their timing reports
+    create_tables()
+    with engine.connect() as connection:
+        print(f"Schema version: {current_version(connection)} (latest: {LATEST_VERSION})")
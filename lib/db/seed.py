@@ -1,4 +1,12 @@
-from lib.models import Session, Platform, Genre, Developer, Publisher, Game
+import argparse
+import os
+import random
+import time
+from itertools import accumulate
+
+from sqlalchemy import text
+
+from lib.models import Session, Platform, Genre, Developer, Publisher, Game, engine
 
 def seed_database():
     session = Session()
@@ -118,7 +126,209 @@ def seed_database():
     session.close()
     print("Database seeding process complete.")
 
-if __name__ == '__main__':
-    from lib.models import create_tables
+# --- Synthetic collections for benchmarking ---------------------------------------------
+# `generate_database` builds a collection of any size from a seed, so the same arguments
+# always produce the same rows. Games per developer follow a Zipf-like curve (a few big
+# studios, a long tail of one-game indies), release years lean towards recent decades and
+# ratings cluster around 3-4 with some games left unrated.
+
+PLATFORM_NAMES = [
+    "PC", "PlayStation 5", "Nintendo Switch", "Xbox Series X", "Steam Deck", "PlayStation 4",
+    "Xbox One", "Nintendo 3DS", "PlayStation 3", "Xbox 360", "Wii U", "Wii", "PlayStation 2",
+    "GameCube", "Nintendo 64", "Super Nintendo", "Sega Genesis", "Game Boy Advance", "Dreamcast",
+    "PlayStation Vita", "iOS", "Android", "Mac", "Linux",
+]
+GENRE_NAMES = [
+    "RPG", "Action", "Strategy", "Adventure", "Platformer", "Indie", "Simulation", "Shooter",
+    "Puzzle", "Racing", "Sports", "Fighting", "Horror", "Roguelike", "Metroidvania", "Rhythm",
+    "Visual Novel", "Survival", "Sandbox", "MMORPG", "Tactics", "Stealth",
+]
+NAME_WORDS = [
+    "Red", "Iron", "Silver", "Blue", "Night", "Crystal", "Broken", "Hollow", "Lunar", "Solar",
+    "Wild", "Ancient", "Pixel", "Neon", "Shadow", "Golden", "Frozen", "Crimson", "Distant", "Quiet",
+]
+NAME_NOUNS = [
+    "Fox", "Moon", "Forge", "Tower", "River", "Garden", "Engine", "Anvil", "Harbor", "Comet",
+    "Lantern", "Raven", "Castle", "Orchard", "Signal", "Summit", "Crown", "Meadow", "Beacon", "Wolf",
+]
+STUDIO_SUFFIXES = ["Studios", "Games", "Interactive", "Entertainment", "Works", "Softworks"]
+PUBLISHER_SUFFIXES = ["Publishing", "Media", "Digital", "Entertainment", "Interactive"]
+TITLE_NOUNS = NAME_NOUNS + [
+    "Kingdom", "Legend", "Chronicles", "Odyssey", "Saga", "Quest", "Frontier", "Empire",
+    "Dungeon", "Horizon", "Requiem", "Protocol", "Dynasty", "Echoes", "Rebellion",
+]
+TITLE_SUBTITLES = [
+    "Origins", "Reborn", "Wild Hunt", "Redemption", "Awakening", "Last Light", "Remastered",
+    "Deluxe Edition", "The Lost Age", "Endless Night", "Rising", "Definitive Edition",
+]
+SEQUELS = ["", "", "", "", " 2", " 3", " II", " III", " 4", " Zero"]
+
+RATING_VALUES = [None, 1, 2, 3, 4, 5]
+RATING_WEIGHTS = [15, 3, 8, 27, 32, 15]
+
+
+def _unique_names(rng, count, fixed, make_name, max_len):
+    """First the `fixed` names, then generated ones, with a numeric suffix on collisions."""
+    names = list(fixed[:count])
+    seen = set(names)
+    while len(names) < count:
+        name = make_name(rng)
+        if name in seen:
+            name = f"{name} {len(names)}"
+        name = name[:max_len]
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def _zipf_cum_weights(count, exponent=1.1):
+    """Cumulative Zipf weights for `count` ranks, ready for random.choices(cum_weights=...)."""
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def _year_cum_weights(years):
+    """Weights that grow towards recent years, so most games land in the last two decades."""
+    return list(accumulate(1.0 + ((year - years[0]) / 10.0) ** 2 for year in years))
+
+
+def _random_title(rng):
+    title = f"{rng.choice(NAME_WORDS)} {rng.choice(TITLE_NOUNS)}"
+    if rng.random() < 0.4:
+        title = f"{rng.choice(TITLE_NOUNS)} of the {title}"
+    title += rng.choice(SEQUELS)
+    if rng.random() < 0.25:
+        title += f": {rng.choice(TITLE_SUBTITLES)}"
+    return title
+
+
+def reset_database():
+    """Deletes the SQLite file behind `engine` (and its WAL files) and recreates the schema from scratch."""
+    from lib.models import create_tables, lookup_cache, query_cache
+    engine.dispose()
+    lookup_cache.invalidate()
+    query_cache.invalidate()
+    if engine.url.database:
+        for path in (engine.url.database, f"{engine.url.database}-wal", f"{engine.url.database}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
     create_tables()
-    seed_database()
+
+
+def generate_database(games=10000, platforms=20, genres=15, developers=2000, publishers=300,
+                      seed=42, batch_size=50000):
+    """
+    Replaces the database with a synthetic collection of the given size.
+    The same arguments (including `seed`) always produce the same data.
+    Raises ValueError (before touching the database) for counts it cannot generate.
+    """
+    from lib.db.importer import GAME_INSERT_SQL
+    from lib.models.search import deferred_indexing
+
+    counts = {"games": games, "platforms": platforms, "genres": genres, "developers": developers,
+              "publishers": publishers}
+    for name, count in counts.items():
+        if count < 0:
+            raise ValueError(f"{name} cannot be negative, got {count}.")
+    if games and not (platforms and genres):
+        raise ValueError("Games need at least one platform and one genre.")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}.")
+
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    reset_database()
+    session = Session()
+    try:
+        lookup_names = {
+            Platform: _unique_names(rng, platforms, PLATFORM_NAMES,
+                                    lambda r: f"{r.choice(NAME_WORDS)} {r.choice(NAME_NOUNS)} Console", 50),
+            Genre: _unique_names(rng, genres, GENRE_NAMES,
+                                 lambda r: f"{r.choice(NAME_WORDS)} {r.choice(NAME_NOUNS)}", 30),
+            Developer: _unique_names(rng, developers, [],
+                                     lambda r: f"{r.choice(NAME_WORDS)} {r.choice(NAME_NOUNS)} {r.choice(STUDIO_SUFFIXES)}", 100),
+            Publisher: _unique_names(rng, publishers, [],
+                                     lambda r: f"{r.choice(NAME_WORDS)} {r.choice(NAME_NOUNS)} {r.choice(PUBLISHER_SUFFIXES)}", 100),
+        }
+        for model, names in lookup_names.items():
+            session.connection().exec_driver_sql(
+                f"INSERT INTO {model.__tablename__} (id, name) VALUES (?, ?)",
+                list(enumerate(names, start=1)),
+            )
+        session.commit()
+        print(f"Generated {platforms} platforms, {genres} genres, {developers} developers, {publishers} publishers.")
+
+        platform_ids = range(1, platforms + 1)
+        genre_ids = range(1, genres + 1)
+        developer_ids = range(1, developers + 1)
+        years = range(1970, 2026)
+        platform_weights = _zipf_cum_weights(platforms, exponent=0.8)
+        genre_weights = _zipf_cum_weights(genres, exponent=0.7)
+        developer_weights = _zipf_cum_weights(developers)
+        publisher_weights = _zipf_cum_weights(publishers)
+        year_weights = _year_cum_weights(years)
+        # Most developers stick with one publisher; ~15% of games are self-published.
+        developer_publisher = [None] + [
+            rng.choices(range(1, publishers + 1), cum_weights=publisher_weights)[0]
+            if publishers and rng.random() >= 0.15 else None
+            for _ in developer_ids
+        ]
+
+        written = 0
+        while written < games:
+            count = min(batch_size, games - written)
+            rows = zip(
+                (_random_title(rng) for _ in range(count)),
+                rng.choices(years, cum_weights=year_weights, k=count),
+                rng.choices(RATING_VALUES, weights=RATING_WEIGHTS, k=count),
+                rng.choices(platform_ids, cum_weights=platform_weights, k=count),
+                rng.choices(genre_ids, cum_weights=genre_weights, k=count),
+                rng.choices(developer_ids, cum_weights=developer_weights, k=count) if developers else [None] * count,
+            )
+            with deferred_indexing(session):
+                session.connection().exec_driver_sql(
+                    GAME_INSERT_SQL,
+                    [(title, year, rating, platform_id, genre_id, dev_id, developer_publisher[dev_id or 0])
+                     for title, year, rating, platform_id, genre_id, dev_id in rows],
+                )
+            session.commit()
+            written += count
+            print(f"  ... {written} games written")
+
+        session.execute(text("ANALYZE"))
+        session.commit()
+    finally:
+        session.close()
+    elapsed = time.perf_counter() - start
+    print(f"Generated {games} games in {elapsed:.1f}s ({games / elapsed if elapsed else 0:,.0f} games/s).")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Seed GameShelf with sample data, or generate a synthetic collection with --games."
+    )
+    parser.add_argument("--games", type=int, help="Generate this many synthetic games instead of the sample data")
+    parser.add_argument("--platforms", type=int, default=20)
+    parser.add_argument("--genres", type=int, default=15)
+    parser.add_argument("--developers", type=int, default=2000)
+    parser.add_argument("--publishers", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed gives the same data")
+    parser.add_argument("--batch-size", type=int, default=50000, help="Games per transaction")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.games is not None:
+        try:
+            generate_database(
+                games=args.games, platforms=args.platforms, genres=args.genres,
+                developers=args.developers, publishers=args.publishers,
+                seed=args.seed, batch_size=args.batch_size,
+            )
+        except ValueError as e:
+            raise SystemExit(f"Error: {e}")
+    else:
+        from lib.models import create_tables
+        create_tables()
+        seed_database()
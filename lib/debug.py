@@ -10,7 +10,7 @@
 import ipdb # ipdb is listed in Pipfile's [dev-packages]
 
 from lib.models import Session, Platform, Genre, Developer, Publisher, Game
-from lib.models import create_tables
+from lib.models import create_tables, lookup_cache, query_cache, profiler
 
 if __name__ == '__main__':
     # Ensure tables exist if you're going to interact with the DB
@@ -18,11 +18,16 @@ if __name__ == '__main__':
     
     # Create a session to use in the debugger
     session = Session()
+    profiler.enable() # every statement run below is recorded
 
     print("Starting debug session...")
     print("Available variables in this session:")
     print("  session   - SQLAlchemy session instance")
     print("  Platform, Genre, Developer, Publisher, Game - Your model classes")
+    print("  lookup_cache - lookup-table cache; lookup_cache.stats() shows hits/misses")
+    print("  query_cache  - versioned result cache; query_cache.stats() shows hit ratio and time saved")
+    print("  profiler  - SQL profiler; profiler.print_report() shows statement counts, timings")
+    print("              and likely N+1 queries, profiler.reset() starts over")
     print("Example usage in ipdb:")
     print("  platforms = session.query(Platform).all()")
     print("  ipdb> platforms[0].name")
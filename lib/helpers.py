@@ -3,6 +3,7 @@
 # from lib.models import Session, Platform, Genre, Developer, Publisher, Game
 # To this:
 import lib.models # Import the whole module
+from lib.models.profiler import profiled
 
 def exit_program():
     """Prints a goodbye message and exits the program."""
@@ -49,76 +50,71 @@ def get_int_input(prompt, min_val=None, max_val=None, allow_empty=False):
             print(f"An unexpected error occurred: {e}")
 
 
+@profiled
 def display_platforms(session):
     """Displays all platforms."""
-    platforms = lib.models.Platform.get_all(session) # Changed
+    platforms = lib.models.Platform.rows(session, counts=True)
     if not platforms:
         print("No platforms found.")
         return
     print("\n--- Platforms ---")
     for p in platforms:
-        game_count = 0
-        if hasattr(p, 'games') and p.games is not None: # Check if games attribute exists and is loaded
-            game_count = len(p.games)
-        print(f"ID: {p.id} | Name: {p.name} | Games: {game_count}")
+        print(f"ID: {p.id} | Name: {p.name} | Games: {p.games}")
     print("-----------------")
 
+@profiled
 def display_genres(session):
     """Displays all genres."""
-    genres = lib.models.Genre.get_all(session) # Changed
+    genres = lib.models.Genre.rows(session, counts=True)
     if not genres:
         print("No genres found.")
         return
     print("\n--- Genres ---")
     for g in genres:
-        game_count = 0
-        if hasattr(g, 'games') and g.games is not None:
-            game_count = len(g.games)
-        print(f"ID: {g.id} | Name: {g.name} | Games: {game_count}")
+        print(f"ID: {g.id} | Name: {g.name} | Games: {g.games}")
     print("-----------------")
 
+@profiled
 def display_developers(session):
     """Displays all developers."""
-    developers = lib.models.Developer.get_all(session) # Changed
+    developers = lib.models.Developer.rows(session, counts=True)
     if not developers:
         print("No developers found.")
         return
     print("\n--- Developers ---")
     for d in developers:
-        game_count = 0
-        if hasattr(d, 'games') and d.games is not None:
-            game_count = len(d.games)
-        print(f"ID: {d.id} | Name: {d.name} | Games: {game_count}")
+        print(f"ID: {d.id} | Name: {d.name} | Games: {d.games}")
     print("-----------------")
 
+@profiled
 def display_publishers(session):
     """Displays all publishers."""
-    publishers = lib.models.Publisher.get_all(session) # Changed
+    publishers = lib.models.Publisher.rows(session, counts=True)
     if not publishers:
         print("No publishers found.")
         return
     print("\n--- Publishers ---")
     for p in publishers:
-        game_count = 0
-        if hasattr(p, 'games') and p.games is not None:
-            game_count = len(p.games)
-        print(f"ID: {p.id} | Name: {p.name} | Games: {game_count}")
+        print(f"ID: {p.id} | Name: {p.name} | Games: {p.games}")
     print("-----------------")
 
+@profiled
 def display_games(session, games_list=None):
-    """Displays a list of games. If no list is provided, displays all games."""
+    """
+    Displays a list of GameRow tuples (from Game.rows). If no list is provided, displays all games.
+    """
     if games_list is None:
-        games_list = lib.models.Game.get_all(session) # Changed
+        games_list = lib.models.Game.rows(session)
     
     if not games_list:
         print("No games found matching your criteria.")
         return
     print("\n--- Games Collection ---")
     for game in games_list:
-        platform_name = game.platform.name if game.platform else "N/A"
-        genre_name = game.genre.name if game.genre else "N/A"
-        dev_name = game.developer.name if game.developer else "N/A"
-        pub_name = game.publisher.name if game.publisher else "N/A"
+        platform_name = game.platform or "N/A"
+        genre_name = game.genre or "N/A"
+        dev_name = game.developer or "N/A"
+        pub_name = game.publisher or "N/A"
         year = game.release_year if game.release_year else "N/A"
         rating = game.rating if game.rating else "N/R"
 
@@ -128,13 +124,106 @@ def display_games(session, games_list=None):
         print("-" * 20)
     print("------------------------")
 
+def display_facets(facets):
+    """Prints the per-platform, per-genre and per-decade counts returned by Game.facets."""
+    print(f"\n--- {facets['total']} matching games ---")
+    print("By platform: " + ", ".join(f"{name} (ID {item_id}): {count}" for item_id, name, count in facets["platform"]))
+    print("By genre:    " + ", ".join(f"{name} (ID {item_id}): {count}" for item_id, name, count in facets["genre"]))
+    print("By decade:   " + ", ".join(
+        f"{'unknown' if decade is None else f'{decade}s'}: {count}" for decade, count in facets["year"]
+    ))
+
+def display_stats_summary(rows, title):
+    """Prints per-entity rows from stats.summary as a table."""
+    if not rows:
+        print("No statistics yet.")
+        return
+    print(f"\n--- {title} ---")
+    for row in rows:
+        average = f"{row['average_rating']:.2f}" if row["average_rating"] is not None else "N/R"
+        print(f"{row['name'][:30]:<30} | Games: {row['games']:>7} | Avg rating: {average} ({row['rated_games']} rated)")
+
+def display_year_histogram(histogram, width=40):
+    """Prints (year, games) pairs from stats.year_histogram as a bar chart."""
+    if not histogram:
+        print("No games to chart.")
+        return
+    largest = max(games for _, games in histogram)
+    print("\n--- Games per release year ---")
+    for year, games in histogram:
+        bar = "#" * max(1, round(games / largest * width))
+        print(f"{year or 'N/A':>6} | {bar} {games}")
+
+def display_duplicates(pairs):
+    """Prints (score, (id, name), (id, name)) pairs from similarity.duplicate_candidates."""
+    if not pairs:
+        print("No likely duplicates found.")
+        return
+    print("\n--- Possible duplicates ---")
+    for score, (first_id, first_name), (second_id, second_name) in pairs:
+        print(f"{score:4.0%} | ID {first_id}: {first_name} <-> ID {second_id}: {second_name}")
+
+def display_cache_stats(cache_stats):
+    """Prints query_cache.stats(): hit ratio, time saved and size."""
+    print("\n--- Query Cache ---")
+    print(f"Hits: {cache_stats['hits']} | Misses: {cache_stats['misses']} (stale: {cache_stats['stale']}) | "
+          f"Hit ratio: {cache_stats['hit_ratio']:.0%}")
+    print(f"Time saved: {cache_stats['saved_seconds'] * 1000:.1f} ms | Entries: {cache_stats['entries']} | "
+          f"Rows: {cache_stats['rows']}/{cache_stats['max_rows']} | Evictions: {cache_stats['evictions']}")
+
+def browse_games(session, page_size=20):
+    """
+    Pages through all games by title. Each page is fetched on demand with keyset
+    pagination, so page 20,000 costs the same as page 1 and only one page is held in memory.
+    """
+    games = lib.models.Game.rows(session, limit=page_size)
+    if not games:
+        print("No games found matching your criteria.")
+        return
+    page_number = 1
+    while True:
+        display_games(session, games)
+        print(f"Page {page_number or '?'} | [n]ext, [p]revious, [j]ump to letter, [q]uit")
+        choice = input("> ").strip().lower()
+        if choice == "n":
+            next_page = lib.models.Game.rows(session, after=(games[-1].title, games[-1].id), limit=page_size)
+            if next_page:
+                games = next_page
+                if page_number:
+                    page_number += 1
+            else:
+                print("This is the last page.")
+        elif choice == "p":
+            previous_page = lib.models.Game.rows(session, before=(games[0].title, games[0].id), limit=page_size)
+            if previous_page:
+                games = previous_page
+                if page_number:
+                    page_number = max(1, page_number - 1)
+            else:
+                print("This is the first page.")
+        elif choice == "j":
+            letter = input("Jump to titles starting at: ").strip()
+            if not letter:
+                continue
+            jumped = lib.models.Game.rows(session, after=(letter, 0), limit=page_size)
+            if jumped:
+                games = jumped
+                page_number = None # Position is unknown after a jump; counting it would need a scan
+            else:
+                print(f"No games at or after '{letter}'.")
+        elif choice == "q":
+            break
+        else:
+            print("Invalid choice.")
+
+@profiled
 def select_model_instance(session, model_class, prompt_message="Select an item"):
     """
     Displays a list of instances for a given model and lets the user select one by ID.
     Returns the selected instance, or 'new' if the user wants to create one, or None.
     `model_class` is expected to be like `lib.models.Platform`.
     """
-    instances = model_class.get_all(session) # model_class is already fully qualified
+    instances = lib.models.lookup_cache.all_rows(session, model_class) # model_class.rows(), cached between prompts
     if not instances:
         print(f"No {model_class.__name__}s found in the database.")
         create_new = input(f"Would you like to create a new {model_class.__name__}? (y/n): ").lower()
@@ -143,8 +232,8 @@ def select_model_instance(session, model_class, prompt_message="Select an item")
         return None
 
     print(f"\nAvailable {model_class.__name__}s:")
-    for instance in instances:
-        print(f"  ID: {instance.id} - {instance.name}")
+    for instance_id, name in instances:
+        print(f"  ID: {instance_id} - {name}")
 
     while True:
         try:
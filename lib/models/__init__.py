@@ -1,7 +1,7 @@
 # lib/models/__init__.py
 
 # Import Base, engine, and Session from base.py so they can be accessed via lib.models
-from .base import Base, engine, Session
+from .base import Base, engine, Session, STORAGE_PROFILE, STORAGE_PROFILES
 
 # Import all model classes to make them easily accessible
 from .platform import Platform
@@ -10,13 +10,40 @@ from .developer import Developer
 from .publisher import Publisher
 from .game import Game
 
+from .migrations import migrate, stored_version, LATEST_VERSION
+from .batch import batch
+from .cache import lookup_cache, register_lookup_models
+from .query_cache import query_cache
+from .profiler import profiler
+from . import stats # Collection statistics: stats.summary(session, 'genre'), stats.rebuild(...)
+from . import similarity # Trigram search and duplicate detection
+from .snapshot import GameSnapshot
+
+# Writes to the lookup tables drop their cached rows
+register_lookup_models(Platform, Genre, Developer, Publisher)
+
 def create_tables():
-    """Creates all tables in the database."""
+    """Creates all tables in the database and applies any pending schema migrations."""
     print("Creating database tables if they don't exist...")
     Base.metadata.create_all(engine)
     print("Database tables created (or already exist).")
+    migrate(engine)
+
+def ensure_schema():
+    """
+    Fast startup check: reads the stored schema version and only runs create_tables()
+    (create_all plus migrations) when the database is new or behind.
+    Returns True if any DDL was run.
+    """
+    with engine.connect() as connection:
+        version = stored_version(connection)
+    if version == LATEST_VERSION:
+        return False
+    create_tables()
+    return True
 
 __all__ = [
-    'Base', 'engine', 'Session', 'create_tables',
-    'Platform', 'Genre', 'Developer', 'Publisher', 'Game'
+    'Base', 'engine', 'Session', 'create_tables', 'ensure_schema', 'migrate', 'batch',
+    'STORAGE_PROFILE', 'STORAGE_PROFILES', 'lookup_cache', 'query_cache', 'profiler', 'stats', 'similarity',
+    'GameSnapshot', 'Platform', 'Genre', 'Developer', 'Publisher', 'Game'
 ]
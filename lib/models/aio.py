@@ -0,0 +1,127 @@
+# lib/models/aio.py
+"""
+asyncio facade over the model layer.
+
+The models are synchronous and each call blocks until SQLite answers. `AsyncGameShelf`
+runs them on a bounded thread pool instead, each call with its own short-lived session,
+so an event loop stays responsive and concurrent calls overlap their I/O (sqlite3
+releases the GIL while a statement runs).
+
+    shelf = AsyncGameShelf(max_workers=8)
+    games = await shelf.Game.search("witcher")
+    platform = await shelf.Platform.find_by_name("PC")
+    genre = await shelf.Genre.find_by_name("RPG")
+    game = await shelf.Game.create("Hades", platform, genre, 2020, 5)
+    await shelf.update(game, rating=4)
+    shelf.close()
+
+Every classmethod of Game, Platform, Genre, Developer and Publisher is available under
+the same name, without the `session` argument. Objects come back detached, with their
+columns loaded. Relationships are not loaded, so to read game.platform etc. fetch games
+with `list_with_relations`, `search` or `page`, which load them up front.
+
+Each running call holds one pooled connection, so the thread pool is never larger than the
+engine's connection pool (pool_size + max_overflow; 1 under the "fast-write" storage
+profile). `max_workers` is clamped to that; more threads would only wait on the pool and
+time out.
+"""
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from sqlalchemy.pool import QueuePool
+
+from .base import Session, engine
+from .platform import Platform
+from .genre import Genre
+from .developer import Developer
+from .publisher import Publisher
+from .game import Game
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def pool_capacity(bind):
+    """How many connections `bind`'s pool can hand out at once, or None if it has no limit."""
+    pool = bind.pool
+    if not isinstance(pool, QueuePool) or pool._max_overflow < 0:
+        return None
+    return pool.size() + pool._max_overflow
+
+
+class AsyncModel:
+    """Async mirror of one model's classmethods, e.g. `await shelf.Game.find_by_id(3)`."""
+
+    def __init__(self, shelf, model):
+        self._shelf = shelf
+        self._model = model
+
+    def __getattr__(self, name):
+        attribute = getattr(self._model, name)
+        if not (inspect.ismethod(attribute) and attribute.__self__ is self._model):
+            raise AttributeError(f"{self._model.__name__}.{name} is not a classmethod.")
+
+        async def call(*args, **kwargs):
+            return await self._shelf.run(attribute, *args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = attribute.__doc__
+        return call
+
+    def __repr__(self):
+        return f"<AsyncModel({self._model.__name__})>"
+
+
+class AsyncGameShelf:
+    """Runs model calls on a bounded thread pool, one session per call."""
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, session_factory=Session):
+        capacity = pool_capacity(getattr(session_factory, "kw", {}).get("bind") or engine)
+        self.max_workers = max_workers if capacity is None else max(1, min(max_workers, capacity))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="gameshelf")
+        self._session_factory = session_factory
+        self.Game = AsyncModel(self, Game)
+        self.Platform = AsyncModel(self, Platform)
+        self.Genre = AsyncModel(self, Genre)
+        self.Developer = AsyncModel(self, Developer)
+        self.Publisher = AsyncModel(self, Publisher)
+
+    def _call_with_session(self, func, args, kwargs):
+        # expire_on_commit=False keeps loaded columns readable after the session closes
+        session = self._session_factory(expire_on_commit=False)
+        try:
+            return func(session, *args, **kwargs)
+        finally:
+            session.close()
+
+    async def run(self, func, *args, **kwargs):
+        """Runs `func(session, *args, **kwargs)` on the pool with a fresh session."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(self._call_with_session, func, args, kwargs)
+        )
+
+    async def update(self, instance, **changes):
+        """Async `instance.update(session, **changes)` for any model instance."""
+        def update(session):
+            session.add(instance)
+            return instance.update(session, **changes)
+        return await self.run(update)
+
+    async def delete(self, instance):
+        """Async `instance.delete(session)` for any model instance."""
+        def delete(session):
+            session.add(instance)
+            return instance.delete(session)
+        return await self.run(delete)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+        return False
@@ -1,7 +1,77 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-DATABASE_URL = "sqlite:///gameshelf.db" 
-engine = create_engine(DATABASE_URL) 
+# Override to point GameShelf at another database file (benchmarks use their own).
+DATABASE_URL = os.environ.get("GAMESHELF_DATABASE_URL", "sqlite:///gameshelf.db")
+
+# Storage profiles: SQLite pragmas applied to every new connection, plus pool settings.
+# Pick one with GAMESHELF_STORAGE_PROFILE (default "durable"); lib.bench.profiles compares them.
+STORAGE_PROFILES = {
+    # Every commit is fsynced before it returns; safe against power loss.
+    "durable": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "FULL",
+            "cache_size": -8000, # negative = KiB, so 8 MiB
+            "mmap_size": 0,
+            "temp_store": "DEFAULT",
+            "foreign_keys": "ON",
+        },
+        "pool": {"pool_size": 5, "max_overflow": 10},
+    },
+    # For imports and generated data: commits survive an application crash but not an OS
+    # crash or power cut. Foreign keys stay enforced: profiles only trade durability and
+    # memory for speed, never integrity.
+    "fast-write": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "OFF",
+            "cache_size": -65536,
+            "mmap_size": 0,
+            "temp_store": "MEMORY",
+            "foreign_keys": "ON",
+        },
+        "pool": {"pool_size": 1, "max_overflow": 0}, # SQLite has one writer anyway
+    },
+    # For browsing large shelves: big page cache and memory-mapped reads, WAL so readers
+    # never wait on a writer.
+    "read-heavy": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -131072,
+            "mmap_size": 268435456, # 256 MiB
+            "temp_store": "MEMORY",
+            "foreign_keys": "ON",
+        },
+        "pool": {"pool_size": 10, "max_overflow": 20},
+    },
+}
+DEFAULT_STORAGE_PROFILE = "durable"
+STORAGE_PROFILE = os.environ.get("GAMESHELF_STORAGE_PROFILE", DEFAULT_STORAGE_PROFILE)
+
+
+def build_engine(url, profile_name):
+    """Creates an engine whose connections are tuned with the given storage profile."""
+    if profile_name not in STORAGE_PROFILES:
+        raise ValueError(
+            f"Unknown storage profile '{profile_name}'. Choose one of: {', '.join(STORAGE_PROFILES)}."
+        )
+    profile = STORAGE_PROFILES[profile_name]
+    new_engine = create_engine(url, **profile["pool"])
+
+    @event.listens_for(new_engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in profile["pragmas"].items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+        cursor.close()
+
+    return new_engine
+
+
+engine = build_engine(DATABASE_URL, STORAGE_PROFILE)
 Session = sessionmaker(bind=engine)
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
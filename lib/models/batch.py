@@ -0,0 +1,87 @@
+# lib/models/batch.py
+"""
+Unit-of-work batch mode for the model methods.
+
+Normally every create/update/delete commits straight away. Inside `with batch(session):`
+they only stage their changes, and the whole block is committed once on exit, so a bulk
+script pays for one transaction instead of one per row.
+
+Validation still happens per call: a bad value prints its error and makes the call return
+None/False exactly as before. Rollback-on-error applies to the batch as a whole, though. The
+first failed call rolls the transaction back and marks the batch as failed, and a failed
+batch is rolled back again on exit instead of being committed. A batch is all or nothing.
+If the commit on exit fails (the flush hits a constraint, such as a duplicate name), the
+batch is rolled back, marked as failed and the error is printed, so the session stays usable.
+
+New objects get their IDs when the batch is flushed (on exit, or earlier if a query
+autoflushes), not when `create` returns.
+"""
+from contextlib import contextmanager
+
+
+class Batch:
+    """State of one open batch on a session."""
+
+    def __init__(self, session):
+        self.session = session
+        self.depth = 0
+        self.operations = 0
+        self.errors = 0
+        self.committed = False
+
+    @property
+    def failed(self):
+        return self.errors > 0
+
+
+@contextmanager
+def batch(session):
+    """Defers the model methods' commits until the block exits. Nested blocks join the outer one."""
+    current = session.info.get("batch")
+    if current is not None:
+        current.depth += 1
+        try:
+            yield current
+        finally:
+            current.depth -= 1
+        return
+
+    current = Batch(session)
+    session.info["batch"] = current
+    try:
+        yield current
+    except BaseException:
+        session.rollback()
+        raise
+    else:
+        if current.failed:
+            session.rollback()
+            print(f"Batch rolled back: {current.errors} of {current.operations} operations failed.")
+        else:
+            try:
+                session.commit()
+                current.committed = True
+            except Exception as e:
+                session.rollback()
+                current.errors += 1
+                print(f"Batch rolled back: the commit failed: {e}")
+    finally:
+        session.info.pop("batch", None)
+
+
+def commit(session):
+    """Commits, or just records the operation if a batch is open on `session`."""
+    current = session.info.get("batch")
+    if current is not None:
+        current.operations += 1
+        return
+    session.commit()
+
+
+def rollback(session):
+    """Rolls back, and marks the open batch on `session` (if any) as failed."""
+    current = session.info.get("batch")
+    if current is not None:
+        current.operations += 1
+        current.errors += 1
+    session.rollback()
@@ -0,0 +1,195 @@
+# lib/models/cache.py
+"""
+Process-wide LRU cache for the small lookup tables (platforms, genres, developers,
+publishers), keyed both by id and by name.
+
+The cache stores plain (id, name) rows, not ORM objects, because an ORM object belongs to
+one session. On a hit the row is attached to the caller's session as a clean persistent
+object, with no SQL; if the session already holds that identity, its own object is returned
+instead, so identity-map semantics are the same as `session.get`.
+
+Entries are keyed by the engine of the session's bind as well, so a process that opens
+another database file (the benchmarks' gameshelf_bench.db, a test database) never gets ids
+or names from the previous one. lib.db.seed.reset_database, which replaces the file behind
+the same URL, clears the cache itself.
+
+Entries for a model are dropped whenever that model is written through the ORM: on flush
+(mapper events), after commit/rollback of a session that wrote it, and on bulk
+INSERT/UPDATE/DELETE run through a session, whether ORM or Core (such as the importer's
+`insert(table)`). Writes from other processes are not seen; these tables rarely change.
+"""
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SessionClass, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+DEFAULT_MAXSIZE = 4096
+
+
+class LookupCache:
+    """Bounded LRU of (database, model, id) -> name with a (database, model, name) -> id index."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._by_id = OrderedDict()
+        self._by_name = {}
+        self._all_rows = {} # (database, model) -> [(id, name), ...] for select lists
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- reading -----------------------------------------------------------------------
+
+    def get_by_id(self, session, model, item_id):
+        """Cached equivalent of `session.get(model, item_id)`."""
+        if item_id is None:
+            return None
+        database = _database(session, model)
+        with self._lock:
+            name = self._by_id.get((database, model, item_id))
+            if name is not None:
+                self._by_id.move_to_end((database, model, item_id))
+                self.hits += 1
+            else:
+                self.misses += 1
+        if name is not None:
+            return self._attach(session, model, item_id, name)
+        instance = session.get(model, item_id)
+        if instance is not None:
+            self._store(database, model, instance.id, instance.name)
+        return instance
+
+    def get_by_name(self, session, model, name):
+        """Cached equivalent of `session.query(model).filter(model._name == name).first()`."""
+        database = _database(session, model)
+        with self._lock:
+            item_id = self._by_name.get((database, model, name))
+            if item_id is not None:
+                self._by_id.move_to_end((database, model, item_id))
+                self.hits += 1
+            else:
+                self.misses += 1
+        if item_id is not None:
+            return self._attach(session, model, item_id, name)
+        instance = session.query(model).filter(model._name == name).first()
+        if instance is not None:
+            self._store(database, model, instance.id, instance.name)
+        return instance
+
+    def all_rows(self, session, model):
+        """Returns [(id, name), ...] for every row of `model`, ordered by name."""
+        key = (_database(session, model), model)
+        with self._lock:
+            rows = self._all_rows.get(key)
+            if rows is not None:
+                self.hits += 1
+                return rows
+            self.misses += 1
+        rows = model.rows(session) # (id, name) namedtuples, no ORM objects
+        if len(rows) <= self.maxsize:
+            with self._lock:
+                self._all_rows[key] = rows
+        return rows
+
+    def _attach(self, session, model, item_id, name):
+        key = identity_key(model, item_id)
+        existing = session.identity_map.get(key)
+        if existing is not None:
+            return existing
+        # Build the object without __init__ (no validation, no pending changes), then mark it
+        # as a loaded row so adding it to the session emits no SQL.
+        instance = model.__mapper__.class_manager.new_instance()
+        instance.id = item_id
+        instance._name = name
+        make_transient_to_detached(instance)
+        session.add(instance)
+        return instance
+
+    # --- writing -----------------------------------------------------------------------
+
+    def _store(self, database, model, item_id, name):
+        with self._lock:
+            self._by_id[(database, model, item_id)] = name
+            self._by_id.move_to_end((database, model, item_id))
+            self._by_name[(database, model, name)] = item_id
+            while len(self._by_id) > self.maxsize:
+                (old_database, old_model, _), old_name = self._by_id.popitem(last=False)
+                self._by_name.pop((old_database, old_model, old_name), None)
+                self.evictions += 1
+
+    def invalidate(self, model=None):
+        """Drops every entry for `model` (in every database), or everything if no model is given."""
+        with self._lock:
+            if model is None:
+                self._by_id.clear()
+                self._by_name.clear()
+                self._all_rows.clear()
+                return
+            for entries in (self._by_id, self._by_name, self._all_rows):
+                for key in [key for key in entries if key[1] is model]:
+                    del entries[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._by_id),
+                "maxsize": self.maxsize,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+
+def _database(session, model):
+    """The engine `session` reads `model` through (also for sessions bound to a connection)."""
+    return (session.bind or session.get_bind(model)).engine
+
+
+lookup_cache = LookupCache()
+
+
+def register_lookup_models(*models):
+    """Hooks ORM events so writes to `models` invalidate their cache entries."""
+    model_set = set(models)
+
+    def on_write(mapper, connection, target):
+        lookup_cache.invalidate(type(target))
+        session = SessionClass.object_session(target)
+        if session is not None:
+            session.info.setdefault("lookup_models_written", set()).add(type(target))
+
+    for model in models:
+        for event_name in ("after_insert", "after_update", "after_delete"):
+            event.listen(model, event_name, on_write)
+
+    def on_transaction_end(session, *args):
+        # Another session may have refilled the cache from pre-commit data in the meantime.
+        for model in session.info.pop("lookup_models_written", ()):
+            lookup_cache.invalidate(model)
+
+    event.listen(SessionClass, "after_commit", on_transaction_end)
+    event.listen(SessionClass, "after_soft_rollback", on_transaction_end)
+
+    models_by_table = {model.__table__: model for model in models}
+
+    @event.listens_for(SessionClass, "do_orm_execute")
+    def on_bulk_write(orm_execute_state):
+        if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            model = mapper.class_
+        else: # Core statement on the table, e.g. insert(Platform.__table__) in the importer
+            model = models_by_table.get(getattr(orm_execute_state.statement, "table", None))
+        if model in model_set:
+            lookup_cache.invalidate(model)
+            orm_execute_state.session.info.setdefault("lookup_models_written", set()).add(model)
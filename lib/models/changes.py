@@ -0,0 +1,91 @@
+# lib/models/changes.py
+"""
+Change counters: a cheap way to ask "has `games` (or a lookup table) changed since I last looked?".
+
+The `data_version` table holds one row per counted table (games since migration 10, the
+lookup tables since migration 11), with two counters that triggers keep current:
+
+    inserts   rows inserted
+    changes   rows updated or deleted
+
+Reading them is a single-row primary-key lookup. The counters live in the database, so
+writes from any connection or process are seen. A reader that has a copy of the data (such
+as GameSnapshot) compares them with the values it saw last:
+
+- both unchanged: the copy is current;
+- only `inserts` moved: it can just load the rows added since;
+- `changes` moved: rows it already holds may differ, so it reloads.
+
+A fresh database starts its counters from zero again, so the same values can describe two
+different files (e.g. after lib.db.seed replaced gameshelf.db). The `generation` row,
+added by migration 12, holds a random number picked when the database was created; both
+`version()` and `versions()` include it, so counters read from a replaced file never match.
+
+The query-result cache (lib.models.query_cache) tags each entry with `versions()` of the
+tables the query reads and drops it once any of them moved.
+
+Bulk loads inside `deferred_indexing` skip the insert trigger and call `add_inserts()` once.
+"""
+from sqlalchemy import text
+
+LOOKUP_TABLES = ("platforms", "genres", "developers", "publishers")
+TABLES = ("games",) + LOOKUP_TABLES
+
+GENERATION = "generation" # data_version row whose `inserts` identifies this database file
+
+TABLE_STATEMENTS = [
+    "CREATE TABLE IF NOT EXISTS data_version ("
+    "name VARCHAR PRIMARY KEY, inserts INTEGER NOT NULL DEFAULT 0, changes INTEGER NOT NULL DEFAULT 0)",
+]
+
+GENERATION_STATEMENTS = [
+    f"INSERT OR IGNORE INTO data_version (name, inserts) VALUES ('{GENERATION}', random())",
+]
+
+
+def trigger_statements(tables=TABLES):
+    """Counter rows and DROP/CREATE statements for the counting triggers of `tables`."""
+    statements = []
+    for table in tables:
+        # The games insert trigger honours the bulk-load flag, like games_fts_ai
+        when = (" WHEN coalesce((SELECT deferred FROM games_fts_state), 0) = 0" if table == "games" else "")
+        bump = f"UPDATE data_version SET {{column}} = {{column}} + 1 WHERE name = '{table}';"
+        statements += [
+            f"INSERT OR IGNORE INTO data_version (name) VALUES ('{table}')",
+            f"DROP TRIGGER IF EXISTS {table}_version_ai",
+            f"DROP TRIGGER IF EXISTS {table}_version_ad",
+            f"DROP TRIGGER IF EXISTS {table}_version_au",
+            f"CREATE TRIGGER {table}_version_ai AFTER INSERT ON {table}{when} "
+            f"BEGIN {bump.format(column='inserts')} END",
+            f"CREATE TRIGGER {table}_version_ad AFTER DELETE ON {table} BEGIN {bump.format(column='changes')} END",
+            f"CREATE TRIGGER {table}_version_au AFTER UPDATE ON {table} BEGIN {bump.format(column='changes')} END",
+        ]
+    return statements
+
+
+def version(bind, table="games"):
+    """(generation, inserts, changes) for `table`; works on a Session or Connection."""
+    generation, counters = versions(bind, (table,))
+    return (generation,) + counters
+
+
+def versions(bind, tables):
+    """(generation, (inserts, changes), ...) for each of `tables`, in one query."""
+    generation = 0
+    counters = dict.fromkeys(tables, (0, 0))
+    rows = bind.execute(text("SELECT name, inserts, changes FROM data_version"))
+    for name, inserts, changed in rows:
+        if name in counters:
+            counters[name] = (inserts, changed)
+        elif name == GENERATION:
+            generation = inserts
+    return (generation,) + tuple(counters.values())
+
+
+def add_inserts(bind, count, table="games"):
+    """Counts `count` inserts made while the insert trigger was deferred."""
+    if count:
+        bind.execute(
+            text("UPDATE data_version SET inserts = inserts + :count WHERE name = :name"),
+            {"count": count, "name": table},
+        )
@@ -1,9 +1,16 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, func, exists
 from sqlalchemy.orm import relationship
 from .base import Base, Session 
+from .batch import commit, rollback
+from .validation import RULES, check_constraints
+from .cache import lookup_cache
+from .rows import lookup_rows
+from .query_cache import cached_instances
+from .merge import reassign_lookup_games, merge_lookup
 
 class Developer(Base):
     __tablename__ = 'developers'
+    __table_args__ = check_constraints('developers')
 
     id = Column(Integer, primary_key=True)
     _name = Column("name", String, unique=True, nullable=False) 
@@ -22,11 +29,7 @@ class Developer(Base):
     @name.setter
     def name(self, value):
         """Setter for the developer name with validation."""
-        if not isinstance(value, str):
-            raise TypeError("Developer name must be a string.")
-        if not 2 <= len(value) <= 100: 
-            raise ValueError("Developer name must be between 2 and 100 characters.")
-        self._name = value
+        self._name = RULES['developers']['name'].check(value)
 
 
     @classmethod
@@ -35,53 +38,101 @@ class Developer(Base):
         try:
             developer = cls(name=name)
             session.add(developer)
-            session.commit()
+            commit(session)
             return developer
         except (TypeError, ValueError) as e:
-            session.rollback()
+            rollback(session)
             print(f"Error creating developer: {e}")
             return None
     @classmethod
     def get_all(cls, session):
-        """Returns a list of all developers."""
-        return session.query(cls).order_by(cls._name).all()
+        """Returns a list of all developers. Their ids are cached (lib.models.query_cache) until `developers` changes."""
+        return cached_instances(
+            session, cls, ("Developer.get_all",), ("developers",), lambda session: session.query(cls).order_by(cls._name),
+        )
+
+    @classmethod
+    def get_all_with_counts(cls, session):
+        """Returns (developer, game_count) pairs for all developers, counted in one GROUP BY query."""
+        from .game import Game # Imported here to avoid a circular import
+        return (
+            session.query(cls, func.count(Game.id))
+            .outerjoin(Game, Game.developer_id == cls.id)
+            .group_by(cls.id).order_by(cls._name)
+            .all()
+        )
+
+    @classmethod
+    def rows(cls, session, counts=False):
+        """Read-only (id, name) rows ordered by name, or (id, name, games) with `counts`; no ORM objects."""
+        return lookup_rows(session, cls, 'developer', counts)
 
     @classmethod
     def find_by_id(cls, session, developer_id):
         """Finds a developer by its ID."""
-        return session.query(cls).get(developer_id)
+        return lookup_cache.get_by_id(session, cls, developer_id)
 
     @classmethod
     def find_by_name(cls, session, name):
         """Finds a developer by its name."""
-        return session.query(cls).filter(cls._name == name).first()
+        return lookup_cache.get_by_name(session, cls, name)
+
+    @classmethod
+    def find_similar(cls, session, name, threshold=0.5, limit=10):
+        """Returns (id, name, score) for developers with names similar to `name` (typos, case, punctuation)."""
+        from .similarity import similar # Imported here to avoid a circular import
+        return similar(session, "developer", name, threshold, limit)
+
+    def count_games(self, session):
+        """Counts the games attached to this developer without loading them."""
+        from .game import Game
+        return session.query(func.count(Game.id)).filter(Game.developer_id == self.id).scalar()
+
+    def has_games(self, session):
+        """True if any game references this developer, checked with EXISTS (stops at the first match)."""
+        from .game import Game
+        return session.query(exists().where(Game.developer_id == self.id)).scalar()
 
     def update(self, session, name=None):
         """Updates the developer's attributes."""
         if name is not None:
             try:
                 self.name = name 
-                session.commit()
+                commit(session)
                 return True
             except (TypeError, ValueError) as e:
-                session.rollback()
+                rollback(session)
                 print(f"Error updating developer: {e}")
                 return False
         return False
 
     def delete(self, session):
         """Deletes the developer instance from the database."""
-        if self.games:
+        if self.has_games(session):
             print(f"Cannot delete developer '{self.name}' as it has associated games. Please reassign or delete those games first.")
             return False
         try:
             session.delete(self)
-            session.commit()
+            commit(session)
             return True
         except Exception as e:
-            session.rollback()
+            rollback(session)
             print(f"Error deleting developer: {e}")
             return False
 
+    def reassign_games(self, session, target):
+        """
+        Moves every game from this developer to `target` with one UPDATE on games.
+        Returns the number of games moved, or None on error.
+        """
+        return reassign_lookup_games(session, self, target, 'developer_id')
+
+    def merge_into(self, session, target):
+        """
+        Merges this developer into `target`: moves its games there and deletes it, in one transaction.
+        Returns the number of games moved, or None on error (nothing is changed then).
+        """
+        return merge_lookup(session, self, target, 'developer_id')
+
     def __repr__(self):
         return f"<Developer(id={self.id}, name='{self.name}')>"
@@ -1,15 +1,52 @@
 # lib/models/game.py
-from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column, Integer, String, ForeignKey, tuple_, select, literal, func, union_all, update, delete
+)
+from sqlalchemy.orm import relationship, joinedload
 from .base import Base, Session # Import Base and Session from base.py
+from .batch import commit, rollback
+from .validation import RULES, check_constraints, validate_rows
+from .rows import GameRow
+from .changes import LOOKUP_TABLES
+from .query_cache import query_cache, cached_instances
 # Import related models for type hinting and relationship definitions
 from .platform import Platform
 from .genre import Genre
 from .developer import Developer
 from .publisher import Publisher
 
+GAME_RULES = RULES["games"]
+
+def validate_title(value):
+    """Returns `value` if it is a valid game title, else raises TypeError/ValueError."""
+    return GAME_RULES["title"].check(value)
+
+def validate_release_year(value):
+    """Returns `value` if it is a valid release year (or None), else raises TypeError/ValueError."""
+    return GAME_RULES["release_year"].check(value)
+
+def validate_rating(value):
+    """Returns `value` if it is a valid rating (or None), else raises TypeError/ValueError."""
+    return GAME_RULES["rating"].check(value)
+
+# Sort keys accepted by Game.filter; ties are broken by title, then id
+FILTER_SORTS = ("title", "year", "rating")
+YEAR_BUCKET = 10 # Facet counts group release years by decade
+# Filters accepted by Game.count, bulk_update and bulk_delete
+FILTER_KEYS = ("platform_id", "genre_id", "year_from", "year_to", "min_rating", "game_ids")
+# Foreign keys Game.bulk_update may set: column -> (model, required)
+BULK_RELATIONS = {
+    "platform_id": (Platform, True),
+    "genre_id": (Genre, True),
+    "developer_id": (Developer, False),
+    "publisher_id": (Publisher, False),
+}
+# Game.rows joins the lookup names, so its cached results depend on all five tables
+ROW_TABLES = ("games",) + LOOKUP_TABLES
+
 class Game(Base):
     __tablename__ = 'games'
+    __table_args__ = check_constraints('games')
 
     id = Column(Integer, primary_key=True)
     _title = Column("title", String, nullable=False)
@@ -43,11 +80,7 @@ class Game(Base):
 
     @title.setter
     def title(self, value):
-        if not isinstance(value, str):
-            raise TypeError("Game title must be a string.")
-        if not 1 <= len(value) <= 150:
-            raise ValueError("Game title must be between 1 and 150 characters.")
-        self._title = value
+        self._title = validate_title(value)
 
     @property
     def release_year(self):
@@ -55,13 +88,7 @@ class Game(Base):
 
     @release_year.setter
     def release_year(self, value):
-        if value is not None:
-            if not isinstance(value, int):
-                raise TypeError("Release year must be an integer.")
-            # A simple year range validation
-            if not (1950 <= value <= 2077): # Arbitrary reasonable range
-                raise ValueError("Release year seems invalid.")
-        self._release_year = value
+        self._release_year = validate_release_year(value)
 
     @property
     def rating(self):
@@ -69,12 +96,7 @@ class Game(Base):
 
     @rating.setter
     def rating(self, value):
-        if value is not None:
-            if not isinstance(value, int):
-                raise TypeError("Rating must be an integer.")
-            if not (1 <= value <= 5): # Assuming a 1-5 rating scale
-                raise ValueError("Rating must be between 1 and 5.")
-        self._rating = value
+        self._rating = validate_rating(value)
 
     # ORM Methods
     @classmethod
@@ -97,21 +119,27 @@ class Game(Base):
                 developer=developer, publisher=publisher
             )
             session.add(game)
-            session.commit()
+            commit(session)
             return game
         except (TypeError, ValueError) as e:
-            session.rollback()
+            rollback(session)
             print(f"Error creating game: {e}")
             return None
         except Exception as e:
-            session.rollback()
+            rollback(session)
             print(f"An unexpected error occurred during game creation: {e}")
             return None
 
     @classmethod
     def get_all(cls, session):
-        """Returns a list of all games."""
-        return session.query(cls).order_by(cls._title).all()
+        """
+        Returns a list of all games. Their ids are cached (lib.models.query_cache) until
+        `games` changes.
+        """
+        return cached_instances(
+            session, cls, ("Game.get_all",), ("games",),
+            lambda session: session.query(cls).order_by(cls._title_key(), cls.id),
+        )
 
     @classmethod
     def find_by_id(cls, session, game_id):
@@ -120,8 +148,326 @@ class Game(Base):
 
     @classmethod
     def find_by_title(cls, session, title_query):
-        """Finds games with titles containing the query string (case-insensitive)."""
-        return session.query(cls).filter(cls._title.ilike(f"%{title_query}%")).all()
+        """
+        Finds games with titles containing the query string (case-insensitive).
+        The matching ids are cached (lib.models.query_cache), so repeating a term loads the
+        games by primary key instead of scanning every title again.
+        """
+        return cached_instances(
+            session, cls, ("Game.find_by_title", title_query), ("games",),
+            lambda session: session.query(cls).filter(cls._title.ilike(f"%{title_query}%")),
+        )
+
+    @classmethod
+    def search(cls, session, search_term, limit=50):
+        """Full-text title search: prefix-matches every word and ranks results by BM25."""
+        from .search import search_games # Imported here to avoid a circular import
+        return search_games(session, search_term, limit)
+
+    @classmethod
+    def find_similar(cls, session, title, threshold=0.5, limit=10):
+        """
+        Typo-tolerant title lookup: returns (id, title, score) for the most similar titles,
+        best first, using the trigram index.
+        """
+        from .similarity import similar # Imported here to avoid a circular import
+        return similar(session, "game", title, threshold, limit)
+
+    @classmethod
+    def list_with_relations(cls, session, title_query=None, game_id=None):
+        """
+        Returns games ordered by title with platform, genre, developer and publisher
+        already loaded, so listing them costs one query instead of one per relationship per row.
+        Optionally narrowed to a title search or a single game ID.
+        """
+        query = session.query(cls).options(
+            joinedload(cls.platform),
+            joinedload(cls.genre),
+            joinedload(cls.developer),
+            joinedload(cls.publisher),
+        )
+        if title_query is not None:
+            query = query.filter(cls._title.ilike(f"%{title_query}%"))
+        if game_id is not None:
+            query = query.filter(cls.id == game_id)
+        return query.order_by(cls._title_key()).all()
+
+    @classmethod
+    def _title_key(cls):
+        """
+        Titles sort case-insensitively (NOCASE, indexed since migration 3), so "wolf" and
+        "Wolf" sit together and a jump to "w" lands on the W titles.
+        """
+        return cls._title.collate("NOCASE")
+
+    @classmethod
+    def _keyset_criteria(cls, after=None, before=None):
+        """WHERE clauses for the keyset page after or before a (title, id) key."""
+        title = cls._title_key()
+        key = tuple_(title, cls.id)
+        # The plain title bound lets SQLite seek the index; on the row value alone it scans it
+        if after is not None:
+            return [title >= after[0], key > tuple_(*after)]
+        return [title <= before[0], key < tuple_(*before)]
+
+    @classmethod
+    def page(cls, session, after=None, before=None, limit=20):
+        """
+        Returns one page of games ordered by (title, id), with relationships loaded.
+        Uses keyset pagination: pass the (title, id) of the last game shown as `after` for the
+        next page, or of the first game shown as `before` for the previous one. Every page costs
+        one index range scan, no matter how deep into the collection it is.
+        To jump to a letter, pass `after=(letter, 0)`.
+        """
+        title = cls._title_key()
+        query = session.query(cls).options(
+            joinedload(cls.platform),
+            joinedload(cls.genre),
+            joinedload(cls.developer),
+            joinedload(cls.publisher),
+        )
+        if before is not None:
+            games = (
+                query.filter(*cls._keyset_criteria(before=before))
+                .order_by(title.desc(), cls.id.desc())
+                .limit(limit)
+                .all()
+            )
+            return games[::-1]
+        if after is not None:
+            query = query.filter(*cls._keyset_criteria(after=after))
+        return query.order_by(title, cls.id).limit(limit).all()
+
+    @classmethod
+    def _filter_criteria(cls, platform_id=None, genre_id=None, year_from=None, year_to=None, min_rating=None,
+                         game_ids=None):
+        """Returns the WHERE clauses shared by filter(), facets() and the bulk operations."""
+        criteria = []
+        if game_ids is not None:
+            criteria.append(cls.id.in_(game_ids))
+        if platform_id is not None:
+            criteria.append(cls.platform_id == platform_id)
+        if genre_id is not None:
+            criteria.append(cls.genre_id == genre_id)
+        if year_from is not None:
+            criteria.append(cls._release_year >= year_from)
+        if year_to is not None:
+            criteria.append(cls._release_year <= year_to)
+        if min_rating is not None:
+            criteria.append(cls._rating >= min_rating)
+        return criteria
+
+    @classmethod
+    def filter(cls, session, platform_id=None, genre_id=None, year_from=None, year_to=None, min_rating=None,
+               sort="title", descending=False, limit=50):
+        """
+        Returns games matching every given filter (all optional), with relationships loaded.
+        `sort` is one of FILTER_SORTS; games without a year or rating sort last.
+        """
+        criteria = cls._filter_criteria(platform_id, genre_id, year_from, year_to, min_rating)
+        query = session.query(cls).options(
+            joinedload(cls.platform),
+            joinedload(cls.genre),
+            joinedload(cls.developer),
+            joinedload(cls.publisher),
+        ).filter(*criteria).order_by(*cls._sort_order(sort, descending))
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    @classmethod
+    def _sort_order(cls, sort, descending):
+        """ORDER BY clauses for filter() and rows(): the sort column (missing values last), then title and id."""
+        if sort not in FILTER_SORTS:
+            raise ValueError(f"Sort must be one of: {', '.join(FILTER_SORTS)}.")
+        order = []
+        if sort != "title":
+            column = cls._release_year if sort == "year" else cls._rating
+            order += [column.is_(None), column.desc() if descending else column]
+        title = cls._title_key()
+        order += [title.desc(), cls.id.desc()] if descending and sort == "title" else [title, cls.id]
+        return order
+
+    @classmethod
+    def rows(cls, session, game_ids=None, sort="title", descending=False, limit=None, after=None, before=None,
+             cache=True, **filters):
+        """
+        Read-only GameRow tuples (id, title, release_year, rating and the platform, genre,
+        developer and publisher names) from one column SELECT, without ORM objects.
+        Takes the keyword filters of Game.filter and its `sort`/`descending` order. With
+        `sort=None`, rows come back in the order of `game_ids`. `after`/`before` are (title, id)
+        keys for keyset pages in title order, as for Game.page.
+        Results are cached (lib.models.query_cache) until games or a lookup table changes;
+        pass `cache=False` for one-off reads such as streaming the whole collection.
+        """
+        if not cache:
+            return cls._select_rows(session, game_ids, sort, descending, limit, after, before, **filters)
+        game_ids, after, before = (None if value is None else tuple(value) for value in (game_ids, after, before))
+        key = ("Game.rows", game_ids, sort, descending, limit, after, before, tuple(sorted(filters.items())))
+        return list(query_cache.get(
+            session, key, ROW_TABLES,
+            lambda session: cls._select_rows(session, game_ids, sort, descending, limit, after, before, **filters),
+        ))
+
+    @classmethod
+    def _select_rows(cls, session, game_ids=None, sort="title", descending=False, limit=None, after=None, before=None,
+                     **filters):
+        criteria = cls._filter_criteria(game_ids=game_ids, **filters)
+        if after is not None or before is not None:
+            if sort != "title" or descending:
+                raise ValueError("Keyset pages (after/before) are only available in title order.")
+            criteria += cls._keyset_criteria(after, before)
+        query = (
+            select(cls.id, cls._title, cls._release_year, cls._rating,
+                   Platform._name, Genre._name, Developer._name, Publisher._name)
+            .join(cls.platform)
+            .join(cls.genre)
+            .outerjoin(cls.developer)
+            .outerjoin(cls.publisher)
+            .where(*criteria)
+        )
+        if sort is not None:
+            # The previous page is read backwards from `before`, then flipped
+            query = query.order_by(*cls._sort_order(sort, descending or before is not None))
+        if limit is not None:
+            query = query.limit(limit)
+        rows = list(map(GameRow._make, session.execute(query)))
+        if sort is None and game_ids is not None:
+            position = {game_id: index for index, game_id in enumerate(game_ids)}
+            rows.sort(key=lambda row: position[row.id])
+        return rows[::-1] if before is not None else rows
+
+    @classmethod
+    def search_rows(cls, session, search_term, limit=50):
+        """Game.search as read-only GameRow tuples, best match first."""
+        from .search import search_game_ids # Imported here to avoid a circular import
+
+        def search(session):
+            return cls._select_rows(session, game_ids=search_game_ids(session, search_term, limit), sort=None)
+
+        return list(query_cache.get(session, ("Game.search_rows", search_term, limit), ROW_TABLES, search))
+
+    @classmethod
+    def facets(cls, session, platform_id=None, genre_id=None, year_from=None, year_to=None, min_rating=None):
+        """
+        Counts the games matching the filters per platform, per genre and per release decade,
+        in a single query (three GROUP BYs over one filtered CTE, glued with UNION ALL).
+        Returns {"total": n, "platform": [(id, name, count)], "genre": [...], "year": [(decade, count)]}.
+        """
+        from .cache import lookup_cache # Imported here to avoid a circular import
+        criteria = cls._filter_criteria(platform_id, genre_id, year_from, year_to, min_rating)
+        matching = (
+            select(cls.platform_id, cls.genre_id, cls._release_year.label("release_year"))
+            .where(*criteria)
+            .cte("matching")
+        )
+        decade = (matching.c.release_year // YEAR_BUCKET) * YEAR_BUCKET
+        query = union_all(
+            select(literal("platform").label("facet"), matching.c.platform_id.label("value"), func.count())
+            .group_by(matching.c.platform_id),
+            select(literal("genre"), matching.c.genre_id, func.count()).group_by(matching.c.genre_id),
+            select(literal("year"), decade, func.count()).group_by(decade),
+        )
+        counts = {"platform": {}, "genre": {}, "year": {}}
+        for facet, value, count in session.execute(query):
+            counts[facet][value] = count
+
+        result = {"total": sum(counts["platform"].values())}
+        for facet, model in (("platform", Platform), ("genre", Genre)):
+            names = dict(lookup_cache.all_rows(session, model))
+            result[facet] = sorted(
+                ((item_id, names.get(item_id, "?"), count) for item_id, count in counts[facet].items()),
+                key=lambda row: (-row[2], row[1]),
+            )
+        result["year"] = sorted(counts["year"].items(), key=lambda row: (row[0] is None, row[0] or 0))
+        return result
+
+    @classmethod
+    def count(cls, session, **filters):
+        """Counts the games matching `filters` (the keyword filters of Game.filter, plus game_ids)."""
+        return session.query(func.count(cls.id)).filter(*cls._filter_criteria(**filters)).scalar()
+
+    @classmethod
+    def _bulk_criteria(cls, filters):
+        """WHERE clauses for a bulk operation; an empty or unknown filter is an error."""
+        unknown = set(filters) - set(FILTER_KEYS)
+        if unknown:
+            raise TypeError(f"Unknown filter(s): {', '.join(sorted(unknown))}.")
+        if not any(value is not None for value in filters.values()):
+            raise ValueError("Refusing to change every game; give at least one filter.")
+        return cls._filter_criteria(**filters)
+
+    @classmethod
+    def _bulk_values(cls, session, values):
+        """Validates bulk_update values like the property setters do and maps them to columns."""
+        rules = {name: GAME_RULES[name] for name in values if name in GAME_RULES}
+        errors = validate_rows([values], rules)
+        if errors:
+            raise ValueError(" ".join(errors[0]))
+        columns = {}
+        for name, value in values.items():
+            if name in GAME_RULES:
+                columns[getattr(cls, f"_{name}")] = value
+            elif name in BULK_RELATIONS:
+                model, required = BULK_RELATIONS[name]
+                if value is None and required:
+                    raise ValueError(f"A game must have a {model.__name__.lower()}.")
+                if value is not None and model.find_by_id(session, value) is None:
+                    raise ValueError(f"No {model.__name__} with ID {value}.")
+                columns[getattr(cls, name)] = value
+            else:
+                raise TypeError(f"Cannot bulk update '{name}'.")
+        if not columns:
+            raise ValueError("No values to update.")
+        return columns
+
+    @classmethod
+    def bulk_update(cls, session, filters, **values):
+        """
+        Sets `values` (title, release_year, rating, platform_id, genre_id, developer_id,
+        publisher_id) on every game matching `filters` with one UPDATE ... WHERE statement.
+        `filters` takes the keyword filters of Game.filter plus game_ids, and must not be empty.
+        Values are validated like the property setters. Returns the number of games updated,
+        or None on error.
+        """
+        try:
+            criteria = cls._bulk_criteria(filters)
+            columns = cls._bulk_values(session, values)
+            result = session.execute(
+                update(cls).where(*criteria).values(columns).execution_options(synchronize_session="fetch")
+            )
+            commit(session)
+            return result.rowcount
+        except (TypeError, ValueError) as e:
+            rollback(session)
+            print(f"Error updating games: {e}")
+            return None
+        except Exception as e:
+            rollback(session)
+            print(f"An unexpected error occurred during bulk update: {e}")
+            return None
+
+    @classmethod
+    def bulk_delete(cls, session, filters):
+        """
+        Deletes every game matching `filters` (as for bulk_update, must not be empty) with one
+        DELETE ... WHERE statement. Returns the number of games deleted, or None on error.
+        """
+        try:
+            criteria = cls._bulk_criteria(filters)
+            result = session.execute(
+                delete(cls).where(*criteria).execution_options(synchronize_session="fetch")
+            )
+            commit(session)
+            return result.rowcount
+        except (TypeError, ValueError) as e:
+            rollback(session)
+            print(f"Error deleting games: {e}")
+            return None
+        except Exception as e:
+            rollback(session)
+            print(f"An unexpected error occurred during bulk delete: {e}")
+            return None
 
     def update(self, session, title=None, platform=None, genre=None, release_year=None, rating=None, developer=None, publisher=None):
         """Updates the game's attributes."""
@@ -151,14 +497,14 @@ class Game(Base):
                 updated = True
 
             if updated:
-                session.commit()
+                commit(session)
             return updated
         except (TypeError, ValueError) as e:
-            session.rollback()
+            rollback(session)
             print(f"Error updating game '{self.title}': {e}")
             return False
         except Exception as e:
-            session.rollback()
+            rollback(session)
             print(f"An unexpected error occurred during game update: {e}")
             return False
 
@@ -167,10 +513,10 @@ class Game(Base):
         """Deletes the game instance from the database."""
         try:
             session.delete(self)
-            session.commit()
+            commit(session)
             return True
         except Exception as e:
-            session.rollback()
+            rollback(session)
             print(f"Error deleting game '{self.title}': {e}")
             return False
 
@@ -1,10 +1,17 @@
 # lib/models/genre.py
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, func, exists
 from sqlalchemy.orm import relationship
 from .base import Base, Session
+from .batch import commit, rollback
+from .validation import RULES, check_constraints
+from .cache import lookup_cache
+from .rows import lookup_rows
+from .query_cache import cached_instances
+from .merge import reassign_lookup_games, merge_lookup
 
 class Genre(Base):
     __tablename__ = 'genres'
+    __table_args__ = check_constraints('genres')
 
     id = Column(Integer, primary_key=True)
     _name = Column("name", String, unique=True, nullable=False)
@@ -20,65 +27,108 @@ class Genre(Base):
 
     @name.setter
     def name(self, value):
-        if not isinstance(value, str):
-            raise TypeError("Genre name must be a string.")
-        if not 2 <= len(value) <= 30:
-            raise ValueError("Genre name must be between 2 and 30 characters.")
-        self._name = value
+        self._name = RULES['genres']['name'].check(value)
 
     @classmethod
     def create(cls, session, name):
         try:
             genre = cls(name=name)
             session.add(genre)
-            session.commit()
+            commit(session)
             return genre
         except (TypeError, ValueError) as e:
-            session.rollback()
+            rollback(session)
             print(f"Error creating genre: {e}")
             return None
         except Exception as e:
-            session.rollback()
+            rollback(session)
             print(f"An unexpected error occurred: {e}")
             return None
 
 
     @classmethod
     def get_all(cls, session):
-        return session.query(cls).all()
+        """Returns a list of all genres. Their ids are cached (lib.models.query_cache) until `genres` changes."""
+        return cached_instances(
+            session, cls, ("Genre.get_all",), ("genres",), lambda session: session.query(cls),
+        )
+
+    @classmethod
+    def get_all_with_counts(cls, session):
+        from .game import Game # Imported here to avoid a circular import
+        return (
+            session.query(cls, func.count(Game.id))
+            .outerjoin(Game, Game.genre_id == cls.id)
+            .group_by(cls.id)
+            .all()
+        )
+
+    @classmethod
+    def rows(cls, session, counts=False):
+        """Read-only (id, name) rows ordered by name, or (id, name, games) with `counts`; no ORM objects."""
+        return lookup_rows(session, cls, 'genre', counts)
 
     @classmethod
     def find_by_id(cls, session, genre_id):
-        return session.query(cls).get(genre_id)
+        return lookup_cache.get_by_id(session, cls, genre_id)
 
     @classmethod
     def find_by_name(cls, session, name):
-        return session.query(cls).filter(cls._name == name).first()
+        return lookup_cache.get_by_name(session, cls, name)
+
+    @classmethod
+    def find_similar(cls, session, name, threshold=0.5, limit=10):
+        """Returns (id, name, score) for genres with names similar to `name` (typos, case, punctuation)."""
+        from .similarity import similar # Imported here to avoid a circular import
+        return similar(session, "genre", name, threshold, limit)
+
+    def count_games(self, session):
+        from .game import Game
+        return session.query(func.count(Game.id)).filter(Game.genre_id == self.id).scalar()
+
+    def has_games(self, session):
+        """True if any game references this genre, checked with EXISTS (stops at the first match)."""
+        from .game import Game
+        return session.query(exists().where(Game.genre_id == self.id)).scalar()
 
     def update(self, session, name=None):
         if name is not None:
             try:
                 self.name = name
-                session.commit()
+                commit(session)
                 return True
             except (TypeError, ValueError) as e:
-                session.rollback()
+                rollback(session)
                 print(f"Error updating genre: {e}")
                 return False
         return False
 
     def delete(self, session):
-        if self.games:
+        if self.has_games(session):
             print(f"Cannot delete genre '{self.name}' as it has associated games.")
             return False
         try:
             session.delete(self)
-            session.commit()
+            commit(session)
             return True
         except Exception as e:
-            session.rollback()
+            rollback(session)
             print(f"Error deleting genre: {e}")
             return False
 
+    def reassign_games(self, session, target):
+        """
+        Moves every game from this genre to `target` with one UPDATE on games.
+        Returns the number of games moved, or None on error.
+        """
+        return reassign_lookup_games(session, self, target, 'genre_id')
+
+    def merge_into(self, session, target):
+        """
+        Merges this genre into `target`: moves its games there and deletes it, in one transaction.
+        Returns the number of games moved, or None on error (nothing is changed then).
+        """
+        return merge_lookup(session, self, target, 'genre_id')
+
     def __repr__(self):
         return f"<Genre(id={self.id}, name='{self.name}')>"
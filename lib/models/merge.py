@@ -0,0 +1,88 @@
+# lib/models/merge.py
+"""
+Moving games between platforms, genres, developers or publishers, and merging one into another.
+
+The models' `reassign_games` and `merge_into` call these with the games column that points
+at them (e.g. "genre_id"). The games are moved with one UPDATE on `games`, however many
+there are. Games already loaded in the session are kept consistent: the UPDATE synchronizes
+their foreign key, and their relationship to the source (e.g. `game.genre`) is expired so it
+loads the target on next access.
+"""
+from sqlalchemy import inspect
+
+from .batch import commit, rollback
+
+
+def reassign_lookup_games(session, source, target, column):
+    """
+    Moves every game from `source` to `target` (both saved instances of one lookup model).
+    Returns the number of games moved, or None on error.
+    """
+    kind = type(source).__name__.lower()
+    try:
+        _check_target(source, target)
+        if target.id == source.id:
+            raise ValueError(f"Cannot move games to the same {kind}.")
+        moved = _move_games(session, source, target, column)
+        commit(session)
+        return moved
+    except (TypeError, ValueError) as e:
+        rollback(session)
+        print(f"Error moving games: {e}")
+        return None
+    except Exception as e:
+        rollback(session)
+        print(f"An unexpected error occurred while moving games: {e}")
+        return None
+
+
+def merge_lookup(session, source, target, column):
+    """
+    Merges `source` into `target`: moves its games there and deletes it, in one transaction.
+    Returns the number of games moved, or None on error (nothing is changed then).
+    """
+    kind = type(source).__name__.lower()
+    try:
+        _check_target(source, target)
+        if target.id == source.id:
+            raise ValueError(f"Cannot merge a {kind} into itself.")
+        moved = _move_games(session, source, target, column)
+        session.delete(source)
+        commit(session)
+        return moved
+    except (TypeError, ValueError) as e:
+        rollback(session)
+        print(f"Error merging {kind}: {e}")
+        return None
+    except Exception as e:
+        rollback(session)
+        print(f"An unexpected error occurred during {kind} merge: {e}")
+        return None
+
+
+def _check_target(source, target):
+    model = type(source)
+    if not isinstance(target, model) or target.id is None:
+        raise TypeError(f"Target must be a saved {model.__name__}.")
+
+
+def _move_games(session, source, target, column):
+    from .game import Game # Imported here to avoid a circular import
+    foreign_key = getattr(Game, column)
+    relationship = column[:-len("_id")]
+    # Loaded games whose relationship still holds the source object (checked without loading anything)
+    loaded = [
+        game for game in session.identity_map.values()
+        if isinstance(game, Game) and inspect(game).dict.get(relationship) is source
+    ]
+    moved = (
+        session.query(Game)
+        .filter(foreign_key == source.id)
+        .update({foreign_key: target.id}, synchronize_session="evaluate")
+    )
+    for game in loaded:
+        session.expire(game, [relationship])
+    # The games collections (if loaded) no longer match the database
+    session.expire(source, ["games"])
+    session.expire(target, ["games"])
+    return moved
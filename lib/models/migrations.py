@@ -0,0 +1,369 @@
+# lib/models/migrations.py
+"""
+Versioned schema migrations for gameshelf.db.
+
+`Base.metadata.create_all` only creates missing tables; it never changes a table or adds
+an index to a database that already exists. Everything beyond the plain tables is
+therefore added here as a numbered migration. The highest applied version is recorded in
+the `schema_version` table, so running `migrate()` against an existing database only
+applies what it is missing.
+
+Each migration carries a few probe queries that are timed before and after it is
+applied, which gives a before/after report of what the migration bought. A probe may name
+a different query for the "after" run when the migration introduces a new way to answer it
+(e.g. the FTS5 table replacing a LIKE scan).
+
+Run `python -m lib.db.migrate` to upgrade gameshelf.db in place.
+"""
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import event, text
+from .base import engine
+from . import stats, similarity, validation, changes
+
+SCHEMA_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    description VARCHAR NOT NULL,
+    applied_at VARCHAR NOT NULL
+)
+"""
+
+
+class Migration:
+    """
+    A numbered list of DDL statements plus the probe queries used to time it.
+    A statement may also be a function of the connection, for steps that depend on the
+    current schema. `foreign_keys_off` runs the migration with foreign key enforcement off,
+    which SQLite requires for dropping and recreating a table other tables refer to.
+    """
+
+    def __init__(self, version, description, statements, probes=None, foreign_keys_off=False):
+        self.version = version
+        self.description = description
+        self.statements = statements
+        self.probes = probes or {} # label -> (sql, params) or (sql, params, after_sql)
+        self.foreign_keys_off = foreign_keys_off
+
+    def apply(self, connection):
+        for statement in self.statements:
+            if callable(statement):
+                statement(connection)
+            else:
+                connection.exec_driver_sql(statement)
+
+    def __repr__(self):
+        return f"<Migration(version={self.version}, description='{self.description}')>"
+
+
+def add_check_constraints(table):
+    """
+    Migration step that rebuilds `table` with the CHECK constraints from lib.models.validation,
+    as SQLite cannot add a constraint to an existing table: create a copy with the constraints,
+    copy the rows, drop the original, rename the copy, then recreate the original's indexes
+    and triggers (title/trigram search, statistics) from their stored SQL.
+    Tables that already have the constraints (created by create_all) are left alone.
+    """
+    def step(connection):
+        create_sql = connection.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).scalar()
+        names = [validation.constraint_name(table, column) for column in validation.RULES[table]]
+        if all(name in create_sql for name in names):
+            return
+        bad_rows = connection.exec_driver_sql(validation.violations_sql(table)).scalar()
+        if bad_rows:
+            raise ValueError(f"{bad_rows} rows in {table} break the validation rules; fix them and migrate again.")
+        dependents = connection.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') "
+            "AND sql IS NOT NULL", (table,)
+        ).scalars().all()
+        head, _, _ = create_sql.rstrip().rpartition(")")
+        head = head.replace(f"CREATE TABLE {table} (", f"CREATE TABLE {table}_new (", 1)
+        clauses = ", \n\t".join(validation.constraint_clauses(table))
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {table}_new")
+        connection.exec_driver_sql(f"{head.rstrip()}, \n\t{clauses}\n)")
+        connection.exec_driver_sql(f"INSERT INTO {table}_new SELECT * FROM {table}")
+        connection.exec_driver_sql(f"DROP TABLE {table}")
+        connection.exec_driver_sql(f"ALTER TABLE {table}_new RENAME TO {table}")
+        for sql in dependents:
+            connection.exec_driver_sql(sql)
+    return step
+
+
+def check_foreign_keys(connection):
+    """Fails the migration if a table rebuild left any dangling foreign key."""
+    problem = connection.exec_driver_sql("PRAGMA foreign_key_check").first()
+    if problem is not None:
+        raise ValueError(f"Foreign key check failed after rebuild: {tuple(problem)}.")
+
+
+MIGRATIONS = [
+    Migration(
+        1, "Index games foreign keys",
+        [
+            "CREATE INDEX IF NOT EXISTS ix_games_platform_id ON games (platform_id)",
+            "CREATE INDEX IF NOT EXISTS ix_games_genre_id ON games (genre_id)",
+            "CREATE INDEX IF NOT EXISTS ix_games_developer_id ON games (developer_id)",
+            "CREATE INDEX IF NOT EXISTS ix_games_publisher_id ON games (publisher_id)",
+        ],
+        probes={
+            "games for one platform": ("SELECT count(*) FROM games WHERE platform_id = :id", {"id": 1}),
+            "games for one genre": ("SELECT count(*) FROM games WHERE genre_id = :id", {"id": 1}),
+            "games for one developer": ("SELECT count(*) FROM games WHERE developer_id = :id", {"id": 1}),
+            "games for one publisher": ("SELECT count(*) FROM games WHERE publisher_id = :id", {"id": 1}),
+        },
+    ),
+    Migration(
+        2, "Index games title",
+        ["CREATE INDEX IF NOT EXISTS ix_games_title ON games (title)"],
+        probes={
+            "first page ordered by title": ("SELECT id, title FROM games ORDER BY title LIMIT 50", {}),
+            "exact title lookup": ("SELECT id FROM games WHERE title = :title", {"title": "Elden Ring"}),
+        },
+    ),
+    Migration(
+        3, "Index games title case-insensitively",
+        ["CREATE INDEX IF NOT EXISTS ix_games_title_nocase ON games (title COLLATE NOCASE)"],
+        probes={
+            "case-insensitive title lookup": (
+                "SELECT id FROM games WHERE title = :title COLLATE NOCASE", {"title": "elden ring"}
+            ),
+            "case-insensitive title prefix": (
+                "SELECT id FROM games WHERE title >= :lo COLLATE NOCASE AND title < :hi COLLATE NOCASE LIMIT 50",
+                {"lo": "the", "hi": "thf"},
+            ),
+        },
+    ),
+    Migration(
+        4, "Full-text search over games titles",
+        [
+            # External-content FTS5 table: the index lives in games_fts, the text stays in games.
+            "CREATE VIRTUAL TABLE IF NOT EXISTS games_fts USING fts5("
+            "title, content='games', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+            "CREATE TRIGGER IF NOT EXISTS games_fts_ai AFTER INSERT ON games BEGIN "
+            "INSERT INTO games_fts (rowid, title) VALUES (new.id, new.title); END",
+            "CREATE TRIGGER IF NOT EXISTS games_fts_ad AFTER DELETE ON games BEGIN "
+            "INSERT INTO games_fts (games_fts, rowid, title) VALUES ('delete', old.id, old.title); END",
+            "CREATE TRIGGER IF NOT EXISTS games_fts_au AFTER UPDATE OF title ON games BEGIN "
+            "INSERT INTO games_fts (games_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+            "INSERT INTO games_fts (rowid, title) VALUES (new.id, new.title); END",
+            "INSERT INTO games_fts (games_fts) VALUES ('rebuild')",
+        ],
+        probes={
+            "title word search": (
+                "SELECT id FROM games WHERE title LIKE :like LIMIT 50", {"like": "%ring%", "match": '"ring"*'},
+                "SELECT rowid FROM games_fts WHERE games_fts MATCH :match ORDER BY rank LIMIT 50",
+            ),
+        },
+    ),
+    Migration(
+        5, "Let bulk loads defer full-text indexing",
+        [
+            # Indexing FTS5 one trigger call at a time is several times slower than a single
+            # INSERT ... SELECT, so bulk writers set `deferred` inside their own transaction,
+            # then index their new rows in one statement (see lib.models.search.deferred_indexing).
+            "CREATE TABLE IF NOT EXISTS games_fts_state (deferred INTEGER NOT NULL DEFAULT 0)",
+            "INSERT INTO games_fts_state (deferred) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM games_fts_state)",
+            "DROP TRIGGER IF EXISTS games_fts_ai",
+            "CREATE TRIGGER games_fts_ai AFTER INSERT ON games "
+            "WHEN coalesce((SELECT deferred FROM games_fts_state), 0) = 0 BEGIN "
+            "INSERT INTO games_fts (rowid, title) VALUES (new.id, new.title); END",
+        ],
+    ),
+    Migration(
+        6, "Composite indexes for faceted filtering",
+        [
+            # Each index holds all four filter/facet columns, so filtering on a leading column and
+            # counting facets never touches the table. The leading columns cover the platform and
+            # genre foreign keys, which makes their single-column indexes redundant.
+            "CREATE INDEX IF NOT EXISTS ix_games_platform_genre_year_rating "
+            "ON games (platform_id, genre_id, release_year, rating)",
+            "CREATE INDEX IF NOT EXISTS ix_games_genre_year_rating_platform "
+            "ON games (genre_id, release_year, rating, platform_id)",
+            "CREATE INDEX IF NOT EXISTS ix_games_year_rating_platform_genre "
+            "ON games (release_year, rating, platform_id, genre_id)",
+            "DROP INDEX IF EXISTS ix_games_platform_id",
+            "DROP INDEX IF EXISTS ix_games_genre_id",
+            "ANALYZE games",
+        ],
+        probes={
+            "platform + genre facet count": (
+                "SELECT release_year, count(*) FROM games WHERE platform_id = :p AND genre_id = :g "
+                "GROUP BY release_year", {"p": 1, "g": 1},
+            ),
+            "genre + year range + rating": (
+                "SELECT count(*) FROM games WHERE genre_id = :g AND release_year BETWEEN :lo AND :hi "
+                "AND rating >= :r", {"g": 1, "lo": 2000, "hi": 2010, "r": 4},
+            ),
+            "year range facet by platform": (
+                "SELECT platform_id, count(*) FROM games WHERE release_year BETWEEN :lo AND :hi "
+                "GROUP BY platform_id", {"lo": 2000, "hi": 2010},
+            ),
+        },
+    ),
+    Migration(
+        7, "Incrementally maintained statistics tables",
+        # Summary tables, the triggers that keep them current, and their initial contents
+        stats.TABLE_STATEMENTS + stats.trigger_statements() + stats.rebuild_statements(),
+        probes={
+            "games and average rating per genre": (
+                "SELECT genre_id, count(*), avg(rating) FROM games GROUP BY genre_id", {},
+                "SELECT entity_id, games, rating_sum * 1.0 / rated_games FROM game_stats "
+                "WHERE dimension = 'genre' AND games > 0",
+            ),
+            "release-year histogram": (
+                "SELECT release_year, count(*) FROM games GROUP BY release_year", {},
+                "SELECT release_year, games FROM game_year_stats WHERE dimension = 'all' AND games > 0",
+            ),
+        },
+    ),
+    Migration(
+        8, "Trigram indexes over game titles and lookup names",
+        similarity.index_statements(),
+        probes={
+            "title containing a fragment": (
+                "SELECT id FROM games WHERE title LIKE :like LIMIT 50", {"like": "%itche%", "match": '"itche"'},
+                "SELECT rowid FROM games_trigram WHERE games_trigram MATCH :match LIMIT 50",
+            ),
+        },
+    ),
+    Migration(
+        9, "CHECK constraints for game fields and lookup names",
+        [add_check_constraints(table) for table in ("platforms", "genres", "developers", "publishers", "games")]
+        + [check_foreign_keys, "ANALYZE"],
+        probes={
+            # Constraints cost a little on writes; this confirms reads and the rebuilt indexes are unaffected
+            "genre + year range + rating": (
+                "SELECT count(*) FROM games WHERE genre_id = :g AND release_year BETWEEN :lo AND :hi "
+                "AND rating >= :r", {"g": 1, "lo": 2000, "hi": 2010, "r": 4},
+            ),
+        },
+        foreign_keys_off=True,
+    ),
+    Migration(
+        10, "Change counters for games",
+        changes.TABLE_STATEMENTS + changes.trigger_statements(("games",)),
+    ),
+    Migration(
+        11, "Change counters for the lookup tables",
+        changes.trigger_statements(changes.LOOKUP_TABLES),
+    ),
+    Migration(
+        12, "Database generation for the change counters",
+        changes.GENERATION_STATEMENTS,
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(connection):
+    """Returns the highest migration version recorded in the database (0 if none)."""
+    connection.exec_driver_sql(SCHEMA_VERSION_DDL)
+    return connection.exec_driver_sql("SELECT coalesce(max(version), 0) FROM schema_version").scalar()
+
+
+def stored_version(connection):
+    """
+    Returns the recorded schema version without creating anything, or None if the database
+    has never been migrated (including a brand-new, empty file).
+    """
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).first()
+    if exists is None:
+        return None
+    return connection.exec_driver_sql("SELECT max(version) FROM schema_version").scalar()
+
+
+def _time_probes(connection, migration, after=False, repeat=3):
+    """Runs each probe query `repeat` times and returns the best time per probe, in ms."""
+    timings = {}
+    for label, probe in migration.probes.items():
+        sql, params = probe[0], probe[1]
+        if after and len(probe) > 2:
+            sql = probe[2]
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            connection.execute(text(sql), params).fetchall()
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        timings[label] = best
+    return timings
+
+
+def _emit_begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+def migrate(bind=None, verbose=True):
+    """
+    Applies every pending migration, each in its own transaction: a migration that fails
+    midway leaves no partial schema behind and is retried as a whole on the next run.
+    Returns a list of report dicts, one per applied migration.
+    """
+    bind = bind or engine
+    reports = []
+    with bind.begin() as connection:
+        version = current_version(connection)
+
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+        with bind.connect() as connection:
+            # SQLAlchemy's recipe for transactional DDL on pysqlite: the driver only opens a
+            # transaction before DML (DDL would autocommit), so switch its own transaction
+            # handling off for this connection and emit BEGIN from the "begin" event instead.
+            dbapi_connection = connection.connection.dbapi_connection
+            isolation_level = dbapi_connection.isolation_level
+            dbapi_connection.isolation_level = None
+            try:
+                if migration.foreign_keys_off:
+                    # Only takes effect outside a transaction, so it is set before BEGIN
+                    foreign_keys = connection.exec_driver_sql("PRAGMA foreign_keys").scalar()
+                    connection.exec_driver_sql("PRAGMA foreign_keys = OFF")
+                    connection.commit()
+                event.listen(connection, "begin", _emit_begin)
+                try:
+                    with connection.begin():
+                        before = _time_probes(connection, migration)
+                        start = time.perf_counter()
+                        migration.apply(connection)
+                        apply_ms = (time.perf_counter() - start) * 1000
+                        connection.execute(
+                            text("INSERT INTO schema_version (version, description, applied_at) "
+                                 "VALUES (:v, :d, :at)"),
+                            {"v": migration.version, "d": migration.description,
+                             "at": datetime.now(timezone.utc).isoformat()},
+                        )
+                        after = _time_probes(connection, migration, after=True)
+                finally:
+                    event.remove(connection, "begin", _emit_begin)
+                    if migration.foreign_keys_off:
+                        connection.exec_driver_sql(f"PRAGMA foreign_keys = {foreign_keys}")
+                        connection.commit()
+            finally:
+                dbapi_connection.isolation_level = isolation_level
+
+        report = {
+            "version": migration.version,
+            "description": migration.description,
+            "apply_ms": apply_ms,
+            "probes": {label: {"before_ms": before[label], "after_ms": after[label]} for label in before},
+        }
+        reports.append(report)
+        if verbose:
+            print_report(report)
+    return reports
+
+
+def print_report(report):
+    """Prints the before/after timings for one applied migration."""
+    print(f"Applied migration {report['version']}: {report['description']} ({report['apply_ms']:.1f} ms)")
+    for label, timing in report["probes"].items():
+        print(f"  {label}: {timing['before_ms']:.2f} ms -> {timing['after_ms']:.2f} ms")
+
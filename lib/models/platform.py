@@ -1,10 +1,17 @@
 # lib/models/platform.py
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, func, exists
 from sqlalchemy.orm import relationship, validates
 from .base import Base, Session # Import Base and Session from base.py
+from .batch import commit, rollback
+from .validation import RULES, check_constraints
+from .cache import lookup_cache
+from .rows import lookup_rows
+from .query_cache import cached_instances
+from .merge import reassign_lookup_games, merge_lookup
 
 class Platform(Base):
 	__tablename__ = 'platforms'
+	__table_args__ = check_constraints('platforms')
 
 	id = Column(Integer, primary_key=True)
 	_name = Column("name", String, unique=True, nullable=False) # Backing field for property
@@ -23,11 +30,7 @@ class Platform(Base):
 	@name.setter
 	def name(self, value):
 		"""Setter for the platform name with validation."""
-		if not isinstance(value, str):
-			raise TypeError("Platform name must be a string.")
-		if not 2 <= len(value) <= 50:
-			raise ValueError("Platform name must be between 2 and 50 characters.")
-		self._name = value
+		self._name = RULES['platforms']['name'].check(value)
 
 	# ORM Methods as required
 	@classmethod
@@ -36,46 +39,80 @@ class Platform(Base):
 		try:
 			platform = cls(name=name) # Uses the __init__ which triggers the setter
 			session.add(platform)
-			session.commit()
+			commit(session)
 			return platform
 		except (TypeError, ValueError) as e:
-			session.rollback() # Rollback in case of validation error during creation
+			rollback(session) # Rollback in case of validation error during creation
 			print(f"Error creating platform: {e}")
 			return None
 		except Exception as e:
-			session.rollback()
+			rollback(session)
 			print(f"An unexpected error occurred during platform creation: {e}")
 			return None
 
 
 	@classmethod
 	def get_all(cls, session):
-		"""Returns a list of all platforms."""
-		return session.query(cls).all()
+		"""Returns a list of all platforms. Their ids are cached (lib.models.query_cache) until `platforms` changes."""
+		return cached_instances(
+			session, cls, ("Platform.get_all",), ("platforms",), lambda session: session.query(cls),
+		)
+
+	@classmethod
+	def get_all_with_counts(cls, session):
+		"""Returns (platform, game_count) pairs for all platforms, counted in one GROUP BY query."""
+		from .game import Game # Imported here to avoid a circular import
+		return (
+			session.query(cls, func.count(Game.id))
+			.outerjoin(Game, Game.platform_id == cls.id)
+			.group_by(cls.id)
+			.all()
+		)
+
+	@classmethod
+	def rows(cls, session, counts=False):
+		"""Read-only (id, name) rows ordered by name, or (id, name, games) with `counts`; no ORM objects."""
+		return lookup_rows(session, cls, 'platform', counts)
 
 	@classmethod
 	def find_by_id(cls, session, platform_id):
 		"""Finds a platform by its ID."""
-		return session.query(cls).get(platform_id)
+		return lookup_cache.get_by_id(session, cls, platform_id)
 
 	@classmethod
 	def find_by_name(cls, session, name):
 		"""Finds a platform by its name."""
-		return session.query(cls).filter(cls._name == name).first()
+		return lookup_cache.get_by_name(session, cls, name)
+
+	@classmethod
+	def find_similar(cls, session, name, threshold=0.5, limit=10):
+		"""Returns (id, name, score) for platforms with names similar to `name` (typos, case, punctuation)."""
+		from .similarity import similar # Imported here to avoid a circular import
+		return similar(session, "platform", name, threshold, limit)
+
+	def count_games(self, session):
+		"""Counts the games attached to this platform without loading them."""
+		from .game import Game
+		return session.query(func.count(Game.id)).filter(Game.platform_id == self.id).scalar()
+
+	def has_games(self, session):
+		"""True if any game references this platform, checked with EXISTS (stops at the first match)."""
+		from .game import Game
+		return session.query(exists().where(Game.platform_id == self.id)).scalar()
 
 	def update(self, session, name=None):
 		"""Updates the platform's attributes."""
 		if name is not None:
 			try:
 				self.name = name # Uses the setter for validation
-				session.commit()
+				commit(session)
 				return True
 			except (TypeError, ValueError) as e:
-				session.rollback()
+				rollback(session)
 				print(f"Error updating platform: {e}")
 				return False
 			except Exception as e:
-				session.rollback()
+				rollback(session)
 				print(f"An unexpected error occurred during platform update: {e}")
 				return False
 		return False # No update performed if name is None
@@ -83,17 +120,31 @@ class Platform(Base):
 	def delete(self, session):
 		"""Deletes the platform instance from the database."""
 		# Basic check: ensure no games are associated before deleting, or handle cascade
-		if self.games:
+		if self.has_games(session):
 			print(f"Cannot delete platform '{self.name}' as it has associated games. Please reassign or delete those games first.")
 			return False
 		try:
 			session.delete(self)
-			session.commit()
+			commit(session)
 			return True
 		except Exception as e:
-			session.rollback()
+			rollback(session)
 			print(f"Error deleting platform: {e}")
 			return False
 
+	def reassign_games(self, session, target):
+		"""
+		Moves every game from this platform to `target` with one UPDATE on games.
+		Returns the number of games moved, or None on error.
+		"""
+		return reassign_lookup_games(session, self, target, 'platform_id')
+
+	def merge_into(self, session, target):
+		"""
+		Merges this platform into `target`: moves its games there and deletes it, in one transaction.
+		Returns the number of games moved, or None on error (nothing is changed then).
+		"""
+		return merge_lookup(session, self, target, 'platform_id')
+
 	def __repr__(self):
 		return f"<Platform(id={self.id}, name='{self.name}')>"
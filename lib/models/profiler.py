@@ -0,0 +1,268 @@
+# lib/models/profiler.py
+"""
+Opt-in SQL statement profiler and N+1 detector.
+
+When enabled, cursor events on the engine record every statement: how often it ran,
+total and max time, and rows returned or affected. Statements are grouped by normalized
+SQL (literals and IN-lists collapsed) and by the model method that issued them.
+
+Helpers and CLI actions marked with `@profiled` open a scope. If a statement of the same
+shape runs `n_plus_one_threshold` times or more inside one scope, the scope is flagged as a
+likely N+1. The flag also says whether the repeats came from ORM lazy loads, which is the
+classic cause.
+
+    python -m lib.cli --profile-sql          # report printed on exit
+    python -m lib.cli --profile-sql games list --format jsonl > /dev/null
+    profiler.enable(); ...; profiler.print_report()   # from debug.py
+"""
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+from sqlalchemy import event
+
+LIB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Internal plumbing frames that should not be reported as the "caller"
+SKIPPED_FILES = {"profiler.py", "cache.py", "batch.py"}
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(\s*,\s*\?)+\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement):
+    """Collapses literals, IN-lists and whitespace so statements of the same shape group together."""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _IN_LIST.sub("IN (?, ...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class _CountingCursor(sqlite3.Cursor):
+    """DBAPI cursor that adds the rows fetched from it to the stats dicts of its statement."""
+
+    profile_stats = () # set by SQLProfiler._after_execute: (lock, stats dict, ...)
+
+    def _count(self, rows):
+        if self.profile_stats and rows:
+            lock, *stats = self.profile_stats
+            with lock:
+                for entry in stats:
+                    entry["rows"] += rows
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            self._count(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = super().fetchmany(*args, **kwargs)
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self._count(len(rows))
+        return rows
+
+    def __next__(self):
+        row = super().__next__()
+        self._count(1)
+        return row
+
+
+class _CountingConnection(sqlite3.Connection):
+    """sqlite3 connection whose cursors count fetched rows; passed as sqlite3.connect(factory=...)."""
+
+    def cursor(self, factory=_CountingCursor):
+        return super().cursor(factory)
+
+
+def _count_fetched_rows(dialect, connection_record, cargs, cparams):
+    cparams["factory"] = _CountingConnection
+
+
+def _new_stats():
+    return {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0}
+
+
+class SQLProfiler:
+    """Collects per-statement statistics from an engine's cursor events."""
+
+    def __init__(self, n_plus_one_threshold=10):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.enabled = False
+        self._engine = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.by_statement = defaultdict(_new_stats)
+            self.by_caller = defaultdict(_new_stats)
+            self.n_plus_one = [] # dicts: scope, sql, count, lazy_load
+
+    # --- wiring ------------------------------------------------------------------------
+
+    def enable(self, engine=None):
+        if self.enabled:
+            return
+        if engine is None:
+            from .base import engine
+        self._engine = engine
+        event.listen(engine, "do_connect", _count_fetched_rows)
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        # Pooled connections were opened without the counting cursors; open new ones
+        engine.dispose()
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        event.remove(self._engine, "do_connect", _count_fetched_rows)
+        event.remove(self._engine, "before_cursor_execute", self._before_execute)
+        event.remove(self._engine, "after_cursor_execute", self._after_execute)
+        self.enabled = False
+
+    # --- scopes ------------------------------------------------------------------------
+
+    def _scopes(self):
+        if not hasattr(self._local, "scopes"):
+            self._local.scopes = []
+        return self._local.scopes
+
+    @contextmanager
+    def scope(self, name):
+        """Groups the statements run inside the block for N+1 detection."""
+        state = {"name": name, "shapes": defaultdict(int), "lazy": defaultdict(int)}
+        scopes = self._scopes()
+        scopes.append(state)
+        try:
+            yield
+        finally:
+            scopes.pop()
+            self._check_n_plus_one(state)
+
+    def _check_n_plus_one(self, state):
+        for sql, count in state["shapes"].items():
+            if count >= self.n_plus_one_threshold:
+                with self._lock:
+                    self.n_plus_one.append({
+                        "scope": state["name"], "sql": sql, "count": count,
+                        "lazy_load": state["lazy"][sql] > 0,
+                    })
+
+    # --- events ------------------------------------------------------------------------
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._profiler_start = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = (time.perf_counter() - getattr(context, "_profiler_start", time.perf_counter())) * 1000
+        sql = normalize_sql(statement)
+        caller, lazy_load = self._find_caller()
+        with self._lock:
+            for stats in (self.by_statement[sql], self.by_caller[caller]):
+                stats["count"] += 1
+                stats["total_ms"] += elapsed
+                stats["max_ms"] = max(stats["max_ms"], elapsed)
+            statement_stats = self.by_statement[sql]
+            caller_stats = self.by_caller[caller]
+        if cursor.description is None:
+            affected = max(cursor.rowcount, 0)
+            with self._lock:
+                statement_stats["rows"] += affected
+                caller_stats["rows"] += affected
+        elif isinstance(cursor, _CountingCursor):
+            # Rows of a SELECT are only known once fetched; the cursor counts them as they are read
+            cursor.profile_stats = (self._lock, statement_stats, caller_stats)
+        scopes = self._scopes()
+        if scopes:
+            scopes[-1]["shapes"][sql] += 1
+            if lazy_load:
+                scopes[-1]["lazy"][sql] += 1
+
+    def _find_caller(self):
+        """Returns ('Model.method' or 'module.function', issued_by_lazy_load) for the current statement."""
+        frame = sys._getframe(2)
+        lazy_load = False
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if "sqlalchemy" in filename and frame.f_code.co_name in ("_load_for_state", "_emit_lazyload"):
+                lazy_load = True
+            if filename.startswith(LIB_DIR) and os.path.basename(filename) not in SKIPPED_FILES:
+                return self._label(frame), lazy_load
+            frame = frame.f_back
+        return "<outside lib>", lazy_load
+
+    @staticmethod
+    def _label(frame):
+        name = frame.f_code.co_name
+        owner = frame.f_locals.get("cls") or frame.f_locals.get("self")
+        if isinstance(owner, type):
+            return f"{owner.__name__}.{name}"
+        if owner is not None and type(owner).__module__.startswith("lib."):
+            return f"{type(owner).__name__}.{name}"
+        module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+        return f"{module}.{name}"
+
+    # --- reporting ---------------------------------------------------------------------
+
+    def report(self, top=20):
+        """Returns the collected statistics as a plain dict (slowest total time first)."""
+        def ranked(table):
+            rows = sorted(table.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+            return [dict(stats, key=key) for key, stats in rows[:top]]
+
+        with self._lock:
+            return {
+                "statements": ranked(self.by_statement),
+                "callers": ranked(self.by_caller),
+                "n_plus_one": list(self.n_plus_one),
+                "total_statements": sum(stats["count"] for stats in self.by_statement.values()),
+            }
+
+    def print_report(self, top=20, file=None):
+        file = file or sys.stdout
+        report = self.report(top)
+        print(f"\n--- SQL profile: {report['total_statements']} statements ---", file=file)
+        print(f"{'count':>7} {'total ms':>10} {'max ms':>9} {'rows':>9}  by caller", file=file)
+        for stats in report["callers"]:
+            print(f"{stats['count']:>7} {stats['total_ms']:>10.2f} {stats['max_ms']:>9.2f} {stats['rows']:>9}  "
+                  f"{stats['key']}", file=file)
+        print(f"\n{'count':>7} {'total ms':>10} {'max ms':>9} {'rows':>9}  by statement", file=file)
+        for stats in report["statements"]:
+            sql = stats["key"] if len(stats["key"]) <= 100 else stats["key"][:97] + "..."
+            print(f"{stats['count']:>7} {stats['total_ms']:>10.2f} {stats['max_ms']:>9.2f} {stats['rows']:>9}  "
+                  f"{sql}", file=file)
+        if report["n_plus_one"]:
+            print("\nLikely N+1 queries:", file=file)
+            for flag in report["n_plus_one"]:
+                cause = " (lazy loads)" if flag["lazy_load"] else ""
+                print(f"  {flag['scope']}: {flag['count']}x{cause} {flag['sql'][:100]}", file=file)
+        else:
+            print("\nNo likely N+1 queries detected.", file=file)
+
+
+profiler = SQLProfiler()
+
+
+def profiled(func):
+    """Marks a helper or CLI action as one N+1 detection scope while the profiler is enabled."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not profiler.enabled:
+            return func(*args, **kwargs)
+        with profiler.scope(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
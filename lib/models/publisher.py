@@ -1,10 +1,17 @@
 # lib/models/publisher.py
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, func, exists
 from sqlalchemy.orm import relationship
 from .base import Base, Session # Import Base and Session from base.py
+from .batch import commit, rollback
+from .validation import RULES, check_constraints
+from .cache import lookup_cache
+from .rows import lookup_rows
+from .query_cache import cached_instances
+from .merge import reassign_lookup_games, merge_lookup
 
 class Publisher(Base):
     __tablename__ = 'publishers'
+    __table_args__ = check_constraints('publishers')
 
     id = Column(Integer, primary_key=True)
     _name = Column("name", String, unique=True, nullable=False) # Backing field for property
@@ -23,11 +30,7 @@ class Publisher(Base):
     @name.setter
     def name(self, value):
         """Setter for the publisher name with validation."""
-        if not isinstance(value, str):
-            raise TypeError("Publisher name must be a string.")
-        if not 2 <= len(value) <= 100:
-            raise ValueError("Publisher name must be between 2 and 100 characters.")
-        self._name = value
+        self._name = RULES['publishers']['name'].check(value)
 
     # ORM Methods
     @classmethod
@@ -36,62 +39,110 @@ class Publisher(Base):
         try:
             publisher = cls(name=name)
             session.add(publisher)
-            session.commit()
+            commit(session)
             return publisher
         except (TypeError, ValueError) as e:
-            session.rollback()
+            rollback(session)
             print(f"Error creating publisher: {e}")
             return None
         except Exception as e:
-            session.rollback()
+            rollback(session)
             print(f"An unexpected error occurred during publisher creation: {e}")
             return None
 
     @classmethod
     def get_all(cls, session):
-        """Returns a list of all publishers."""
-        return session.query(cls).order_by(cls._name).all()
+        """Returns a list of all publishers. Their ids are cached (lib.models.query_cache) until `publishers` changes."""
+        return cached_instances(
+            session, cls, ("Publisher.get_all",), ("publishers",), lambda session: session.query(cls).order_by(cls._name),
+        )
+
+    @classmethod
+    def get_all_with_counts(cls, session):
+        """Returns (publisher, game_count) pairs for all publishers, counted in one GROUP BY query."""
+        from .game import Game # Imported here to avoid a circular import
+        return (
+            session.query(cls, func.count(Game.id))
+            .outerjoin(Game, Game.publisher_id == cls.id)
+            .group_by(cls.id).order_by(cls._name)
+            .all()
+        )
+
+    @classmethod
+    def rows(cls, session, counts=False):
+        """Read-only (id, name) rows ordered by name, or (id, name, games) with `counts`; no ORM objects."""
+        return lookup_rows(session, cls, 'publisher', counts)
 
     @classmethod
     def find_by_id(cls, session, publisher_id):
         """Finds a publisher by its ID."""
-        return session.query(cls).get(publisher_id)
+        return lookup_cache.get_by_id(session, cls, publisher_id)
 
     @classmethod
     def find_by_name(cls, session, name):
         """Finds a publisher by its name."""
-        return session.query(cls).filter(cls._name == name).first()
+        return lookup_cache.get_by_name(session, cls, name)
+
+    @classmethod
+    def find_similar(cls, session, name, threshold=0.5, limit=10):
+        """Returns (id, name, score) for publishers with names similar to `name` (typos, case, punctuation)."""
+        from .similarity import similar # Imported here to avoid a circular import
+        return similar(session, "publisher", name, threshold, limit)
+
+    def count_games(self, session):
+        """Counts the games attached to this publisher without loading them."""
+        from .game import Game
+        return session.query(func.count(Game.id)).filter(Game.publisher_id == self.id).scalar()
+
+    def has_games(self, session):
+        """True if any game references this publisher, checked with EXISTS (stops at the first match)."""
+        from .game import Game
+        return session.query(exists().where(Game.publisher_id == self.id)).scalar()
 
     def update(self, session, name=None):
         """Updates the publisher's attributes."""
         if name is not None:
             try:
                 self.name = name # Uses the setter for validation
-                session.commit()
+                commit(session)
                 return True
             except (TypeError, ValueError) as e:
-                session.rollback()
+                rollback(session)
                 print(f"Error updating publisher: {e}")
                 return False
             except Exception as e:
-                session.rollback()
+                rollback(session)
                 print(f"An unexpected error occurred: {e}")
                 return False
         return False
 
     def delete(self, session):
         """Deletes the publisher instance from the database."""
-        if self.games:
+        if self.has_games(session):
             print(f"Cannot delete publisher '{self.name}' as it has associated games. Please reassign or delete those games first.")
             return False
         try:
             session.delete(self)
-            session.commit()
+            commit(session)
             return True
         except Exception as e:
-            session.rollback()
+            rollback(session)
             print(f"Error deleting publisher: {e}")
             return False
 
+    def reassign_games(self, session, target):
+        """
+        Moves every game from this publisher to `target` with one UPDATE on games.
+        Returns the number of games moved, or None on error.
+        """
+        return reassign_lookup_games(session, self, target, 'publisher_id')
+
+    def merge_into(self, session, target):
+        """
+        Merges this publisher into `target`: moves its games there and deletes it, in one transaction.
+        Returns the number of games moved, or None on error (nothing is changed then).
+        """
+        return merge_lookup(session, self, target, 'publisher_id')
+
     def __repr__(self):
         return f"<Publisher(id={self.id}, name='{self.name}')>"
@@ -0,0 +1,158 @@
+# lib/models/query_cache.py
+"""
+Versioned, size-bounded cache for the results of repeated read queries.
+
+Entries are keyed by query and parameters, e.g. ("Game.find_by_title", "wolf"). They hold
+immutable results (tuples of ids or row namedtuples), so any session or thread can share
+them. Each entry is tagged with the change counters (lib.models.changes) of the tables the
+query reads, taken just before it ran. A lookup re-reads those counters (one small SELECT)
+and only serves the entry if none of them moved. Triggers bump the counters, so every write
+is seen:
+
+- model create/update/delete and any other ORM flush;
+- bulk updates and raw SQL;
+- other processes writing to the same gameshelf.db.
+
+A session with uncommitted writes bypasses the cache. It sees counter values that nobody
+else does, and a rollback would undo them.
+
+Entries are evicted least recently used first once the cached results hold more than
+`max_rows` rows; a larger result is not cached. `stats()` reports hits, misses, the hit
+ratio, and the time saved: the recorded query time of every hit, less any work the caller
+still did on a hit (`charge()`).
+
+ORM queries go through `cached_instances()`: only the ordered ids are cached, and a hit
+reloads the instances by primary key.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from . import changes
+
+DEFAULT_MAX_ROWS = 100000
+ID_CHUNK = 500 # ids per IN (...) when cached_instances() reloads a hit
+
+
+def has_uncommitted_writes(session):
+    """True if the session has pending changes or its connection holds an open write transaction."""
+    if session.new or session.dirty or session.deleted:
+        return True # autoflush would write them before the query
+    # pysqlite only opens a transaction before a write, so this is False for pure readers
+    return session.connection().connection.dbapi_connection.in_transaction
+
+
+class QueryCache:
+    """LRU of query key -> (counters, result, seconds the query took)."""
+
+    def __init__(self, max_rows=DEFAULT_MAX_ROWS):
+        self.max_rows = max_rows
+        self.enabled = True
+        self._entries = OrderedDict()
+        self._rows = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+    def get(self, session, key, tables, compute):
+        """
+        Returns compute(session) as a tuple, reusing the cached result for `key` as long as
+        none of `tables` has changed since it was computed.
+        """
+        if not self.enabled or has_uncommitted_writes(session):
+            return tuple(compute(session))
+        # Counters are read before the query: a write landing in between only costs a miss later
+        version = changes.versions(session, tables)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += entry[2]
+                return entry[1]
+            if entry is not None:
+                self.stale += 1
+                self._remove(key)
+            self.misses += 1
+        start = time.perf_counter()
+        result = tuple(compute(session))
+        seconds = time.perf_counter() - start
+        if len(result) <= self.max_rows:
+            with self._lock:
+                self._store(key, (version, result, seconds))
+        return result
+
+    def _store(self, key, entry):
+        self._remove(key)
+        self._entries[key] = entry
+        self._rows += max(1, len(entry[1]))
+        while self._rows > self.max_rows:
+            old_key = next(iter(self._entries))
+            self._remove(old_key)
+            self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._rows -= max(1, len(entry[1]))
+
+    def charge(self, seconds):
+        """Deducts work a hit still needed (e.g. loading the cached ids' objects) from the time saved."""
+        with self._lock:
+            self.saved_seconds -= seconds
+
+    def invalidate(self):
+        """Drops every entry, e.g. after the statistics tables were rebuilt (no counter tracks them)."""
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "saved_seconds": self.saved_seconds,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "rows": self._rows,
+                "max_rows": self.max_rows,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.stale = self.evictions = 0
+            self.saved_seconds = 0.0
+
+
+query_cache = QueryCache()
+
+
+def cached_instances(session, model, key, tables, query):
+    """
+    The instances `query(session)` returns, in its order. Only their ids are cached, so a
+    hit loads them by primary key, ID_CHUNK at a time, instead of running the query again.
+    """
+    loaded = []
+
+    def ids(session):
+        loaded.extend(query(session))
+        return [instance.id for instance in loaded]
+
+    cached_ids = query_cache.get(session, key, tables, ids)
+    if loaded or not cached_ids:
+        return loaded # the query just ran, so the instances are already loaded
+    start_time = time.perf_counter()
+    instances = []
+    for start in range(0, len(cached_ids), ID_CHUNK):
+        instances += session.query(model).filter(model.id.in_(cached_ids[start:start + ID_CHUNK]))
+    position = {instance_id: index for index, instance_id in enumerate(cached_ids)}
+    instances.sort(key=lambda instance: position[instance.id])
+    query_cache.charge(time.perf_counter() - start_time)
+    return instances
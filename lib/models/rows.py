@@ -0,0 +1,49 @@
+# lib/models/rows.py
+"""
+Read-only row projections for listings.
+
+Listing screens only print a few fields, but loading ORM instances costs an identity-map
+entry, instance state and property wrappers per row. The `rows()` classmethods
+(`Game.rows`, `Platform.rows`, ...) select just the needed columns instead and return
+namedtuples. They are plain tuples: cheap to build, unpacking and `._asdict()` work, and
+nothing is tracked by the session. Use the ORM methods when an object is needed for an
+update, delete or relationship.
+"""
+from collections import namedtuple
+
+from sqlalchemy import select, text
+
+from .query_cache import query_cache
+
+# One listed game; platform, genre, developer and publisher are names (None if missing)
+GameRow = namedtuple("GameRow", "id title release_year rating platform genre developer publisher")
+# One platform, genre, developer or publisher; `games` is filled in by rows(counts=True)
+LookupRow = namedtuple("LookupRow", "id name")
+LookupCountRow = namedtuple("LookupCountRow", "id name games")
+
+
+def lookup_rows(session, model, dimension, counts=False):
+    """
+    (id, name) rows of a lookup model ordered by name, or (id, name, games) with `counts`.
+    Counts come from the statistics summary table, so they cost no scan of `games`.
+    Results are cached (lib.models.query_cache) until the table, or for counts `games`, changes.
+    """
+    table = model.__tablename__
+    return list(query_cache.get(
+        session, (f"{model.__name__}.rows", counts), (table, "games") if counts else (table,),
+        lambda session: _select_lookup_rows(session, model, dimension, counts),
+    ))
+
+
+def _select_lookup_rows(session, model, dimension, counts):
+    if not counts:
+        return list(map(LookupRow._make, session.execute(select(model.id, model._name).order_by(model._name))))
+    table = model.__tablename__
+    result = session.execute(
+        text(
+            f"SELECT t.id, t.name, coalesce(s.games, 0) FROM {table} t "
+            "LEFT JOIN game_stats s ON s.dimension = :dimension AND s.entity_id = t.id ORDER BY t.name"
+        ),
+        {"dimension": dimension},
+    )
+    return list(map(LookupCountRow._make, result))
@@ -0,0 +1,91 @@
+# lib/models/search.py
+"""
+Full-text title search backed by the `games_fts` FTS5 table (see migration 4).
+
+The table is kept in sync with `games` by triggers, so anything that writes to `games`
+(model methods, bulk SQL, the seed script) is searchable straight away.
+"""
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import text
+from sqlalchemy.orm import joinedload
+
+from .game import Game
+from . import stats, changes
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(search_term):
+    """
+    Turns free text into an FTS5 MATCH expression.
+    Every word becomes a quoted prefix term ("witch"* "3"*), and FTS5 ANDs them together.
+    Returns None if the search term contains no searchable words.
+    """
+    tokens = TOKEN_PATTERN.findall(search_term or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_game_ids(session, search_term, limit=50):
+    """Returns the IDs of matching games, best BM25 match first."""
+    match_query = build_match_query(search_term)
+    if match_query is None:
+        return []
+    rows = session.execute(
+        text("SELECT rowid FROM games_fts WHERE games_fts MATCH :match ORDER BY rank LIMIT :limit"),
+        {"match": match_query, "limit": limit},
+    )
+    return [row[0] for row in rows]
+
+
+def search_games(session, search_term, limit=50):
+    """
+    Returns up to `limit` games whose titles match every word of `search_term` as a prefix,
+    ranked by BM25, with their platform, genre, developer and publisher already loaded.
+    """
+    game_ids = search_game_ids(session, search_term, limit)
+    if not game_ids:
+        return []
+    games = (
+        session.query(Game)
+        .options(
+            joinedload(Game.platform),
+            joinedload(Game.genre),
+            joinedload(Game.developer),
+            joinedload(Game.publisher),
+        )
+        .filter(Game.id.in_(game_ids))
+        .all()
+    )
+    position = {game_id: index for index, game_id in enumerate(game_ids)}
+    return sorted(games, key=lambda game: position[game.id])
+
+
+@contextmanager
+def deferred_indexing(session):
+    """
+    For bulk inserts into `games`: skips the per-row FTS, trigram, statistics and change-counter
+    triggers for the duration of the block, then indexes and counts all new rows with a few
+    INSERT ... SELECTs.
+    Must run inside the caller's transaction; a rollback also undoes the deferral.
+    """
+    session.execute(text("UPDATE games_fts_state SET deferred = 1"))
+    last_indexed_id = session.execute(text("SELECT coalesce(max(id), 0) FROM games")).scalar()
+    yield
+    session.execute(
+        text("INSERT INTO games_fts (rowid, title) SELECT id, title FROM games WHERE id > :id"),
+        {"id": last_indexed_id},
+    )
+    session.execute(
+        text("INSERT INTO games_trigram (rowid, title) SELECT id, title FROM games WHERE id > :id"),
+        {"id": last_indexed_id},
+    )
+    stats.add_new_rows(session, last_indexed_id)
+    new_rows = session.execute(
+        text("SELECT count(*) FROM games WHERE id > :id"), {"id": last_indexed_id}
+    ).scalar()
+    changes.add_inserts(session, new_rows)
+    session.execute(text("UPDATE games_fts_state SET deferred = 0"))
@@ -0,0 +1,207 @@
+# lib/models/similarity.py
+"""
+Typo-tolerant name matching with trigrams.
+
+Each searchable name column has an FTS5 table with the `trigram` tokenizer (migration 8),
+kept in sync by triggers like `games_fts`:
+
+    games_trigram (games.title)      platforms_trigram, genres_trigram,
+                                     developers_trigram, publishers_trigram (name)
+
+Names are lowercased and split into words, and each word is padded with two leading spaces
+and one trailing space, as in PostgreSQL's pg_trgm. Two names' similarity is
+|shared trigrams| / |all trigrams|: 0 means nothing in common, and 1 means the same words
+after folding case and punctuation.
+
+`similar()` uses the index to pull candidates that share trigrams with the query. It ranks
+them by how much of the query they contain, like pg_trgm's word_similarity, so "Witchr 3"
+still finds "The Witcher 3: Wild Hunt". Abbreviations such as "BOTW" share no trigrams with
+the full title and are not found.
+
+`duplicate_candidates()` reports near-identical pairs for a whole table. It does not
+compare every pair. It uses prefix filtering: trigrams are ordered rarest first, and two
+names can only reach the threshold if they share one of the first few trigrams of the
+smaller name. Only those prefixes are indexed, so each name is checked against a handful
+of candidates.
+"""
+import math
+import re
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from sqlalchemy import text
+
+# kind -> (table, name column, column duplicates must share)
+SOURCES = {
+    "game": ("games", "title", "platform_id"),
+    "platform": ("platforms", "name", None),
+    "genre": ("genres", "name", None),
+    "developer": ("developers", "name", None),
+    "publisher": ("publishers", "name", None),
+}
+DEFAULT_THRESHOLD = 0.5
+DUPLICATE_THRESHOLD = 0.8
+CANDIDATE_POOL = 200 # FTS candidates re-ranked per query
+
+WORD_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def trigrams(name):
+    """The set of padded word trigrams of `name` (case and punctuation are ignored)."""
+    grams = set()
+    for word in WORD_PATTERN.findall((name or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(first, second):
+    """Trigram similarity of two names, from 0.0 to 1.0."""
+    first_grams, second_grams = trigrams(first), trigrams(second)
+    if not first_grams or not second_grams:
+        return 0.0
+    shared = len(first_grams & second_grams)
+    return shared / (len(first_grams) + len(second_grams) - shared)
+
+
+# --- index ---------------------------------------------------------------------------------
+
+def index_statements():
+    """DDL for the trigram tables, their sync triggers, and their initial contents."""
+    statements = []
+    for table, column, _ in SOURCES.values():
+        index = f"{table}_trigram"
+        # The games insert trigger honours the bulk-load flag, like games_fts_ai
+        when = (" WHEN coalesce((SELECT deferred FROM games_fts_state), 0) = 0" if table == "games" else "")
+        statements += [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+            f"{column}, content='{table}', content_rowid='id', tokenize='trigram')",
+            f"DROP TRIGGER IF EXISTS {index}_ai",
+            f"DROP TRIGGER IF EXISTS {index}_ad",
+            f"DROP TRIGGER IF EXISTS {index}_au",
+            f"CREATE TRIGGER {index}_ai AFTER INSERT ON {table}{when} BEGIN "
+            f"INSERT INTO {index} (rowid, {column}) VALUES (new.id, new.{column}); END",
+            f"CREATE TRIGGER {index}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {index} ({index}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END",
+            f"CREATE TRIGGER {index}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+            f"INSERT INTO {index} ({index}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+            f"INSERT INTO {index} (rowid, {column}) VALUES (new.id, new.{column}); END",
+            f"INSERT INTO {index} ({index}) VALUES ('rebuild')",
+        ]
+    return statements
+
+
+def _source(kind):
+    if kind not in SOURCES:
+        raise ValueError(f"Kind must be one of: {', '.join(SOURCES)}.")
+    return SOURCES[kind]
+
+
+def build_trigram_query(query):
+    """
+    FTS5 MATCH expression ORing every raw trigram of `query` ("wit" OR "itc" OR ...).
+    Returns None if the query is shorter than three characters.
+    """
+    folded = " ".join(WORD_PATTERN.findall((query or "").lower()))
+    grams = {folded[i:i + 3] for i in range(len(folded) - 2)}
+    if not grams:
+        return None
+    return " OR ".join('"' + gram.replace('"', '""') + '"' for gram in sorted(grams))
+
+
+def similar(session, kind, query, threshold=DEFAULT_THRESHOLD, limit=10):
+    """
+    Returns up to `limit` (id, name, score) for the `kind` rows most similar to `query`, best
+    first. The score is the share of the query's trigrams found in the name, so a short or
+    misspelt query still matches a longer title. Ties go to the closer overall match.
+    Only scores >= threshold are kept.
+    """
+    table, column, _ = _source(kind)
+    match = build_trigram_query(query)
+    query_grams = trigrams(query)
+    if match is None or not query_grams:
+        return []
+    rows = session.execute(
+        text(
+            f"SELECT t.id, t.{column} FROM {table}_trigram f JOIN {table} t ON t.id = f.rowid "
+            f"WHERE {table}_trigram MATCH :match ORDER BY f.rank LIMIT :pool"
+        ),
+        {"match": match, "pool": CANDIDATE_POOL},
+    )
+    scored = []
+    for item_id, name in rows:
+        name_grams = trigrams(name)
+        shared = len(query_grams & name_grams)
+        score = shared / len(query_grams)
+        if score >= threshold:
+            overall = shared / (len(query_grams) + len(name_grams) - shared)
+            scored.append((item_id, name, score, overall))
+    scored.sort(key=lambda row: (-row[2], -row[3], row[1]))
+    return [(item_id, name, score) for item_id, name, score, _ in scored[:limit]]
+
+
+# --- duplicate report ----------------------------------------------------------------------
+
+def _similar_pairs(rows, threshold):
+    """All-pairs similarity join over (id, name) rows with prefix filtering."""
+    names = dict(rows)
+    groups = defaultdict(list) # trigram set -> ids, lowest first
+    for item_id, name in rows:
+        item_grams = frozenset(trigrams(name))
+        if item_grams:
+            groups[item_grams].append(item_id)
+
+    pairs = []
+    for ids in groups.values():
+        pairs.extend((1.0, (ids[0], names[ids[0]]), (other, names[other])) for other in ids[1:])
+
+    # Rarest trigrams first: prefixes of rare trigrams produce the fewest candidates
+    frequency = Counter(gram for item_grams in groups for gram in item_grams)
+    ordered = sorted(groups, key=len)
+    sizes = [len(item_grams) for item_grams in ordered]
+    first_ids = [groups[item_grams][0] for item_grams in ordered]
+    prefix_index = defaultdict(list) # trigram -> positions in `ordered` whose prefix contains it
+    for position, item_grams in enumerate(ordered):
+        size = sizes[position]
+        item_id = first_ids[position]
+        sorted_grams = sorted(item_grams, key=lambda gram: (frequency[gram], gram))
+        candidates = set()
+        for gram in sorted_grams[:size - math.ceil(threshold * size) + 1]:
+            candidates.update(prefix_index[gram])
+        # Names smaller than threshold * size can never reach the threshold
+        smallest = bisect_left(sizes, threshold * size)
+        for other in candidates:
+            if other < smallest:
+                continue
+            shared = len(item_grams & ordered[other])
+            if shared >= threshold * (size + sizes[other] - shared):
+                other_id = first_ids[other]
+                first, second = (other_id, item_id) if other_id < item_id else (item_id, other_id)
+                score = shared / (size + sizes[other] - shared)
+                pairs.append((score, (first, names[first]), (second, names[second])))
+        # Names are visited smallest first, so a shorter prefix suffices on the indexed side
+        for gram in sorted_grams[:size - math.ceil(2 * threshold / (1 + threshold) * size) + 1]:
+            prefix_index[gram].append(position)
+    return pairs
+
+
+def duplicate_candidates(session, kind, threshold=DUPLICATE_THRESHOLD, limit=None):
+    """
+    Pairs of `kind` rows whose names have similarity >= threshold, most similar first:
+    [(score, (id, name), (id, name)), ...]. Reads the table once; never compares all pairs.
+    Names that are identical after folding case and punctuation form a group. Each member
+    is paired with the group's lowest id, and groups are compared through that row.
+    Games are only compared with games on the same platform, since one title on several
+    platforms is not a duplicate.
+    """
+    table, column, partition = _source(kind)
+    partition_sql = partition or "0"
+    rows = session.execute(text(f"SELECT {partition_sql}, id, {column} FROM {table} ORDER BY 1, id")).fetchall()
+    partitions = defaultdict(list)
+    for key, item_id, name in rows:
+        partitions[key].append((item_id, name))
+    pairs = []
+    for partition_rows in partitions.values():
+        pairs.extend(_similar_pairs(partition_rows, threshold))
+    pairs.sort(key=lambda pair: (-pair[0], pair[1][0], pair[2][0]))
+    return pairs[:limit] if limit else pairs
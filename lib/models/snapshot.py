@@ -0,0 +1,256 @@
+# lib/models/snapshot.py
+"""
+Read-only, in-memory columnar snapshot of `games` for dashboards and repeated analytics.
+
+Loading the table as ORM objects costs several Python objects and hundreds of bytes per
+game. A snapshot instead keeps one compact column per field:
+
+    ids                                          array('q')
+    titles                                       list of interned str (repeated titles share one object)
+    platform_ids, genre_ids, developer_ids,      array('I'), 0 = none
+    publisher_ids
+    year_codes                                   bytearray, release_year - 1949 (0 = none)
+    ratings                                      bytearray, 0 = none
+
+The CHECK constraints (1950-2077, 1-5) are what let years and ratings fit in one byte.
+Filtering, grouping and sorting run over whole columns in C instead of per-row Python:
+
+- Range filters turn a byte column into a 0/1 mask with `bytearray.translate`.
+- Masks are combined with a big-int AND.
+- Equality filters use per-value position lists built with one key-sorted pass.
+- Positions are picked with `itertools.compress`.
+- Groups are counted with `Counter(zip(...))`.
+- Sorts are stable passes keyed by `column.__getitem__`.
+
+No numpy is needed. If numpy is installed, `numpy.frombuffer(snapshot.platform_ids, 'u4')`
+wraps a column without copying.
+
+Rows are kept in id order, and operations work on "positions" (row indexes into the
+columns). `refresh()` uses the change counters (lib.models.changes):
+
+- nothing changed: it does nothing;
+- only inserts: it appends the new rows;
+- any update or delete, or a replaced database file: it reloads.
+
+A snapshot is not safe to share between threads while it refreshes.
+"""
+import string
+import sys
+from array import array
+from collections import Counter
+from functools import partial
+from itertools import compress
+from operator import eq
+
+from . import changes
+from .game import FILTER_SORTS
+
+YEAR_BASE = 1949 # year_codes hold release_year - YEAR_BASE; the rules keep years in 1950-2077
+LOAD_CHUNK = 50000
+LOAD_SQL = (
+    f"SELECT id, title, coalesce(release_year - {YEAR_BASE}, 0), coalesce(rating, 0), platform_id, genre_id, "
+    "coalesce(developer_id, 0), coalesce(publisher_id, 0) FROM games WHERE id > ? ORDER BY id"
+)
+# Columns that group_by() and the equality filters accept
+ID_COLUMNS = ("platform_id", "genre_id", "developer_id", "publisher_id")
+# Byte columns map 0 (none) to 255 so that ascending sorts put missing values last
+NULLS_LAST = bytes([255]) + bytes(range(1, 256))
+# SQLite's NOCASE folds only ASCII letters; titles sort with it (Game._title_key)
+ASCII_NOCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _byte_mask(codes, keep):
+    """0/1 mask over a byte column, 1 where keep(code) holds; one C pass via translate."""
+    return codes.translate(bytes(1 if keep(code) else 0 for code in range(256)))
+
+
+class GameSnapshot:
+    """Column arrays for every game, plus vectorized filter, group_by and sort."""
+
+    def __init__(self):
+        self.ids = array("q")
+        self.titles = []
+        self.platform_ids = array("I")
+        self.genre_ids = array("I")
+        self.developer_ids = array("I")
+        self.publisher_ids = array("I")
+        self.year_codes = bytearray()
+        self.ratings = bytearray()
+        self.version = None # (generation, inserts, changes) seen at the last load
+        self._positions = {} # column -> {value: array of positions}, built on first use
+
+    def __len__(self):
+        return len(self.ids)
+
+    # --- loading -----------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, session):
+        """Reads all of `games` into a new snapshot."""
+        snapshot = cls()
+        snapshot.refresh(session)
+        return snapshot
+
+    def refresh(self, session):
+        """
+        Brings the snapshot up to date. Returns "current" (nothing to do), "appended" (only
+        new rows were read) or "reloaded" (rows were updated or deleted, so everything was read).
+        """
+        # Read the counters first: a write landing mid-load is then seen by the next refresh
+        version = changes.version(session)
+        if version == self.version:
+            return "current"
+        # Only inserts since the last load, into the same database file
+        appended = (self.version is not None and version[0] == self.version[0]
+                    and version[2] == self.version[2])
+        if not appended:
+            self.__init__()
+        self._append_rows(session, self.ids[-1] if self.ids else 0)
+        self.version = version
+        self._positions = {}
+        return "appended" if appended else "reloaded"
+
+    def _append_rows(self, session, after_id):
+        result = session.connection().exec_driver_sql(LOAD_SQL, (after_id,))
+        intern = sys.intern
+        while True:
+            rows = result.fetchmany(LOAD_CHUNK)
+            if not rows:
+                break
+            ids, titles, year_codes, ratings, platform_ids, genre_ids, developer_ids, publisher_ids = zip(*rows)
+            self.ids.extend(ids)
+            self.titles.extend(map(intern, titles))
+            self.year_codes.extend(year_codes)
+            self.ratings.extend(ratings)
+            self.platform_ids.extend(platform_ids)
+            self.genre_ids.extend(genre_ids)
+            self.developer_ids.extend(developer_ids)
+            self.publisher_ids.extend(publisher_ids)
+
+    def nbytes(self):
+        """Approximate memory held by the columns (title strings counted once each)."""
+        arrays = (self.ids, self.platform_ids, self.genre_ids, self.developer_ids, self.publisher_ids)
+        unique_titles = {id(title): title for title in self.titles}.values()
+        return (
+            sum(column.itemsize * len(column) for column in arrays)
+            + len(self.year_codes) + len(self.ratings)
+            + sys.getsizeof(self.titles) + sum(sys.getsizeof(title) for title in unique_titles)
+        )
+
+    # --- reading -----------------------------------------------------------------------
+
+    def _column(self, name):
+        if name not in ID_COLUMNS:
+            raise ValueError(f"Column must be one of: {', '.join(ID_COLUMNS)}.")
+        return getattr(self, f"{name}s")
+
+    def positions_of(self, column, value):
+        """Positions of the rows whose `column` equals `value`, in id order."""
+        if column not in self._positions:
+            values = self._column(column)
+            # One stable sort by value keeps positions in id order inside each group
+            order = array("I", sorted(range(len(values)), key=values.__getitem__))
+            groups, start = {}, 0
+            for key, count in sorted(Counter(values).items()):
+                groups[key] = order[start:start + count]
+                start += count
+            self._positions[column] = groups
+        return self._positions[column].get(value or 0, array("I"))
+
+    def filter(self, platform_id=None, genre_id=None, year_from=None, year_to=None, min_rating=None):
+        """Positions of the games matching every given filter (same meaning as Game.filter), in id order."""
+        masks = []
+        if year_from is not None or year_to is not None:
+            low = (year_from or 0) - YEAR_BASE
+            high = (year_to if year_to is not None else 10 ** 6) - YEAR_BASE
+            masks.append(_byte_mask(self.year_codes, lambda code: code and low <= code <= high))
+        if min_rating is not None:
+            masks.append(_byte_mask(self.ratings, lambda code: code and code >= min_rating))
+        mask = None
+        if masks:
+            combined = int.from_bytes(masks[0], "little")
+            for other in masks[1:]:
+                combined &= int.from_bytes(other, "little")
+            mask = combined.to_bytes(len(self), "little")
+
+        equals = [(column, value) for column, value in (("platform_id", platform_id), ("genre_id", genre_id))
+                  if value is not None]
+        if not equals:
+            candidates = range(len(self))
+            return array("I", compress(candidates, mask) if mask is not None else candidates)
+        # Start from the smaller position list and check the other conditions only on those rows
+        equals.sort(key=lambda item: len(self.positions_of(*item)))
+        candidates = self.positions_of(*equals[0])
+        for column, value in equals[1:]:
+            values = self._column(column)
+            candidates = list(compress(candidates, map(partial(eq, value), map(values.__getitem__, candidates))))
+        if mask is not None:
+            candidates = compress(candidates, map(mask.__getitem__, candidates))
+        return array("I", candidates)
+
+    def group_by(self, column, positions=None):
+        """
+        Per-value statistics for `column` (an id column or "release_year") over `positions`
+        (default: every game): {value: {"games", "rated_games", "average_rating"}}, with
+        None as the value for games that have none.
+        """
+        if column == "release_year":
+            keys = self.year_codes
+            decode = lambda code: code + YEAR_BASE if code else None
+        else:
+            keys = self._column(column)
+            decode = lambda value: value or None
+        ratings = self.ratings
+        if positions is not None:
+            keys, ratings = map(keys.__getitem__, positions), map(ratings.__getitem__, positions)
+        groups = {}
+        for (key, rating), count in Counter(zip(keys, ratings)).items():
+            group = groups.setdefault(decode(key), {"games": 0, "rated_games": 0, "rating_sum": 0})
+            group["games"] += count
+            if rating:
+                group["rated_games"] += count
+                group["rating_sum"] += rating * count
+        for group in groups.values():
+            rating_sum = group.pop("rating_sum")
+            group["average_rating"] = rating_sum / group["rated_games"] if group["rated_games"] else None
+        return groups
+
+    def sort(self, positions=None, sort="title", descending=False, limit=None):
+        """
+        Orders `positions` (default: every game) like Game.filter: by title, year or rating,
+        missing years and ratings last, ties by title (case-insensitively) and then id.
+        """
+        if sort not in FILTER_SORTS:
+            raise ValueError(f"Sort must be one of: {', '.join(FILTER_SORTS)}.")
+        positions = range(len(self)) if positions is None else positions
+        # Stable C-keyed passes, least significant key first; positions start in id order
+        titles = self.titles
+        ordered = sorted(positions, key=lambda position: titles[position].translate(ASCII_NOCASE))
+        if sort == "title":
+            if descending:
+                ordered.reverse()
+        else:
+            codes = self.year_codes if sort == "year" else self.ratings
+            if descending:
+                ordered.sort(key=codes.__getitem__, reverse=True) # 0 (missing) sorts last
+            else:
+                ordered.sort(key=codes.translate(NULLS_LAST).__getitem__)
+        return array("I", ordered[:limit] if limit is not None else ordered)
+
+    def row(self, position):
+        """One game as a plain dict of its column values."""
+        year_code, rating = self.year_codes[position], self.ratings[position]
+        return {
+            "id": self.ids[position],
+            "title": self.titles[position],
+            "release_year": year_code + YEAR_BASE if year_code else None,
+            "rating": rating or None,
+            "platform_id": self.platform_ids[position],
+            "genre_id": self.genre_ids[position],
+            "developer_id": self.developer_ids[position] or None,
+            "publisher_id": self.publisher_ids[position] or None,
+        }
+
+    def rows(self, positions):
+        """Dicts for `positions`, in the given order."""
+        return [self.row(position) for position in positions]
@@ -0,0 +1,214 @@
+# lib/models/stats.py
+"""
+Collection statistics kept current incrementally.
+
+Two summary tables hold, per dimension (platform, genre, developer, publisher, or 'all' for
+the whole collection) and per entity:
+
+    game_stats       games, rated_games, rating_sum   -> count and average rating
+    game_year_stats  games per release year           -> release-year histogram
+
+Triggers on `games` (created by migration 7) add a row's contribution on insert, subtract
+it on delete, and do both on an update of any counted column. Every write path, including
+raw SQL from the importer and bulk UPDATE/DELETE, is therefore covered. Bulk loads inside
+`deferred_indexing` skip the insert trigger and add their new rows with one grouped
+statement per dimension instead (see `add_new_rows`).
+
+Reading a summary costs O(groups), not a scan of `games`. `rebuild()` recomputes both
+tables from scratch, and `verify()` compares them with a fresh aggregate.
+
+Games with no developer, publisher or release year are counted under id/year 0.
+"""
+from sqlalchemy import text
+
+from .query_cache import query_cache
+
+# dimension -> column of `games` it groups by ('all' groups everything under 0)
+DIMENSIONS = {
+    "platform": "platform_id",
+    "genre": "genre_id",
+    "developer": "developer_id",
+    "publisher": "publisher_id",
+    "all": None,
+}
+COUNTED_COLUMNS = ("platform_id", "genre_id", "developer_id", "publisher_id", "release_year", "rating")
+
+TABLE_STATEMENTS = [
+    "CREATE TABLE IF NOT EXISTS game_stats ("
+    "dimension VARCHAR NOT NULL, entity_id INTEGER NOT NULL, games INTEGER NOT NULL, "
+    "rated_games INTEGER NOT NULL, rating_sum INTEGER NOT NULL, "
+    "PRIMARY KEY (dimension, entity_id)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS game_year_stats ("
+    "dimension VARCHAR NOT NULL, entity_id INTEGER NOT NULL, release_year INTEGER NOT NULL, "
+    "games INTEGER NOT NULL, PRIMARY KEY (dimension, entity_id, release_year)) WITHOUT ROWID",
+]
+
+STATS_UPSERT = (
+    " ON CONFLICT (dimension, entity_id) DO UPDATE SET games = games + excluded.games, "
+    "rated_games = rated_games + excluded.rated_games, rating_sum = rating_sum + excluded.rating_sum"
+)
+YEAR_UPSERT = " ON CONFLICT (dimension, entity_id, release_year) DO UPDATE SET games = games + excluded.games"
+
+
+def _entity(column, prefix=""):
+    return "0" if column is None else f"coalesce({prefix}{column}, 0)"
+
+
+def _row_statements(row, sign):
+    """Trigger body statements adding (sign '+') or removing (sign '-') the `new`/`old` row."""
+    statements = []
+    for dimension, column in DIMENSIONS.items():
+        entity = _entity(column, f"{row}.")
+        statements.append(
+            f"INSERT INTO game_stats VALUES ('{dimension}', {entity}, {sign}1, "
+            f"{sign}({row}.rating IS NOT NULL), {sign}coalesce({row}.rating, 0)){STATS_UPSERT};"
+        )
+        statements.append(
+            f"INSERT INTO game_year_stats VALUES ('{dimension}', {entity}, "
+            f"coalesce({row}.release_year, 0), {sign}1){YEAR_UPSERT};"
+        )
+    return " ".join(statements)
+
+
+def trigger_statements():
+    """DROP/CREATE statements for the three maintenance triggers (reused when `games` is rebuilt)."""
+    return [
+        "DROP TRIGGER IF EXISTS games_stats_ai",
+        "DROP TRIGGER IF EXISTS games_stats_ad",
+        "DROP TRIGGER IF EXISTS games_stats_au",
+        # Bulk loads set games_fts_state.deferred and call add_new_rows() instead
+        "CREATE TRIGGER games_stats_ai AFTER INSERT ON games "
+        "WHEN coalesce((SELECT deferred FROM games_fts_state), 0) = 0 "
+        f"BEGIN {_row_statements('new', '+')} END",
+        f"CREATE TRIGGER games_stats_ad AFTER DELETE ON games BEGIN {_row_statements('old', '-')} END",
+        f"CREATE TRIGGER games_stats_au AFTER UPDATE OF {', '.join(COUNTED_COLUMNS)} ON games "
+        f"BEGIN {_row_statements('old', '-')} {_row_statements('new', '+')} END",
+    ]
+
+
+def _aggregate_selects(after=":after"):
+    """(dimension, stats SELECT, year SELECT) over `games` rows with id > `after` (SQL)."""
+    for dimension, column in DIMENSIONS.items():
+        entity = _entity(column)
+        yield (
+            dimension,
+            f"SELECT '{dimension}', {entity}, count(*), count(rating), coalesce(sum(rating), 0) "
+            f"FROM games WHERE id > {after} GROUP BY 2",
+            f"SELECT '{dimension}', {entity}, coalesce(release_year, 0), count(*) "
+            f"FROM games WHERE id > {after} GROUP BY 2, 3",
+        )
+
+
+def aggregate_statements(after=":after"):
+    """INSERT ... SELECT statements adding every `games` row with id > `after` to the tables."""
+    statements = []
+    for _, stats_select, year_select in _aggregate_selects(after):
+        statements.append(f"INSERT INTO game_stats {stats_select}{STATS_UPSERT}")
+        statements.append(f"INSERT INTO game_year_stats {year_select}{YEAR_UPSERT}")
+    return statements
+
+
+def _execute(bind, sql, params=None):
+    """Runs `sql` on a Session or Connection."""
+    return bind.execute(text(sql), params or {})
+
+
+def add_new_rows(bind, after_id):
+    """Adds the contribution of every game with id > `after_id` (used after a deferred bulk load)."""
+    for statement in aggregate_statements():
+        _execute(bind, statement, {"after": after_id})
+
+
+def rebuild_statements():
+    """Statements that empty both summary tables and recompute them from `games`."""
+    return ["DELETE FROM game_stats", "DELETE FROM game_year_stats"] + aggregate_statements(after="0")
+
+
+def rebuild(bind):
+    """Recomputes both summary tables from `games`. Runs in the caller's transaction."""
+    for statement in rebuild_statements():
+        _execute(bind, statement)
+    query_cache.invalidate() # cached lookup counts may predate the repair; `games` itself did not change
+
+
+def verify(bind, limit=20):
+    """
+    Compares the summary tables with a fresh aggregate over `games`.
+    Returns a list of (table, row, problem) differences; empty means consistent.
+    """
+    fresh_stats = " UNION ALL ".join(stats_select for _, stats_select, _ in _aggregate_selects("0"))
+    fresh_years = " UNION ALL ".join(year_select for _, _, year_select in _aggregate_selects("0"))
+    checks = [
+        ("game_stats", "SELECT dimension, entity_id, games, rated_games, rating_sum FROM game_stats "
+                       "WHERE games != 0", fresh_stats),
+        ("game_year_stats", "SELECT dimension, entity_id, release_year, games FROM game_year_stats "
+                            "WHERE games != 0", fresh_years),
+    ]
+    differences = []
+    for table, stored, fresh in checks:
+        for label, left, right in (("stale or extra", stored, fresh), ("missing or stale", fresh, stored)):
+            rows = _execute(bind, f"SELECT * FROM ({left}) EXCEPT SELECT * FROM ({right}) LIMIT :limit",
+                            {"limit": limit}).fetchall()
+            differences.extend((table, tuple(row), label) for row in rows)
+    return differences
+
+
+# --- reading -------------------------------------------------------------------------------
+
+def _names(session, dimension):
+    """id -> name for a lookup dimension, from the lookup cache."""
+    from . import Platform, Genre, Developer, Publisher # Imported here to avoid a circular import
+    from .cache import lookup_cache
+    model = {"platform": Platform, "genre": Genre, "developer": Developer, "publisher": Publisher}[dimension]
+    return dict(lookup_cache.all_rows(session, model))
+
+
+def summary(session, dimension, limit=None):
+    """
+    Per-entity statistics for one dimension, most games first:
+    [{"id", "name", "games", "rated_games", "average_rating"}, ...].
+    """
+    if dimension not in DIMENSIONS or dimension == "all":
+        raise ValueError(f"Dimension must be one of: {', '.join(d for d in DIMENSIONS if d != 'all')}.")
+    rows = _execute(
+        session,
+        "SELECT entity_id, games, rated_games, rating_sum FROM game_stats "
+        "WHERE dimension = :dimension AND games > 0 ORDER BY games DESC, entity_id"
+        + (" LIMIT :limit" if limit else ""),
+        {"dimension": dimension, "limit": limit},
+    ).fetchall()
+    names = _names(session, dimension)
+    return [
+        {
+            "id": entity_id or None,
+            "name": names.get(entity_id, "(none)"),
+            "games": games,
+            "rated_games": rated_games,
+            "average_rating": rating_sum / rated_games if rated_games else None,
+        }
+        for entity_id, games, rated_games, rating_sum in rows
+    ]
+
+
+def overview(session):
+    """Totals for the whole collection: games, rated games and average rating."""
+    row = _execute(
+        session, "SELECT games, rated_games, rating_sum FROM game_stats WHERE dimension = 'all'"
+    ).first()
+    games, rated_games, rating_sum = row if row else (0, 0, 0)
+    return {
+        "games": games,
+        "rated_games": rated_games,
+        "average_rating": rating_sum / rated_games if rated_games else None,
+    }
+
+
+def year_histogram(session, dimension="all", entity_id=0):
+    """[(release_year, games), ...] in year order for one entity, or the whole collection by default."""
+    rows = _execute(
+        session,
+        "SELECT release_year, games FROM game_year_stats "
+        "WHERE dimension = :dimension AND entity_id = :entity AND games > 0 ORDER BY release_year",
+        {"dimension": dimension, "entity": entity_id or 0},
+    ).fetchall()
+    return [(year or None, games) for year, games in rows]
@@ -0,0 +1,142 @@
+# lib/models/validation.py
+"""
+Field rules shared by the model setters, the schema's CHECK constraints and batch validation.
+
+Each rule is declared once here, in RULES:
+
+    games       title 1-150 characters, release_year 1950-2077, rating 1-5
+    platforms   name 2-50 characters      genres      name 2-30 characters
+    developers  name 2-100 characters     publishers  name 2-100 characters
+
+- The property setters call `FieldRule.check` for one value.
+- `check_constraints()` turns the same rules into CHECK constraints. They enter the model
+  tables through `__table_args__` and existing databases through migration 9, so raw SQL
+  writes cannot store a value the setters would refuse.
+- `validate_columns()` and `validate_rows()` check a whole batch one column at a time and
+  return the errors per row, which the importer and `Game.bulk_update` use.
+"""
+from functools import partial
+from operator import is_not
+
+from sqlalchemy import CheckConstraint
+
+NoneType = type(None)
+
+
+class FieldRule:
+    """Type and range (or length, for strings) of one column; None is allowed if nullable."""
+
+    def __init__(self, label, kind, low, high, nullable=True):
+        self.label = label
+        self.kind = kind
+        self.low = low
+        self.high = high
+        self.nullable = nullable
+
+    def optional(self):
+        """The same rule, but allowing None (e.g. a developer name on an imported game)."""
+        return FieldRule(self.label, self.kind, self.low, self.high, nullable=True)
+
+    def problem(self, value):
+        """The error message for `value` as (exception class, message), or None if it is valid."""
+        if value is None:
+            return None if self.nullable else (ValueError, f"{self.label} is required.")
+        if not isinstance(value, self.kind):
+            article = "a string" if self.kind is str else "an integer"
+            return TypeError, f"{self.label} must be {article}."
+        size = len(value) if self.kind is str else value
+        if not self.low <= size <= self.high:
+            unit = " characters" if self.kind is str else ""
+            return ValueError, f"{self.label} must be between {self.low} and {self.high}{unit}."
+        return None
+
+    def check(self, value):
+        """Returns `value` if it is valid, else raises TypeError/ValueError."""
+        problem = self.problem(value)
+        if problem:
+            error_class, message = problem
+            raise error_class(message)
+        return value
+
+    def errors(self, values):
+        """[(index, message), ...] for the invalid entries of a column of values."""
+        kind, low, high, nullable = self.kind, self.low, self.high, self.nullable
+        # Fast path for a clean column: type set and min/max run in C, with no per-row Python code
+        types = set(map(type, values))
+        if types <= {kind, NoneType} and (nullable or NoneType not in types):
+            present = list(filter(partial(is_not, None), values)) if NoneType in types else values
+            sizes = list(map(len, present)) if kind is str else present
+            if not sizes or (low <= min(sizes) and max(sizes) <= high):
+                return []
+        # Otherwise one pass with the common case inlined; messages are only built for the failures
+        if kind is str:
+            bad = [index for index, value in enumerate(values)
+                   if not ((value is None and nullable) or (isinstance(value, str) and low <= len(value) <= high))]
+        else:
+            bad = [index for index, value in enumerate(values)
+                   if not ((value is None and nullable) or (isinstance(value, kind) and low <= value <= high))]
+        return [(index, self.problem(values[index])[1]) for index in bad]
+
+    def check_sql(self, column):
+        """The rule as a SQL boolean expression over `column`."""
+        sql_type, size = ("text", f"length({column})") if self.kind is str else ("integer", column)
+        expression = f"typeof({column}) = '{sql_type}' AND {size} BETWEEN {self.low} AND {self.high}"
+        return f"{column} IS NULL OR ({expression})" if self.nullable else expression
+
+
+# table -> column -> rule
+RULES = {
+    "games": {
+        "title": FieldRule("Game title", str, 1, 150, nullable=False),
+        "release_year": FieldRule("Release year", int, 1950, 2077),
+        "rating": FieldRule("Rating", int, 1, 5),
+    },
+    "platforms": {"name": FieldRule("Platform name", str, 2, 50, nullable=False)},
+    "genres": {"name": FieldRule("Genre name", str, 2, 30, nullable=False)},
+    "developers": {"name": FieldRule("Developer name", str, 2, 100, nullable=False)},
+    "publishers": {"name": FieldRule("Publisher name", str, 2, 100, nullable=False)},
+}
+
+
+def constraint_name(table, column):
+    return f"ck_{table}_{column}"
+
+
+def check_constraints(table):
+    """CheckConstraint objects for a model's `__table_args__`."""
+    return tuple(
+        CheckConstraint(rule.check_sql(column), name=constraint_name(table, column))
+        for column, rule in RULES[table].items()
+    )
+
+
+def constraint_clauses(table):
+    """The same constraints as `CONSTRAINT ... CHECK (...)` DDL clauses (used by migration 9)."""
+    return [
+        f"CONSTRAINT {constraint_name(table, column)} CHECK ({rule.check_sql(column)})"
+        for column, rule in RULES[table].items()
+    ]
+
+
+def violations_sql(table):
+    """SELECT counting the rows of `table` that break any of its rules."""
+    conditions = " OR ".join(f"NOT ({rule.check_sql(column)})" for column, rule in RULES[table].items())
+    return f"SELECT count(*) FROM {table} WHERE {conditions}"
+
+
+def validate_columns(columns, rules):
+    """
+    Checks a batch stored column-wise: `columns` maps each rule's column to a sequence of
+    values, one per row. Returns {row index: [message, ...]} for the invalid rows only.
+    """
+    errors = {}
+    for column, rule in rules.items():
+        for index, message in rule.errors(columns[column]):
+            errors.setdefault(index, []).append(message)
+    return errors
+
+
+def validate_rows(rows, rules):
+    """Like validate_columns for a list of dicts; a missing key counts as None."""
+    columns = {column: [row.get(column) for row in rows] for column in rules}
+    return validate_columns(columns, rules)
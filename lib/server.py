@@ -0,0 +1,480 @@
+# lib/server.py
+"""
+Local JSON HTTP API for other tools, built on asyncio streams (no web framework needed).
+
+    python -m lib.cli serve --port 8765 --workers 8
+
+    GET    /games                 one page: ?limit=50&after_title=..&after_id=.. and the filters
+                                  platform_id, genre_id, year_from, year_to, min_rating, sort, desc
+    GET    /games.jsonl           every game matching the same filters, streamed as chunked JSONL
+    GET    /games/search?q=..     full-text title search, best match first (&limit=50)
+    GET    /games/<id>
+    POST   /games                 {"title", "platform_id", "genre_id", "release_year", "rating",
+                                   "developer_id", "publisher_id"}
+    PATCH  /games/<id>            any of the POST fields; a null developer_id/publisher_id removes it
+    DELETE /games/<id>
+    GET    /platforms             also /genres, /developers and /publishers, with game counts
+    GET    /platforms/<id>
+    POST   /platforms             {"name"}
+    PATCH  /platforms/<id>        {"name"}
+    DELETE /platforms/<id>        only when no game uses it
+    GET    /cache                 query-cache hit ratio and time saved (lib.models.query_cache)
+
+Games are returned in the GameRow shape of `games list --format json`. Errors come back as
+{"error": message} with a 4xx/5xx status.
+
+Reads run concurrently on an AsyncGameShelf thread pool, each request with its own session
+and pooled connection. Writes go to a second, single-worker shelf, so they run one at a
+time in arrival order: SQLite allows one writer anyway, and queueing them here means they
+wait in Python instead of failing with "database is locked". Under WAL, reads keep running
+while a write commits. The read pool is sized to leave the writer a connection in the
+engine's pool; under the "fast-write" profile (one connection) reads and writes take turns
+on it. `/games.jsonl` is read one keyset page at a time and each page is
+sent as one HTTP chunk, so memory stays flat however large the collection is.
+
+Handlers look platforms, genres, developers and publishers up with `session.get` and plain
+queries, not through the process-wide lookup_cache. The server runs for a long time, and
+writes from other processes (the CLI, an import) never invalidate that cache.
+
+`python -m lib.bench.server` load-tests a local instance.
+"""
+import asyncio
+import inspect
+import json
+import re
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+
+from sqlalchemy import select
+
+from lib.models import engine, Platform, Genre, Developer, Publisher, Game, query_cache
+from lib.models.aio import AsyncGameShelf, DEFAULT_MAX_WORKERS, pool_capacity
+from lib.models.game import FILTER_SORTS
+from lib.models.validation import RULES, validate_rows
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 1000
+STREAM_CHUNK = 1000
+MAX_BODY = 1024 * 1024
+LOOKUPS = {"platforms": Platform, "genres": Genre, "developers": Developer, "publishers": Publisher}
+GAME_FIELDS = ("title", "platform_id", "genre_id", "release_year", "rating", "developer_id", "publisher_id")
+# id field -> (model, relationship keyword of Game.create/update)
+GAME_LOOKUPS = {
+    "platform_id": (Platform, "platform"),
+    "genre_id": (Genre, "genre"),
+    "developer_id": (Developer, "developer"),
+    "publisher_id": (Publisher, "publisher"),
+}
+GAME_FILTERS = ("platform_id", "genre_id", "year_from", "year_to", "min_rating")
+
+
+class HTTPError(Exception):
+    """Raised by handlers (also inside pool threads) to answer with an error status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    def __init__(self, method, path, query, headers, body, keep_alive):
+        self.method = method
+        self.path = path
+        self.query = query # parse_qs() dict of lists
+        self.headers = headers
+        self.body = body
+        self.keep_alive = keep_alive
+
+    def param(self, name, default=None):
+        values = self.query.get(name)
+        return values[0] if values else default
+
+    def int_param(self, name, default=None):
+        value = self.param(name)
+        if value is None or value == "":
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise HTTPError(400, f"'{name}' must be an integer.") from None
+
+    def json(self):
+        """The body as a JSON object."""
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Request body must be JSON.") from None
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Request body must be a JSON object.")
+        return data
+
+
+# --- games -----------------------------------------------------------------------------
+
+def game_filters(request):
+    filters = {name: request.int_param(name) for name in GAME_FILTERS}
+    return {name: value for name, value in filters.items() if value is not None}
+
+
+def game_dict(session, game_id):
+    """The GameRow of one game as a dict (same shape as the listings)."""
+    return Game.rows(session, game_ids=[game_id])[0]._asdict()
+
+
+def game_changes(session, data, partial):
+    """Validates a POST/PATCH body and returns keyword arguments for Game.create/update."""
+    unknown = set(data) - set(GAME_FIELDS)
+    if unknown:
+        raise HTTPError(400, f"Unknown field(s): {', '.join(sorted(unknown))}.")
+    rules = RULES["games"]
+    if partial:
+        rules = {field: rule for field, rule in rules.items() if field in data}
+        for field in ("release_year", "rating"):
+            if field in data and data[field] is None:
+                raise HTTPError(400, f"'{field}' cannot be cleared.")
+    errors = validate_rows([data], rules)
+    if errors:
+        raise HTTPError(400, " ".join(errors[0]))
+    changes = {field: data[field] for field in ("title", "release_year", "rating") if field in data}
+    for field, (model, keyword) in GAME_LOOKUPS.items():
+        if field not in data:
+            continue
+        value = data[field]
+        if value is None:
+            if keyword in ("platform", "genre"):
+                raise HTTPError(400, f"'{field}' is required.")
+            # Game.update's markers for removing a developer/publisher
+            changes[keyword] = "REMOVE_DEV" if keyword == "developer" else "REMOVE_PUB"
+            continue
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise HTTPError(400, f"'{field}' must be an integer.")
+        instance = session.get(model, value)
+        if instance is None:
+            raise HTTPError(400, f"No {keyword} found with ID {value}.")
+        changes[keyword] = instance
+    if not partial:
+        for keyword in ("platform", "genre"):
+            if keyword not in changes:
+                raise HTTPError(400, f"'{keyword}_id' is required.")
+        for keyword in ("developer", "publisher"):
+            if isinstance(changes.get(keyword), str):
+                changes[keyword] = None
+    return changes
+
+
+async def list_games(server, request):
+    sort = request.param("sort", "title")
+    if sort not in FILTER_SORTS:
+        raise HTTPError(400, f"'sort' must be one of: {', '.join(FILTER_SORTS)}.")
+    descending = request.param("desc", "") in ("1", "true")
+    limit = min(max(request.int_param("limit", PAGE_LIMIT), 1), MAX_PAGE_LIMIT)
+    after_title, after_id = request.param("after_title"), request.int_param("after_id")
+    after = None
+    if after_title is not None:
+        if sort != "title" or descending:
+            raise HTTPError(400, "'after_title' paging is only available in title order.")
+        after = (after_title, after_id or 0)
+    rows = await server.reads.run(
+        Game.rows, sort=sort, descending=descending, limit=limit, after=after, **game_filters(request)
+    )
+    following = None
+    if len(rows) == limit and sort == "title" and not descending:
+        following = {"after_title": rows[-1].title, "after_id": rows[-1].id}
+    return 200, {"games": [row._asdict() for row in rows], "next": following}
+
+
+async def stream_games(server, request):
+    filters = game_filters(request)
+
+    async def chunks():
+        after = None
+        while True:
+            page = await server.reads.run(Game.rows, after=after, limit=STREAM_CHUNK, cache=False, **filters)
+            if not page:
+                return
+            yield "".join(json.dumps(row._asdict(), ensure_ascii=False) + "\n" for row in page).encode()
+            after = (page[-1].title, page[-1].id)
+
+    return 200, chunks()
+
+
+async def search_games(server, request):
+    query = request.param("q", "").strip()
+    if not query:
+        raise HTTPError(400, "'q' is required.")
+    limit = min(max(request.int_param("limit", PAGE_LIMIT), 1), MAX_PAGE_LIMIT)
+    rows = await server.reads.run(Game.search_rows, query, limit=limit)
+    return 200, [row._asdict() for row in rows]
+
+
+async def show_game(server, request, game_id):
+    rows = await server.reads.run(Game.rows, game_ids=[int(game_id)])
+    if not rows:
+        raise HTTPError(404, f"No game found with ID {game_id}.")
+    return 200, rows[0]._asdict()
+
+
+async def create_game(server, request):
+    data = request.json()
+
+    def create(session):
+        changes = game_changes(session, data, partial=False)
+        game = Game.create(session, changes.pop("title", None), changes.pop("platform"), changes.pop("genre"),
+                           **changes)
+        if game is None:
+            raise HTTPError(409, "The game could not be saved.")
+        return game_dict(session, game.id)
+
+    return 201, await server.writes.run(create)
+
+
+async def update_game(server, request, game_id):
+    data = request.json()
+
+    def update(session):
+        game = Game.find_by_id(session, int(game_id))
+        if game is None:
+            raise HTTPError(404, f"No game found with ID {game_id}.")
+        changes = game_changes(session, data, partial=True)
+        if changes and not game.update(session, **changes):
+            raise HTTPError(409, f"Game {game_id} could not be updated.")
+        return game_dict(session, game.id)
+
+    return 200, await server.writes.run(update)
+
+
+async def delete_game(server, request, game_id):
+    def delete(session):
+        game = Game.find_by_id(session, int(game_id))
+        if game is None:
+            raise HTTPError(404, f"No game found with ID {game_id}.")
+        if not game.delete(session):
+            raise HTTPError(409, f"Game {game_id} could not be deleted.")
+        return {"deleted": int(game_id)}
+
+    return 200, await server.writes.run(delete)
+
+
+# --- platforms, genres, developers, publishers -----------------------------------------
+
+def lookup_dict(session, instance):
+    return {"id": instance.id, "name": instance.name, "games": instance.count_games(session)}
+
+
+def find_lookup(session, model, kind, item_id):
+    instance = session.get(model, int(item_id))
+    if instance is None:
+        raise HTTPError(404, f"No {kind[:-1]} found with ID {item_id}.")
+    return instance
+
+
+def lookup_name(session, model, data):
+    name = data.get("name")
+    problem = RULES[model.__tablename__]["name"].problem(name)
+    if problem:
+        raise HTTPError(400, problem[1])
+    table = model.__table__
+    if session.execute(select(table.c.id).where(table.c.name == name)).first() is not None:
+        raise HTTPError(409, f"{model.__name__} '{name}' already exists.")
+    return name
+
+
+async def list_lookups(server, request, kind):
+    rows = await server.reads.run(LOOKUPS[kind].rows, counts=True)
+    return 200, [row._asdict() for row in rows]
+
+
+async def show_lookup(server, request, kind, item_id):
+    model = LOOKUPS[kind]
+    return 200, await server.reads.run(lambda session: lookup_dict(session, find_lookup(session, model, kind, item_id)))
+
+
+async def create_lookup(server, request, kind):
+    model, data = LOOKUPS[kind], request.json()
+
+    def create(session):
+        instance = model.create(session, name=lookup_name(session, model, data))
+        if instance is None:
+            raise HTTPError(409, f"The {kind[:-1]} could not be saved.")
+        return {"id": instance.id, "name": instance.name, "games": 0}
+
+    return 201, await server.writes.run(create)
+
+
+async def update_lookup(server, request, kind, item_id):
+    model, data = LOOKUPS[kind], request.json()
+
+    def update(session):
+        instance = find_lookup(session, model, kind, item_id)
+        if data.get("name") != instance.name and not instance.update(session, name=lookup_name(session, model, data)):
+            raise HTTPError(409, f"{model.__name__} {item_id} could not be updated.")
+        return lookup_dict(session, instance)
+
+    return 200, await server.writes.run(update)
+
+
+async def delete_lookup(server, request, kind, item_id):
+    model = LOOKUPS[kind]
+
+    def delete(session):
+        instance = find_lookup(session, model, kind, item_id)
+        if instance.has_games(session):
+            raise HTTPError(409, f"{model.__name__} '{instance.name}' still has games.")
+        if not instance.delete(session):
+            raise HTTPError(409, f"{model.__name__} {item_id} could not be deleted.")
+        return {"deleted": int(item_id)}
+
+    return 200, await server.writes.run(delete)
+
+
+async def cache_stats(server, request):
+    return 200, query_cache.stats()
+
+
+LOOKUP_PATH = "(" + "|".join(LOOKUPS) + ")"
+ROUTES = [
+    (re.compile(path), handlers)
+    for path, handlers in [
+        (r"/games", {"GET": list_games, "POST": create_game}),
+        (r"/games\.jsonl", {"GET": stream_games}),
+        (r"/games/search", {"GET": search_games}),
+        (r"/games/(\d+)", {"GET": show_game, "PATCH": update_game, "DELETE": delete_game}),
+        (rf"/{LOOKUP_PATH}", {"GET": list_lookups, "POST": create_lookup}),
+        (rf"/{LOOKUP_PATH}/(\d+)", {"GET": show_lookup, "PATCH": update_lookup, "DELETE": delete_lookup}),
+        (r"/cache", {"GET": cache_stats}),
+    ]
+]
+
+
+# --- HTTP ------------------------------------------------------------------------------
+
+def response_head(status, headers):
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines += [f"{name}: {value}" for name, value in headers]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+class GameShelfServer:
+    """Routes HTTP/1.1 requests (keep-alive, chunked streaming) to the model layer."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_MAX_WORKERS):
+        self.host = host
+        self.port = port
+        self.writes = AsyncGameShelf(max_workers=1) # one writer: writes queue up in arrival order
+        # The writer needs a connection of its own, so leave one in the pool for it where possible
+        capacity = pool_capacity(engine)
+        if capacity is not None and capacity > 1:
+            workers = min(workers, capacity - 1)
+        self.reads = AsyncGameShelf(max_workers=workers)
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        print(f"GameShelf API listening on http://{self.host}:{self.port} ({self.reads.max_workers} read threads)")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.reads.close()
+        self.writes.close()
+
+    async def read_request(self, reader):
+        """The next request on the connection, or None once the client has closed it."""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "Request headers are too large.") from None
+        request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+        try:
+            method, target, version = request_line.split(" ")
+        except ValueError:
+            raise HTTPError(400, "Malformed request line.") from None
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "Content-Length must be an integer.") from None
+        if length < 0:
+            raise HTTPError(400, "Content-Length cannot be negative.")
+        if length > MAX_BODY:
+            raise HTTPError(413, "Request body is too large.")
+        body = await reader.readexactly(length) if length else b""
+        url = urlsplit(target)
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        return Request(method.upper(), url.path.rstrip("/") or "/", parse_qs(url.query), headers, body, keep_alive)
+
+    async def dispatch(self, request):
+        """Returns (status, payload), where payload is JSON-able or an async iterator of JSONL chunks."""
+        for pattern, handlers in ROUTES:
+            match = pattern.fullmatch(request.path)
+            if match:
+                handler = handlers.get(request.method)
+                if handler is None:
+                    raise HTTPError(405, f"{request.method} is not allowed on {request.path}.")
+                return await handler(self, request, *match.groups())
+        raise HTTPError(404, f"No such endpoint: {request.path}.")
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self.read_request(reader)
+                    if request is None:
+                        break
+                    keep_alive = request.keep_alive
+                    status, payload = await self.dispatch(request)
+                except HTTPError as error:
+                    status, payload = error.status, {"error": error.message}
+                except Exception as error: # keep serving; report the failure to this client only
+                    status, payload = 500, {"error": f"{type(error).__name__}: {error}"}
+                connection = "keep-alive" if keep_alive else "close"
+                if inspect.isasyncgen(payload):
+                    writer.write(response_head(status, [
+                        ("Content-Type", "application/x-ndjson"),
+                        ("Transfer-Encoding", "chunked"),
+                        ("Connection", connection),
+                    ]))
+                    try:
+                        async for chunk in payload:
+                            writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                            await writer.drain() # wait for the client before reading the next page
+                    except ConnectionError:
+                        raise
+                    except Exception as error:
+                        # Too late for an error status: end without the last chunk so the client sees a truncated body
+                        print(f"Stream of {request.path} failed: {error}")
+                        break
+                    writer.write(b"0\r\n\r\n")
+                else:
+                    body = json.dumps(payload, ensure_ascii=False).encode()
+                    writer.write(response_head(status, [
+                        ("Content-Type", "application/json"),
+                        ("Content-Length", len(body)),
+                        ("Connection", connection),
+                    ]) + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass # client went away mid-request or mid-stream
+        finally:
+            writer.close()
+
+
+def run(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_MAX_WORKERS):
+    """Serves until interrupted (Ctrl+C)."""
+    server = GameShelfServer(host, port, workers)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+    finally:
+        server.close()
@@ -0,0 +1,28 @@
+# tests/conftest.py
+"""
+Points lib.models at a throwaway database before anything imports it, so tests never touch
+gameshelf.db, and provides a `session` on a freshly created schema.
+"""
+import contextlib
+import io
+import os
+import tempfile
+
+os.environ["GAMESHELF_DATABASE_URL"] = (
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='gameshelf-tests-'), 'gameshelf_test.db')}"
+)
+
+
+import pytest # noqa: E402 (the URL must be set before lib.models is imported)
+
+
+@pytest.fixture
+def session():
+    """A session on an empty gameshelf database with every table and migration applied."""
+    from lib.db.seed import reset_database
+    from lib.models import Session
+    with contextlib.redirect_stdout(io.StringIO()): # create_tables() reports every migration
+        reset_database()
+    session = Session()
+    yield session
+    session.close()
@@ -0,0 +1,42 @@
+# tests/test_aio.py
+"""AsyncGameShelf never runs more threads than the engine's pool has connections."""
+import asyncio
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from lib.models import Base, Platform, migrate
+from lib.models.aio import AsyncGameShelf
+from lib.models.base import build_engine
+
+
+def shelf_for(path, profile, max_workers=8):
+    engine = build_engine(f"sqlite:///{path}", profile)
+    Base.metadata.create_all(engine)
+    migrate(engine, verbose=False)
+    return engine, AsyncGameShelf(max_workers=max_workers, session_factory=sessionmaker(bind=engine))
+
+
+def test_workers_are_clamped_to_the_pool(tmp_path):
+    engine, shelf = shelf_for(tmp_path / "fast.db", "fast-write")
+    try:
+        assert shelf.max_workers == 1 # pool_size 1, no overflow
+
+        async def calls():
+            return await asyncio.gather(*(shelf.Platform.rows() for _ in range(8)))
+
+        start = time.perf_counter()
+        assert asyncio.run(calls()) == [[]] * 8
+        assert time.perf_counter() - start < 5 # nothing waited for the pool timeout
+    finally:
+        shelf.close()
+        engine.dispose()
+
+
+def test_workers_within_the_pool_are_kept(tmp_path):
+    engine, shelf = shelf_for(tmp_path / "durable.db", "durable")
+    try:
+        assert shelf.max_workers == 8 # pool_size 5 + max_overflow 10
+    finally:
+        shelf.close()
+        engine.dispose()
@@ -0,0 +1,19 @@
+# tests/test_bench_harness.py
+"""Nearest-rank percentiles used by every benchmark report."""
+from lib.bench.harness import percentile
+
+
+def test_percentile_nearest_rank():
+    samples = list(range(10, 0, -1)) # unsorted on purpose
+    assert percentile(samples, 50) == 5
+    assert percentile(samples, 90) == 9
+    assert percentile(samples, 95) == 10
+    assert percentile(samples, 99) == 10
+    assert percentile(samples, 100) == 10
+    assert percentile(samples, 0) == 1
+    assert percentile(samples, 11) == 2
+
+
+def test_percentile_of_one_sample():
+    assert percentile([7.5], 50) == 7.5
+    assert percentile([7.5], 99) == 7.5
@@ -0,0 +1,71 @@
+# tests/test_list_with_relations.py
+"""
+Game.list_with_relations must load games and their platform, genre, developer and publisher
+in a fixed number of statements, however many games there are (no N+1 lazy loads).
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from lib.models import Base, Platform, Genre, Developer, Publisher, Game
+from lib.models.base import build_engine
+
+
+def make_session(path, games):
+    """
+    A session on a fresh database at `path` holding `games` games. Every lookup table grows
+    with the collection, so lazy loads would show up as extra statements.
+    """
+    engine = build_engine(f"sqlite:///{path}", "durable")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    platforms = [Platform(name=f"Platform {n}") for n in range(games // 4 + 1)]
+    genres = [Genre(name=f"Genre {n}") for n in range(games // 4 + 1)]
+    developers = [Developer(name=f"Developer {n}") for n in range(games // 2 + 1)]
+    publishers = [Publisher(name=f"Publisher {n}") for n in range(games // 2 + 1)]
+    session.add_all(
+        Game(f"Game {n}", platforms[n // 4], genres[n // 4], release_year=2000 + n % 20, rating=n % 5 + 1,
+             developer=developers[n // 2], publisher=publishers[n // 2] if n % 7 else None)
+        for n in range(games)
+    )
+    session.commit()
+    session.close()
+    return session, engine
+
+
+def count_statements(engine, run):
+    """Runs `run()` and returns how many statements it sent to the database."""
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return len(statements)
+
+
+def listed_statements(path, games):
+    session, engine = make_session(path, games)
+
+    def run():
+        for game in Game.list_with_relations(session):
+            # Touch every relationship the listings print
+            game.platform.name, game.genre.name
+            game.developer and game.developer.name
+            game.publisher and game.publisher.name
+
+    try:
+        return count_statements(engine, run)
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def test_statement_count_does_not_grow_with_the_collection(tmp_path):
+    small = listed_statements(tmp_path / "small.db", 10)
+    large = listed_statements(tmp_path / "large.db", 500)
+    assert small == large
+    assert large == 1 # one SELECT with the four relationships joined
@@ -0,0 +1,51 @@
+# tests/test_lookup_cache.py
+"""The process-wide lookup cache never mixes databases and sees every write made in-process."""
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from lib.models import Base, Platform, lookup_cache, migrate
+from lib.models.base import build_engine
+
+
+def other_database(path, *names):
+    """A session on a second database file holding the given platform names."""
+    engine = build_engine(f"sqlite:///{path}", "durable")
+    Base.metadata.create_all(engine)
+    migrate(engine, verbose=False)
+    session = sessionmaker(bind=engine)()
+    session.add_all(Platform(name=name) for name in names)
+    session.commit()
+    return session
+
+
+def test_entries_are_kept_per_database(session, tmp_path):
+    Platform.create(session, "Dreamcast")
+    other = other_database(tmp_path / "other.db", "Saturn")
+    try:
+        assert Platform.find_by_id(session, 1).name == "Dreamcast"
+        assert Platform.find_by_id(other, 1).name == "Saturn"
+        assert Platform.find_by_name(other, "Dreamcast") is None
+        assert [row.name for row in lookup_cache.all_rows(session, Platform)] == ["Dreamcast"]
+        assert [row.name for row in lookup_cache.all_rows(other, Platform)] == ["Saturn"]
+    finally:
+        other.close()
+        other.get_bind().dispose()
+
+
+def test_core_insert_invalidates(session):
+    Platform.create(session, "Dreamcast")
+    assert [row.name for row in lookup_cache.all_rows(session, Platform)] == ["Dreamcast"]
+    assert Platform.find_by_name(session, "Saturn") is None
+    session.execute(insert(Platform.__table__), [{"name": "Saturn"}])
+    session.commit()
+    assert [row.name for row in lookup_cache.all_rows(session, Platform)] == ["Dreamcast", "Saturn"]
+    assert Platform.find_by_name(session, "Saturn").id == 2
+
+
+def test_reset_database_starts_empty(session):
+    from lib.db.seed import reset_database
+    Platform.create(session, "Dreamcast")
+    assert Platform.find_by_id(session, 1) is not None
+    session.close()
+    reset_database()
+    assert Platform.find_by_id(session, 1) is None
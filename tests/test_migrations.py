@@ -0,0 +1,33 @@
+# tests/test_migrations.py
+"""A migration is all or nothing, DDL included."""
+import pytest
+
+from lib.models import Base, migrations
+from lib.models.base import build_engine
+from lib.models.migrations import Migration, migrate
+
+
+def test_failed_migration_leaves_no_partial_schema(tmp_path, monkeypatch):
+    engine = build_engine(f"sqlite:///{tmp_path / 'migrate.db'}", "durable")
+    Base.metadata.create_all(engine)
+    migrate(engine, verbose=False)
+    latest = migrations.LATEST_VERSION
+    statements = ["CREATE TABLE half_done (x)", "CREATE INDEX ix_half_done ON half_done (x)"]
+    broken = Migration(latest + 1, "broken", statements + ["CREATE TABLE nope ("], foreign_keys_off=True)
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [broken])
+
+    with pytest.raises(Exception):
+        migrate(engine, verbose=False)
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE name LIKE '%half_done%'").all() == []
+        assert migrations.stored_version(connection) == latest
+        assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+
+    fixed = Migration(latest + 1, "fixed", statements)
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS[:-1] + [fixed])
+    migrate(engine, verbose=False)
+    with engine.connect() as connection:
+        names = connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE name LIKE '%half_done%'").scalars()
+        assert sorted(names) == ["half_done", "ix_half_done"]
+        assert migrations.stored_version(connection) == latest + 1
+    engine.dispose()
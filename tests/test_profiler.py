@@ -0,0 +1,40 @@
+# tests/test_profiler.py
+"""
+The SQL profiler groups statements by shape (IN-lists collapsed, row values kept) and counts
+the rows each statement returned as they are fetched.
+"""
+from sqlalchemy import text
+
+from lib.models.base import build_engine
+from lib.models.profiler import SQLProfiler, normalize_sql
+
+
+def test_only_in_lists_are_collapsed():
+    assert normalize_sql("SELECT * FROM games WHERE id IN (?, ?, ?)") == \
+        normalize_sql("SELECT * FROM games WHERE id in (?,?)") == "SELECT * FROM games WHERE id IN (?, ...)"
+    keyset = "SELECT * FROM games WHERE (games.title, games.id) > (?, ?) LIMIT ?"
+    assert normalize_sql(keyset) == keyset
+    values = "INSERT INTO genres (name, id) VALUES (?, ?), (?, ?)"
+    assert normalize_sql(values) == values
+
+
+def test_rows_are_counted_as_they_are_fetched(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'profiled.db'}", "durable")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE numbers (n INTEGER)"))
+    profiler = SQLProfiler()
+    profiler.enable(engine)
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("INSERT INTO numbers (n) VALUES (1), (2), (3), (4), (5)"))
+            assert len(connection.execute(text("SELECT n FROM numbers")).fetchall()) == 5
+            result = connection.execute(text("SELECT n FROM numbers WHERE n > 1"))
+            result.fetchone()
+            result.fetchmany(2)
+            list(result)
+    finally:
+        profiler.disable()
+    rows = {key: stats["rows"] for key, stats in profiler.by_statement.items()}
+    assert rows["INSERT INTO numbers (n) VALUES (?), (?), (?), (?), (?)"] == 5
+    assert rows["SELECT n FROM numbers"] == 5
+    assert rows["SELECT n FROM numbers WHERE n > ?"] == 4
@@ -0,0 +1,169 @@
+# tests/test_query_cache.py
+"""The query-result cache serves repeated reads until a write, from any connection, changes their tables."""
+import contextlib
+import io
+
+import pytest
+from sqlalchemy import text
+
+from lib.db.seed import reset_database
+from lib.models import Session, Platform, Genre, Game, engine, query_cache
+from lib.models.query_cache import QueryCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    query_cache.invalidate()
+    query_cache.reset_stats()
+    yield
+    query_cache.invalidate()
+
+
+def lookups(session):
+    return Platform.create(session, "Dreamcast"), Genre.create(session, "Shooter")
+
+
+def titles(session):
+    return [game.title for game in Game.get_all(session)]
+
+
+def counts():
+    stats = query_cache.stats()
+    return stats["hits"], stats["misses"]
+
+
+def test_game_get_all_is_cached_until_games_change(session):
+    platform, genre = lookups(session)
+    game = Game.create(session, "Ikaruga", platform, genre)
+    assert titles(session) == ["Ikaruga"]
+    assert titles(session) == ["Ikaruga"]
+    assert counts() == (1, 1)
+
+    Game.create(session, "Border Down", platform, genre)
+    assert titles(session) == ["Border Down", "Ikaruga"]
+    assert counts() == (1, 2)
+    game.update(session, title="Zero Gunner")
+    assert titles(session) == ["Border Down", "Zero Gunner"]
+    game.delete(session)
+    assert titles(session) == ["Border Down"]
+    assert titles(session) == ["Border Down"]
+    assert counts() == (2, 4)
+
+
+def test_game_get_all_sees_writes_from_another_connection(session):
+    platform, genre = lookups(session)
+    Game.create(session, "Ikaruga", platform, genre)
+    assert titles(session) == ["Ikaruga"]
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO games (title, platform_id, genre_id) VALUES ('Border Down', :platform, :genre)"),
+            {"platform": platform.id, "genre": genre.id},
+        )
+    assert titles(session) == ["Border Down", "Ikaruga"]
+    assert counts() == (0, 2)
+
+
+def test_lookup_get_all_is_cached_until_the_table_changes(session):
+    lookups(session)
+    names = lambda: [platform.name for platform in Platform.get_all(session)]
+    assert names() == ["Dreamcast"]
+    assert names() == ["Dreamcast"]
+    assert counts() == (1, 1)
+    Genre.create(session, "Racing") # another table: the entry stays valid
+    assert names() == ["Dreamcast"]
+    assert counts() == (2, 1)
+
+    saturn = Platform.create(session, "Saturn")
+    assert sorted(names()) == ["Dreamcast", "Saturn"]
+    saturn.update(session, name="Sega Saturn")
+    assert sorted(names()) == ["Dreamcast", "Sega Saturn"]
+    saturn.delete(session)
+    assert names() == ["Dreamcast"]
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO platforms (name) VALUES ('Naomi')"))
+    assert sorted(names()) == ["Dreamcast", "Naomi"]
+    assert counts() == (2, 5)
+
+
+def counting(result):
+    """A compute function returning `result` that records how often it ran."""
+    def compute(session):
+        compute.calls += 1
+        return result
+    compute.calls = 0
+    return compute
+
+
+def test_entries_are_dropped_only_when_their_tables_change(session):
+    cache = QueryCache()
+    games, platforms = counting([1, 2]), counting([3])
+    for _ in range(2):
+        assert cache.get(session, "games", ("games",), games) == (1, 2)
+        assert cache.get(session, "platforms", ("platforms",), platforms) == (3,)
+    assert (games.calls, platforms.calls) == (1, 1)
+
+    platform, genre = lookups(session)
+    assert cache.get(session, "games", ("games",), games) == (1, 2)
+    assert cache.get(session, "platforms", ("platforms",), platforms) == (3,)
+    assert (games.calls, platforms.calls) == (1, 2)
+    session.execute(text("INSERT INTO games (title, platform_id, genre_id) VALUES ('Ikaruga', :p, :g)"),
+                    {"p": platform.id, "g": genre.id})
+    session.commit()
+    cache.get(session, "games", ("games",), games)
+    cache.get(session, "platforms", ("platforms",), platforms)
+    assert (games.calls, platforms.calls) == (2, 2)
+    assert cache.stats()["stale"] == 2
+
+
+def test_a_replaced_database_never_matches(session):
+    cache = QueryCache()
+    compute = counting([])
+    cache.get(session, "games", ("games",), compute)
+    session.close()
+    with contextlib.redirect_stdout(io.StringIO()):
+        reset_database() # a new file whose counters start from zero again
+    replaced = Session()
+    try:
+        cache.get(replaced, "games", ("games",), compute)
+        cache.get(replaced, "games", ("games",), compute)
+    finally:
+        replaced.close()
+    assert compute.calls == 2
+
+
+def test_sessions_with_uncommitted_writes_bypass_the_cache(session):
+    cache = QueryCache()
+    compute = counting([1])
+    session.add(Platform(name="Dreamcast")) # pending
+    cache.get(session, "platforms", ("platforms",), compute)
+    session.flush() # written, not committed
+    cache.get(session, "platforms", ("platforms",), compute)
+    cache.get(session, "platforms", ("platforms",), compute)
+    assert compute.calls == 3
+    assert cache.stats()["entries"] == 0
+    session.rollback()
+    cache.get(session, "platforms", ("platforms",), compute)
+    cache.get(session, "platforms", ("platforms",), compute)
+    assert compute.calls == 4
+    assert cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_by_row_count(session):
+    cache = QueryCache(max_rows=5)
+    cache.get(session, "a", ("games",), counting([1, 2, 3]))
+    cache.get(session, "b", ("games",), counting([4, 5]))
+    assert cache.stats()["rows"] == 5
+    cache.get(session, "a", ("games",), counting([])) # hit: "a" becomes the most recently used
+    cache.get(session, "c", ("games",), counting([6]))
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.stats()["rows"] == 4
+    assert cache.stats()["evictions"] == 1
+
+    too_large = counting([1, 2, 3, 4, 5, 6])
+    assert cache.get(session, "d", ("games",), too_large) == (1, 2, 3, 4, 5, 6)
+    assert "d" not in cache._entries and cache.stats()["rows"] == 4
+    empty = counting([])
+    cache.get(session, "e", ("games",), empty)
+    cache.get(session, "e", ("games",), empty)
+    assert empty.calls == 1 # an empty result is cached, counted as one row
+    assert cache.stats()["rows"] == 5